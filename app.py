@@ -1,25 +1,31 @@
 """
 AI资讯采集系统 - Flask主应用
 """
-import asyncio
+import hashlib
 import json
 import os
 import logging
+import time
 from datetime import datetime, date
-from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
-from concurrent.futures import ThreadPoolExecutor
-import threading
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, Response, stream_with_context
 
 # 导入自定义模块
 from config import Config
 from scrapers.sohu_scraper import SohuScraper
 from scrapers.aibase_news_scraper import AIBaseNewsScraper
-from deepseek_api import DeepSeekAPI
+from deepseek_api import DeepSeekAPI, recent_call_stats, get_cache_summary
 from webhook import KingsoftWebhook
 from poster_gen import PosterGenerator
 from env_manager import env_manager
-from multi_date_crawler import multi_date_crawler
+from multi_date_crawler import MultiDateCrawler, multi_date_crawler
 from scheduler_manager import scheduler_manager
+from event_loop_service import event_loop_service
+from job_registry import job_registry, JobLimitExceeded
+from single_flight import single_flight
+from article_store import article_store, date_entry_name
+from article_db import article_db
+from report_cache import report_cache
+from scrapers.page_cache import page_cache
 
 # 配置日志
 logging.basicConfig(
@@ -46,23 +52,9 @@ app.config.from_object(Config)
 # # 这会导致每个worker进程都尝试启动一个调度器实例。
 # # scheduler_manager.start()
 
-# 全局变量
-current_task = None
-task_progress = {"status": "idle", "progress": 0, "message": "", "details": []}
-
 def run_async(coro):
-    """在新事件循环中运行异步任务"""
-    def run_in_thread():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
-    
-    with ThreadPoolExecutor() as executor:
-        future = executor.submit(run_in_thread)
-        return future.result()
+    """在常驻的后台事件循环中运行异步任务并等待结果（浏览器池等资源跨请求复用）"""
+    return event_loop_service.run(coro)
 
 @app.route('/')
 def index():
@@ -169,178 +161,298 @@ def save_config():
 @app.route('/api/test_connections', methods=['POST'])
 def test_connections():
     """测试API连接"""
-    global task_progress
+    details = []
     
     try:
-        task_progress = {"status": "running", "progress": 0, "message": "正在测试连接...", "details": []}
-        
         results = {}
         
         # 测试DeepSeek API
-        task_progress["message"] = "测试DeepSeek API连接..."
-        task_progress["progress"] = 25
-        
         try:
             api = DeepSeekAPI()
             deepseek_result = run_async(api.test_connection())
             results['deepseek'] = deepseek_result
-            task_progress["details"].append(f"DeepSeek API: {'✅ 成功' if deepseek_result.get('success') else '❌ 失败'}")
+            details.append(f"DeepSeek API: {'✅ 成功' if deepseek_result.get('success') else '❌ 失败'}")
         except Exception as e:
             results['deepseek'] = {'success': False, 'error': str(e)}
-            task_progress["details"].append(f"DeepSeek API: ❌ 失败 - {str(e)}")
+            details.append(f"DeepSeek API: ❌ 失败 - {str(e)}")
         
         # 测试Webhook连接
-        task_progress["message"] = "测试Webhook连接..."
-        task_progress["progress"] = 50
-        
         try:
             webhook = KingsoftWebhook()
             webhook_result = run_async(webhook.test_webhook())
             results['webhook'] = webhook_result
-            task_progress["details"].append(f"金山文档Webhook: {'✅ 成功' if webhook_result.get('success') else '❌ 失败'}")
+            details.append(f"金山文档Webhook: {'✅ 成功' if webhook_result.get('success') else '❌ 失败'}")
         except Exception as e:
             results['webhook'] = {'success': False, 'error': str(e)}
-            task_progress["details"].append(f"金山文档Webhook: ❌ 失败 - {str(e)}")
-        
-        # 测试爬虫连接
-        task_progress["message"] = "测试爬虫连接..."
-        task_progress["progress"] = 75
+            details.append(f"金山文档Webhook: ❌ 失败 - {str(e)}")
         
         # 简单的连接测试，不实际爬取
         results['scrapers'] = {'success': True, 'message': '爬虫模块加载正常'}
-        task_progress["details"].append("爬虫模块: ✅ 加载正常")
-        
-        task_progress["status"] = "completed"
-        task_progress["progress"] = 100
-        task_progress["message"] = "连接测试完成"
+        details.append("爬虫模块: ✅ 加载正常")
         
         return jsonify({
             'success': True,
-            'results': results
+            'results': results,
+            'details': details
         })
         
     except Exception as e:
-        task_progress["status"] = "error"
-        task_progress["message"] = f"连接测试失败: {str(e)}"
-        
         return jsonify({
             'success': False,
-            'error': str(e)
+            'error': str(e),
+            'details': details
         }), 500
 
 @app.route('/api/crawl', methods=['POST'])
 def start_crawl():
     """开始爬取任务"""
-    global current_task, task_progress
-    
-    if current_task and current_task.is_alive():
-        return jsonify({'success': False, 'error': '已有任务在运行中'}), 400
-    
     data = request.json
     target_date = data.get('date', date.today().strftime('%Y-%m-%d'))
     sources = data.get('sources', ['tencent', 'aibase'])
+    force_refresh = bool(data.get('force_refresh'))  # 不复用已采集过的（日期, 数据源）
     
-    def crawl_task():
-        global task_progress
-        
+    def reuse(job_id, source, label):
+        """复用之前采集过的结果（包括多日期采集），返回文章列表或 None"""
+        reusable = None if force_refresh else article_store.get_reusable(target_date, source)
+        if reusable is None:
+            return None
+        articles, crawled_at = reusable
+        job_registry.add_detail(job_id, f"♻️ {label}: 复用 {datetime.fromtimestamp(crawled_at).strftime('%m-%d %H:%M')} "
+                                        f"的采集结果（{len(articles)} 篇）")
+        return articles
+    
+    def crawl_task(job_id):
         # 在函数开头导入datetime相关模块
         from datetime import datetime, timedelta
         
-        try:
-            task_progress = {
-                "status": "running", 
-                "progress": 0, 
-                "message": "开始爬取任务...", 
-                "details": [],
-                "articles": []
-            }
-            
-            all_articles = []
+        all_articles = []
+        partitions = []  # [(日期, 数据源, 文章列表)]
+        crawled = []     # 本次实际采集的（日期, 数据源）
+        partial = []     # 其中采集不完整的（有页面获取失败），登记后不作为可复用结果
+        
+        # 爬取腾讯研究院
+        tencent_articles = reuse(job_id, 'tencent', '腾讯研究院') if 'tencent' in sources else None
+        if tencent_articles is not None:
+            all_articles.extend(tencent_articles)
+            partitions.append((target_date, 'tencent', tencent_articles))
+        elif 'tencent' in sources:
+            job_registry.update(job_id, progress=20, message="正在爬取腾讯研究院AI速递...")
             
-            # 爬取腾讯研究院
-            if 'tencent' in sources:
-                task_progress["message"] = "正在爬取腾讯研究院AI速递..."
-                task_progress["progress"] = 20
+            try:
+                scraper = SohuScraper()
+                target_date_obj = datetime.strptime(target_date, '%Y-%m-%d').date()
+                articles, errors = run_async(scraper.scrape_articles(target_date_obj, target_date_obj))
                 
-                try:
-                    scraper = SohuScraper()
-                    target_date_obj = datetime.strptime(target_date, '%Y-%m-%d').date()
-                    articles, errors = run_async(scraper.scrape_articles(target_date_obj, target_date_obj))
-                    
-                    all_articles.extend([article.to_dict() for article in articles])
-                    task_progress["details"].append(f"腾讯研究院: 成功获取 {len(articles)} 篇文章")
-                    
-                    if errors:
-                        task_progress["details"].extend([f"腾讯研究院错误: {error}" for error in errors[:3]])
-                        
-                except Exception as e:
-                    task_progress["details"].append(f"腾讯研究院爬取失败: {str(e)}")
-            
-            # 爬取AIBase快讯
-            if 'aibase' in sources:
-                task_progress["message"] = "正在爬取AIBase快讯..."
-                task_progress["progress"] = 50
+                tencent_articles = [article.to_dict() for article in articles]
+                all_articles.extend(tencent_articles)
+                partitions.append((target_date, 'tencent', tencent_articles))
+                crawled.append((target_date, 'tencent'))
+                job_registry.add_detail(job_id, f"腾讯研究院: 成功获取 {len(articles)} 篇文章")
                 
-                try:
-                    scraper = AIBaseNewsScraper()
-                    # AIBase采集前一天的数据（因为AIBase当天快讯对应前一天信息）
-                    target_date_obj = datetime.strptime(target_date, '%Y-%m-%d')
-                    aibase_date = (target_date_obj - timedelta(days=1)).strftime('%Y-%m-%d')
-                    task_progress["details"].append(f"AIBase采集日期: {aibase_date} (前一天，因为AIBase快讯时效对应前一天信息)")
-                    
-                    news_list = run_async(scraper.get_news_by_date(aibase_date))
-                    
-                    # 转换为Article格式
-                    for news in news_list:
-                        article_dict = {
-                            'title': news.get('title', ''),
-                            'date': news.get('date', target_date),
-                            'content': news.get('content', news.get('summary', '')),
-                            'url': news.get('url', ''),
-                            'source': news.get('source', 'AIBase快讯'),
-                            'weight': news.get('weight', 5)
-                        }
-                        all_articles.append(article_dict)
-                    
-                    task_progress["details"].append(f"AIBase快讯: 成功获取 {len(news_list)} 条快讯")
+                if errors:
+                    partial.append((target_date, 'tencent'))
+                    job_registry.add_detail(job_id, *[f"腾讯研究院错误: {error}" for error in errors[:3]])
                     
-                except Exception as e:
-                    task_progress["details"].append(f"AIBase快讯爬取失败: {str(e)}")
-            
-            task_progress["message"] = "爬取完成，正在保存缓存..."
-            task_progress["progress"] = 80
-            task_progress["articles"] = all_articles
+            except Exception as e:
+                job_registry.add_detail(job_id, f"腾讯研究院爬取失败: {str(e)}")
+        
+        # 爬取AIBase快讯
+        aibase_articles = reuse(job_id, 'aibase', 'AIBase快讯') if 'aibase' in sources else None
+        if aibase_articles is not None:
+            all_articles.extend(aibase_articles)
+            partitions.append((target_date, 'aibase', aibase_articles))
+        elif 'aibase' in sources:
+            job_registry.update(job_id, progress=50, message="正在爬取AIBase快讯...")
             
-            # 保存到缓存
-            cache_file = os.path.join(Config.CACHE_DIR, f"articles_{target_date.replace('-', '')}.json")
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'date': target_date,
-                    'articles': all_articles,
-                    'timestamp': datetime.now().isoformat(),
-                    'total': len(all_articles)
-                }, f, ensure_ascii=False, indent=2)
+            try:
+                scraper = AIBaseNewsScraper()
+                # AIBase采集前一天的数据（因为AIBase当天快讯对应前一天信息）
+                target_date_obj = datetime.strptime(target_date, '%Y-%m-%d')
+                aibase_date = (target_date_obj - timedelta(days=1)).strftime('%Y-%m-%d')
+                job_registry.add_detail(job_id, f"AIBase采集日期: {aibase_date} (前一天，因为AIBase快讯时效对应前一天信息)")
+                
+                status = {}
+                news_list = run_async(scraper.get_news_by_date(aibase_date, status=status))
+                
+                # 转换为Article格式
+                aibase_articles = []
+                for news in news_list:
+                    article_dict = {
+                        'title': news.get('title', ''),
+                        'date': news.get('date', target_date),
+                        'content': news.get('content', news.get('summary', '')),
+                        'url': news.get('url', ''),
+                        'source': news.get('source', 'AIBase快讯'),
+                        'weight': news.get('weight', 5)
+                    }
+                    aibase_articles.append(article_dict)
+                all_articles.extend(aibase_articles)
+                partitions.append((target_date, 'aibase', aibase_articles))
+                crawled.append((target_date, 'aibase'))
+                
+                job_registry.add_detail(job_id, f"AIBase快讯: 成功获取 {len(news_list)} 条快讯")
+                if not status.get('complete'):
+                    partial.append((target_date, 'aibase'))
+                    job_registry.add_detail(job_id, f"⚠️ AIBase快讯采集不完整（{len(status.get('failed_ids', []))} 个ID获取失败"
+                                                    f"或未回溯到目标日期之前），下次采集时重新采集")
+                
+            except Exception as e:
+                job_registry.add_detail(job_id, f"AIBase快讯爬取失败: {str(e)}")
+        
+        job_registry.update(job_id, progress=80, message="爬取完成，正在保存缓存...", articles=all_articles)
+        
+        # 保存到缓存
+        cache_key = date_entry_name(target_date)
+        article_store.put_crawl(cache_key, partitions, indexed=crawled, partial=partial,
+                                meta={'date': target_date, 'sources': sources})
+        article_db.upsert_partitions(partitions, crawled)
+        
+        job_registry.complete(job_id, f"爬取完成！共获取 {len(all_articles)} 篇文章",
+                              result={'total': len(all_articles), 'cache_key': cache_key})
+        logger.info(f"爬取任务完成: {target_date}, 共 {len(all_articles)} 篇文章")
+    
+    try:
+        job_id = job_registry.start_job('crawl', crawl_task, name=f"采集 {target_date}",
+                                        params={'date': target_date, 'sources': sources})
+    except JobLimitExceeded as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
+    
+    return jsonify({'success': True, 'message': '爬取任务已启动', 'job_id': job_id})
+
+@app.route('/api/progress')
+def get_progress():
+    """获取任务进度（指定 job_id 时返回该任务，否则返回最近的采集任务）"""
+    job_id = request.args.get('job_id')
+    job = job_registry.get(job_id) if job_id else job_registry.get_latest('crawl')
+    if not job:
+        if job_id:
+            return jsonify({'status': 'unknown', 'progress': 0, 'message': '任务不存在', 'details': []}), 404
+        return jsonify({"status": "idle", "progress": 0, "message": "", "details": []})
+    return jsonify(job)
+
+def _sse_message(event: str, data, event_id: str = None) -> str:
+    """格式化一条Server-Sent Events消息"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return '\n'.join(lines) + '\n\n'
+
+@app.route('/api/progress/stream')
+def progress_stream():
+    """
+    以Server-Sent Events推送任务进度
+    连接建立时下发 snapshot（任务快照，不含文章数据），之后只推送 state（状态变化）和 details（新增明细）事件；
+    每条事件带续传标记，断线重连时浏览器通过 Last-Event-ID 续传，无法续传时重新下发快照。
+    可用 ?job_id= 或 ?operation= 只订阅部分任务
+    """
+    job_id = request.args.get('job_id')
+    operation = request.args.get('operation')
+    token = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    keepalive = Config.JOB_CONFIG.get('stream_keepalive', 15)
+    stream_timeout = Config.JOB_CONFIG.get('stream_timeout', 300)
+    
+    def generate():
+        yield "retry: 3000\n\n"
+        cursor = job_registry.parse_token(token)
+        deadline = time.monotonic() + stream_timeout
+        
+        while True:
+            if cursor is None:
+                jobs, cursor = job_registry.get_stream_snapshot(job_id, operation)
+                yield _sse_message('snapshot', {'jobs': jobs}, job_registry.make_token(cursor))
             
-            task_progress["status"] = "completed"
-            task_progress["progress"] = 100
-            task_progress["message"] = f"爬取完成！共获取 {len(all_articles)} 篇文章"
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
             
-            logger.info(f"爬取任务完成: {target_date}, 共 {len(all_articles)} 篇文章")
+            events, new_cursor = job_registry.wait_events(cursor, min(keepalive, remaining), job_id, operation)
+            if new_cursor is None:
+                # 事件已被淘汰，重新下发快照
+                cursor = None
+                continue
             
-        except Exception as e:
-            task_progress["status"] = "error"
-            task_progress["message"] = f"爬取任务失败: {str(e)}"
-            logger.error(f"爬取任务失败: {e}")
+            if events:
+                for seq, event, data in events:
+                    yield _sse_message(event, data, job_registry.make_token(seq))
+            if new_cursor != cursor and (not events or events[-1][0] != new_cursor):
+                # 其它任务的事件被过滤掉时也推进续传标记
+                yield f"id: {job_registry.make_token(new_cursor)}\n\n"
+            elif not events:
+                yield ": keepalive\n\n"
+            cursor = new_cursor
     
-    current_task = threading.Thread(target=crawl_task)
-    current_task.start()
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # 关闭反向代理缓冲
+    })
+
+@app.route('/api/jobs')
+def list_jobs():
+    """列出后台任务（可按 operation 过滤，active=1 只返回未结束的任务）"""
+    return jsonify({
+        'success': True,
+        'jobs': job_registry.list_jobs(
+            operation=request.args.get('operation'),
+            active_only=request.args.get('active') in ('1', 'true')
+        ),
+        'stats': job_registry.get_stats()
+    })
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """获取单个后台任务的详情（不含文章数据）"""
+    job = job_registry.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+    return jsonify({'success': True, 'job': job})
+
+@app.route('/api/jobs/<job_id>/articles')
+def get_job_articles(job_id):
+    """
+    分页获取任务的采集结果
+    参数: offset（默认0）、limit（默认50，最大500）、fields（逗号分隔的字段，如 title,url）
+    响应带 ETag，文章未变化时对 If-None-Match 返回 304
+    """
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(500, max(1, int(request.args.get('limit', 50))))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'offset/limit 必须是整数'}), 400
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
     
-    return jsonify({'success': True, 'message': '爬取任务已启动'})
+    page = job_registry.get_articles(job_id, offset, limit, fields)
+    if page is None:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+    
+    etag = hashlib.md5(f"{job_id}:{page['version']}:{offset}:{limit}:{','.join(fields)}".encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify({'success': True, 'job_id': job_id, **page})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
-@app.route('/api/progress')
-def get_progress():
-    """获取任务进度"""
-    return jsonify(task_progress)
+def _load_report_articles(target_date: str, articles: list) -> list:
+    """请求中没有文章时从缓存加载"""
+    if not articles:
+        # 该日期被任意一次采集（包括多日期采集）覆盖过都可以直接使用
+        articles = article_store.get_date_articles(target_date) or []
+    return articles
+
+def _save_report_files(result: dict, target_date: str):
+    """保存日报的JSON和Markdown文件，返回 (json路径, markdown路径)"""
+    report_file = os.path.join(Config.REPORTS_DIR, f"report_{target_date.replace('-', '')}.json")
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    
+    md_file = os.path.join(Config.REPORTS_DIR, f"report_{target_date.replace('-', '')}.md")
+    with open(md_file, 'w', encoding='utf-8') as f:
+        f.write(result['content'])
+    
+    return report_file, md_file
 
 @app.route('/api/generate_report', methods=['POST'])
 def generate_report():
@@ -348,35 +460,25 @@ def generate_report():
     try:
         data = request.json
         target_date = data.get('date', date.today().strftime('%Y-%m-%d'))
-        articles = data.get('articles', [])
-        
-        if not articles:
-            # 尝试从缓存加载
-            cache_file = os.path.join(Config.CACHE_DIR, f"articles_{target_date.replace('-', '')}.json")
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                    articles = cache_data.get('articles', [])
+        # 请求中没有文章时尝试从缓存加载
+        articles = _load_report_articles(target_date, data.get('articles', []))
         
         if not articles:
             return jsonify({'success': False, 'error': '没有可用的文章数据'}), 400
         
         logger.info(f"开始生成AI日报: {target_date}")
         
-        # 使用DeepSeek生成日报
+        # 使用DeepSeek生成日报（文章与提示词未变化时直接返回缓存，force_refresh 强制重新生成）
         api = DeepSeekAPI()
-        result = run_async(api.generate_daily_report(articles, target_date))
+        try:
+            result = run_async(api.generate_daily_report(articles, target_date,
+                                                         force_refresh=bool(data.get('force_refresh'))))
+        finally:
+            run_async(api.close_session())
         
         if result.get('success'):
             # 保存日报
-            report_file = os.path.join(Config.REPORTS_DIR, f"report_{target_date.replace('-', '')}.json")
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-            
-            # 保存markdown文件
-            md_file = os.path.join(Config.REPORTS_DIR, f"report_{target_date.replace('-', '')}.md")
-            with open(md_file, 'w', encoding='utf-8') as f:
-                f.write(result['content'])
+            report_file, md_file = _save_report_files(result, target_date)
             
             logger.info(f"AI日报生成成功: {target_date}")
             
@@ -401,6 +503,147 @@ def generate_report():
         
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/generate_report/stream', methods=['POST'])
+def generate_report_stream():
+    """
+    流式生成AI日报（Server-Sent Events）
+    依次推送 stage（分块初筛阶段说明）、delta（新增文本）事件，最后推送 done（完整结果、保存的文件和耗时统计）或 error 事件
+    """
+    data = request.json or {}
+    target_date = data.get('date', date.today().strftime('%Y-%m-%d'))
+    force_refresh = bool(data.get('force_refresh'))
+    
+    try:
+        articles = _load_report_articles(target_date, data.get('articles', []))
+        if not articles:
+            return jsonify({'success': False, 'error': '没有可用的文章数据'}), 400
+        api = DeepSeekAPI()
+    except Exception as e:
+        logger.error(f"生成日报时出错: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    logger.info(f"开始流式生成AI日报: {target_date}")
+    
+    async def report_events():
+        try:
+            async for event in api.generate_daily_report_stream(articles, target_date, force_refresh):
+                yield event
+        finally:
+            await api.close_session()
+    
+    def generate():
+        try:
+            for event in event_loop_service.iterate(report_events()):
+                if event['type'] == 'delta':
+                    yield _sse_message('delta', {'text': event['text']})
+                    continue
+                if event['type'] == 'stage':
+                    yield _sse_message('stage', {'message': event['message']})
+                    continue
+                
+                result = event['result']
+                if not result.get('success'):
+                    logger.error(f"日报生成失败: {result.get('error', '未知错误')}")
+                    yield _sse_message('error', {'error': result.get('error', '日报生成失败'),
+                                                 'stats': result.get('stats')})
+                    return
+                
+                report_file, md_file = _save_report_files(result, target_date)
+                logger.info(f"AI日报生成成功: {target_date}")
+                yield _sse_message('done', {
+                    'success': True,
+                    'report': result,
+                    'files': {
+                        'json': report_file,
+                        'markdown': md_file
+                    }
+                })
+        except Exception as e:
+            logger.error(f"流式生成日报时出错: {str(e)}")
+            yield _sse_message('error', {'error': str(e)})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/cache/stats')
+def get_cache_stats():
+    """文章缓存、AI日报缓存与页面缓存的命中统计"""
+    return jsonify({
+        'success': True,
+        'articles': article_store.get_stats(),
+        'reports': report_cache.get_stats(),
+        'pages': page_cache.get_stats()
+    })
+
+def _article_query_args():
+    """文章库查询的公共参数：start、end（YYYY-MM-DD）、sources（逗号分隔，如 tencent,aibase）"""
+    start_date = request.args.get('start') or None
+    end_date = request.args.get('end') or None
+    for value in (start_date, end_date):
+        if value:
+            datetime.strptime(value, '%Y-%m-%d')
+    sources = [s.strip() for s in request.args.get('sources', '').split(',') if s.strip()]
+    return start_date, end_date, sources or None
+
+@app.route('/api/articles')
+def get_articles():
+    """
+    按日期范围从文章库取历史文章
+    参数: start（必填）、end（默认同 start）、sources、offset（默认0）、limit（默认100，最大500）、content（1 时返回全文）
+    """
+    try:
+        start_date, end_date, sources = _article_query_args()
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(500, max(1, int(request.args.get('limit', 100))))
+    except ValueError:
+        return jsonify({'success': False, 'error': '日期格式应为 YYYY-MM-DD，offset/limit 必须是整数'}), 400
+    if not start_date:
+        return jsonify({'success': False, 'error': '缺少 start 参数'}), 400
+
+    articles = article_db.get_articles(start_date, end_date, sources, limit, offset,
+                                       with_content=request.args.get('content') in ('1', 'true'))
+    return jsonify({'success': True, 'articles': articles, 'count': len(articles), 'offset': offset})
+
+@app.route('/api/articles/search')
+def search_articles():
+    """
+    全文检索历史文章标题和内容
+    参数: q（关键词）、start、end、sources、limit（默认50，最大200）
+    """
+    keyword = request.args.get('q', '').strip()
+    if not keyword:
+        return jsonify({'success': False, 'error': '缺少 q 参数'}), 400
+    try:
+        start_date, end_date, sources = _article_query_args()
+        limit = min(200, max(1, int(request.args.get('limit', 50))))
+    except ValueError:
+        return jsonify({'success': False, 'error': '日期格式应为 YYYY-MM-DD，limit 必须是整数'}), 400
+
+    articles = article_db.search(keyword, start_date, end_date, sources, limit)
+    return jsonify({'success': True, 'query': keyword, 'articles': articles, 'count': len(articles)})
+
+@app.route('/api/articles/stats')
+def get_article_stats():
+    """文章库统计，以及按日期、数据源的文章数（参数: start、end、sources）"""
+    try:
+        start_date, end_date, sources = _article_query_args()
+    except ValueError:
+        return jsonify({'success': False, 'error': '日期格式应为 YYYY-MM-DD'}), 400
+    return jsonify({
+        'success': True,
+        'database': article_db.get_stats(),
+        'counts': article_db.count_by_source_day(start_date, end_date, sources)
+    })
+
+@app.route('/api/deepseek/stats')
+def get_deepseek_stats():
+    """最近的DeepSeek调用耗时（首字延迟 ttft、总耗时 latency、token用量、上下文缓存命中）和请求合并统计"""
+    return jsonify({'success': True, 'calls': list(recent_call_stats)[::-1],
+                    'context_cache': get_cache_summary(),
+                    'single_flight': single_flight.get_stats()})
+
 @app.route('/api/send_report', methods=['POST'])
 def send_report():
     """发送日报到Webhook"""
@@ -466,36 +709,41 @@ def save_report():
 
 @app.route('/api/generate_poster', methods=['POST'])
 def generate_poster():
-    """生成海报"""
-    global task_progress
+    """生成海报（在请求内同步执行，同时登记为后台任务以便查询进度与耗时）"""
+    data = request.json
+    content = data.get('content', '')
+    target_date = data.get('date', date.today().strftime('%Y-%m-%d'))
+    custom_html = data.get('html', None)
+    
+    if not content:
+        return jsonify({'success': False, 'error': '没有可生成海报的内容'}), 400
+    
+    try:
+        job_id = job_registry.create_job('generate_poster', name=f"海报 {target_date}",
+                                         params={'date': target_date, 'use_ai': data.get('use_ai', False)})
+    except JobLimitExceeded as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     
     try:
-        # 不要重置全局进度，让前端自己管理进度状态
-        # task_progress = {"status": "running", "progress": 0, "message": "开始生成海报...", "details": []}
-        
-        data = request.json
-        content = data.get('content', '')
-        target_date = data.get('date', date.today().strftime('%Y-%m-%d'))
-        custom_html = data.get('html', None)
-        
-        if not content:
-            return jsonify({'success': False, 'error': '没有可生成海报的内容'}), 400
-        
         logger.info("开始生成海报...")
         
         # 如果有自定义HTML，优先使用AI生成
         if not custom_html and data.get('use_ai', False):
             logger.info("使用AI生成HTML模板...")
+            job_registry.update(job_id, progress=10, message="正在调用AI生成海报HTML...")
             
             api = DeepSeekAPI()
             try:
                 html_result = run_async(api.generate_poster_html(content, target_date))
                 if html_result.get('success'):
                     custom_html = html_result['html']
+                    job_registry.add_detail(job_id, '✅ AI HTML模板生成成功')
                     logger.info("AI HTML模板生成成功")
                 else:
+                    job_registry.add_detail(job_id, f'⚠️ AI HTML生成失败，将使用默认模板: {html_result.get("error")}')
                     logger.warning(f"AI生成HTML失败，将使用默认模板: {html_result.get('error')}")
             except Exception as e:
+                job_registry.add_detail(job_id, f'⚠️ AI HTML生成异常，将使用默认模板: {str(e)}')
                 logger.error(f"AI生成HTML异常: {e}")
             finally:
                 # 确保关闭session
@@ -504,10 +752,12 @@ def generate_poster():
             logger.info("使用默认HTML模板")
         
         logger.info("生成海报图片...")
+        job_registry.update(job_id, progress=60, message="正在渲染海报图片...")
         
         # 生成海报
         generator = PosterGenerator()
         result = run_async(generator.generate_poster_from_report(content, target_date, custom_html))
+        result['job_id'] = job_id
         
         # 增强返回结果的信息
         if result.get('success'):
@@ -515,15 +765,19 @@ def generate_poster():
             result['html_source'] = html_source
             result['path'] = result['image_path']  # 添加前端期望的字段
             
+            job_registry.complete(job_id, f"海报生成完成（使用{html_source}）",
+                                  result={'image_path': result['image_path'], 'html_source': html_source})
             logger.info(f"海报生成成功，使用: {html_source}")
         else:
+            job_registry.fail(job_id, f"海报生成失败: {result.get('error')}")
             logger.error(f"海报生成失败: {result.get('error')}")
         
         return jsonify(result)
         
     except Exception as e:
+        job_registry.fail(job_id, f"海报生成异常: {str(e)}")
         logger.error(f"海报生成异常: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return jsonify({'success': False, 'error': str(e), 'job_id': job_id}), 500
 
 @app.route('/api/send_poster', methods=['POST'])
 def send_poster():
@@ -597,14 +851,10 @@ def list_files():
 @app.route('/api/crawl_multiple', methods=['POST'])
 def start_multiple_crawl():
     """开始多日期爬取任务"""
-    global current_task, task_progress
-    
-    if current_task and current_task.is_alive():
-        return jsonify({'success': False, 'error': '已有任务在运行中'}), 400
-    
     data = request.json
     date_input = data.get('dates', '')  # 可以是单个日期、日期列表或日期范围
     sources = data.get('sources', ['tencent', 'aibase'])
+    force_refresh = bool(data.get('force_refresh'))  # 不复用已采集过的（日期, 数据源）
     
     # 解析日期输入
     if isinstance(date_input, list):
@@ -624,49 +874,38 @@ def start_multiple_crawl():
     except ValueError:
         return jsonify({'success': False, 'error': '日期格式无效，请使用 YYYY-MM-DD 格式'}), 400
     
-    def crawl_task():
-        global task_progress
+    def crawl_task(job_id):
+        # 每个任务使用独立的采集器实例，进度回调互不覆盖
+        crawler = MultiDateCrawler()
         
-        try:
-            # 设置进度回调
-            def update_progress(progress_data):
-                global task_progress
-                task_progress.update(progress_data)
-                task_progress["articles"] = progress_data.get("articles", [])
-            
-            multi_date_crawler.set_progress_callback(update_progress)
-            
-            # 执行多日期采集
-            result = run_async(multi_date_crawler.crawl_multiple_dates(date_list, sources))
-            
-            if result['success']:
-                task_progress.update({
-                    "status": "completed",
-                    "progress": 100,
-                    "message": f"多日期采集完成！共获取 {result['total']} 篇文章",
-                    "articles": result['articles']
-                })
-            else:
-                task_progress.update({
-                    "status": "error",
-                    "progress": 0,
-                    "message": f"多日期采集失败: {result.get('error', '未知错误')}"
-                })
-                
-        except Exception as e:
-            task_progress.update({
-                "status": "error",
-                "progress": 0,
-                "message": f"多日期采集异常: {str(e)}"
-            })
-            logger.error(f"多日期采集异常: {e}")
+        def update_progress(progress_data):
+            job_registry.update(job_id, progress=progress_data.get('progress'),
+                                message=progress_data.get('message'))
+            job_registry.add_detail(job_id, *progress_data.get('details', []))
+        
+        crawler.set_progress_callback(update_progress)
+        
+        # 执行多日期采集
+        result = run_async(crawler.crawl_multiple_dates(date_list, sources, force_refresh))
+        
+        if result['success']:
+            job_registry.complete(job_id, f"多日期采集完成！共获取 {result['total']} 篇文章",
+                                  result={'total': result['total'], 'cache_key': result.get('cache_key'),
+                                          'reused': result.get('reused', []), 'errors': result.get('errors', [])},
+                                  articles=result['articles'])
+        else:
+            job_registry.fail(job_id, f"多日期采集失败: {result.get('error', '未知错误')}")
     
-    current_task = threading.Thread(target=crawl_task)
-    current_task.start()
+    try:
+        job_id = job_registry.start_job('crawl', crawl_task, name=f"多日期采集 {len(date_list)} 天",
+                                        params={'dates': date_list, 'sources': sources})
+    except JobLimitExceeded as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     
     return jsonify({
         'success': True, 
-        'message': f'多日期采集任务已启动，目标日期: {", ".join(date_list)}'
+        'message': f'多日期采集任务已启动，目标日期: {", ".join(date_list)}',
+        'job_id': job_id
     })
 
 @app.route('/api/scheduler/tasks', methods=['GET'])
@@ -788,13 +1027,9 @@ def get_task_status(job_id):
 def get_all_task_status():
     """获取所有任务的执行状态"""
     try:
-        all_status = {}
-        for job_id, status in scheduler_manager.task_status.items():
-            all_status[job_id] = status
-        
         return jsonify({
             'success': True,
-            'task_status': all_status
+            'task_status': scheduler_manager.get_all_task_status()
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -831,8 +1066,9 @@ def init_scheduler():
     except Exception as e:
         logger.error(f"定时任务调度器初始化失败: {e}")
 
-# 在应用启动时调用
-init_scheduler()
+# 在应用启动时调用（解析进程池以spawn方式启动工作进程时会重新导入主模块，工作进程中不启动调度器）
+if __name__ != '__mp_main__':
+    init_scheduler()
 
 if __name__ == '__main__':
     logger.info("启动AI资讯采集系统...")
@@ -0,0 +1,296 @@
+"""
+文章数据库（SQLite）
+所有采集到的文章按 URL / AIBase ID 去重后写入嵌入式SQLite库：
+- (date, source) 索引：按日期范围取文章、按数据源/日期计数
+- FTS5 全文索引（trigram 分词，支持中文子串检索）：跨历史搜索标题和内容
+查询无需再读取整份采集结果文件，SQLite不支持 FTS5/trigram 时退回 LIKE 检索
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from config import Config
+    ARTICLE_DB_CONFIG = Config.ARTICLE_DB_CONFIG
+    DEFAULT_DB_PATH = os.path.join(Config.CACHE_DIR, ARTICLE_DB_CONFIG.get('filename', 'articles.db'))
+except (ImportError, AttributeError):
+    ARTICLE_DB_CONFIG = {}
+    DEFAULT_DB_PATH = os.path.join('cache', 'articles.db')
+
+logger = logging.getLogger(__name__)
+
+_AIBASE_ID_RE = re.compile(r'/(\d+)/?$')
+
+# 文章列表返回的字段（不含全文，搜索结果另带摘录）
+ARTICLE_FIELDS = ('article_key', 'title', 'source', 'source_key', 'date', 'time_text', 'url', 'weight', 'updated_at')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    article_key TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    content TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    source_key TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    time_text TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    weight INTEGER NOT NULL DEFAULT 5,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_date_source ON articles(date, source_key);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, content, content='articles', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE OF title, content ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+"""
+
+UPSERT_SQL = """
+INSERT INTO articles (article_key, title, content, source, source_key, date, time_text, url, weight,
+                      created_at, updated_at)
+VALUES (:article_key, :title, :content, :source, :source_key, :date, :time_text, :url, :weight, :now, :now)
+ON CONFLICT(article_key) DO UPDATE SET
+    title = excluded.title,
+    content = CASE WHEN excluded.content != '' THEN excluded.content ELSE articles.content END,
+    source = excluded.source,
+    source_key = excluded.source_key,
+    date = excluded.date,
+    time_text = excluded.time_text,
+    url = excluded.url,
+    weight = excluded.weight,
+    updated_at = excluded.updated_at
+WHERE articles.title != excluded.title OR articles.content != excluded.content
+   OR articles.date != excluded.date OR articles.source_key != excluded.source_key
+"""
+
+
+def source_key_of(article: Dict) -> str:
+    """由来源名称推断数据源标识（tencent / aibase）"""
+    source = article.get('source', '') or ''
+    if '腾讯' in source:
+        return 'tencent'
+    if 'aibase' in source.lower():
+        return 'aibase'
+    return source.lower()
+
+
+def article_key_of(article: Dict, source_key: str) -> str:
+    """文章唯一键：AIBase 用新闻ID，其它用URL，都没有时用标题+日期+来源的哈希"""
+    url = (article.get('url') or '').strip()
+    if source_key == 'aibase':
+        news_id = article.get('id') or (_AIBASE_ID_RE.search(url).group(1) if _AIBASE_ID_RE.search(url) else None)
+        if news_id:
+            return f"aibase:{news_id}"
+    if url:
+        return f"url:{url}"
+    digest = hashlib.sha1(f"{article.get('title', '')}|{article.get('date', '')}|{source_key}".encode('utf-8'))
+    return f"hash:{digest.hexdigest()}"
+
+
+class ArticleDB:
+    """SQLite文章库（单连接 + 锁，WAL模式）"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.enabled = ARTICLE_DB_CONFIG.get('enabled', True)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.fts_enabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """懒连接并建表，调用方需持有锁"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            try:
+                conn.executescript(FTS_SCHEMA)
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                logger.warning(f"SQLite不支持FTS5 trigram分词，全文检索退回LIKE: {e}")
+                self.fts_enabled = False
+            self._conn = conn
+        return self._conn
+
+    def upsert_articles(self, articles: Iterable[Dict], target_date: str = None, source_key: str = None) -> int:
+        """
+        批量写入文章（已存在的按唯一键更新）
+        Args:
+            articles: 文章字典列表
+            target_date: 文章归属的日期（采集的目标日期），默认使用文章自带的 date
+            source_key: 数据源标识，默认由来源名称推断
+        Returns:
+            新增或有变化的文章数
+        """
+        if not self.enabled:
+            return 0
+        now = time.time()
+        rows = {}
+        for article in articles:
+            key = source_key or source_key_of(article)
+            row = {
+                'article_key': article_key_of(article, key),
+                'title': article.get('title') or '',
+                'content': article.get('content') or article.get('summary') or '',
+                'source': article.get('source') or '',
+                'source_key': key,
+                'date': target_date or article.get('date') or '',
+                'time_text': article.get('time_text') or '',
+                'url': article.get('url') or '',
+                'weight': article.get('weight') or 5,
+                'now': now
+            }
+            rows[row['article_key']] = row
+        if not rows:
+            return 0
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(UPSERT_SQL, list(rows.values()))
+                    # 内容没有变化的文章不会更新（见 UPSERT_SQL 的 WHERE），触发器写入的FTS行不便计数，按时间戳统计
+                    changed = conn.execute(
+                        'SELECT COUNT(*) FROM articles WHERE updated_at = ?', (now,)
+                    ).fetchone()[0]
+            logger.debug(f"文章库写入 {len(rows)} 篇，{changed} 篇新增或更新")
+            return changed
+        except Exception as e:
+            logger.warning(f"写入文章库失败: {e}")
+            return 0
+
+    def upsert_partitions(self, partitions, crawled=None) -> int:
+        """
+        写入按（日期, 数据源）分组的采集结果（与 article_store.put_crawl 的参数一致）
+        Args:
+            partitions: [(日期, 数据源, 文章列表)]
+            crawled: 只写入本次实际采集的（日期, 数据源），复用的结果已在库中；None 表示全部写入
+        Returns:
+            新增或有变化的文章数
+        """
+        crawled = None if crawled is None else set(crawled)
+        changed = 0
+        for target_date, source, articles in partitions:
+            if crawled is None or (target_date, source) in crawled:
+                changed += self.upsert_articles(articles, target_date=target_date, source_key=source)
+        return changed
+
+    @staticmethod
+    def _filters(start_date: str = None, end_date: str = None, sources: List[str] = None, alias: str = 'a'):
+        clauses = []
+        params = []
+        if start_date:
+            clauses.append(f'{alias}.date >= ?')
+            params.append(start_date)
+        if end_date:
+            clauses.append(f'{alias}.date <= ?')
+            params.append(end_date)
+        if sources:
+            clauses.append(f"{alias}.source_key IN ({','.join('?' * len(sources))})")
+            params.extend(sources)
+        return clauses, params
+
+    def _query(self, sql: str, params: list) -> List[Dict]:
+        if not self.enabled:
+            return []
+        with self._lock:
+            return [dict(row) for row in self._connect().execute(sql, params).fetchall()]
+
+    def get_articles(self, start_date: str, end_date: str = None, sources: List[str] = None,
+                     limit: int = 500, offset: int = 0, with_content: bool = False) -> List[Dict]:
+        """
+        按日期范围取文章（日期升序，同一天内按数据源、写入顺序）
+        Args:
+            with_content: 是否返回全文
+        """
+        clauses, params = self._filters(start_date, end_date or start_date, sources)
+        fields = ', '.join(f'a.{field}' for field in ARTICLE_FIELDS + (('content',) if with_content else ()))
+        sql = (f"SELECT {fields} FROM articles a WHERE {' AND '.join(clauses)} "
+               f"ORDER BY a.date, a.source_key, a.id LIMIT ? OFFSET ?")
+        return self._query(sql, params + [limit, offset])
+
+    def search(self, keyword: str, start_date: str = None, end_date: str = None,
+               sources: List[str] = None, limit: int = 50) -> List[Dict]:
+        """
+        跨历史搜索标题和内容
+        Returns:
+            文章列表（带 snippet 摘录），全文索引可用时按相关度、否则按日期倒序
+        """
+        keyword = (keyword or '').strip()
+        if not keyword:
+            return []
+        clauses, params = self._filters(start_date, end_date, sources)
+        fields = ', '.join(f'a.{field}' for field in ARTICLE_FIELDS)
+
+        # trigram 分词至少需要3个字符，更短的关键词用 LIKE
+        if self.fts_enabled and len(keyword) >= 3:
+            query = '"' + keyword.replace('"', '""') + '"'
+            where = ' AND '.join(['articles_fts MATCH ?'] + clauses)
+            sql = (f"SELECT {fields}, snippet(articles_fts, 1, '【', '】', '…', 24) AS snippet "
+                   f"FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+                   f"WHERE {where} ORDER BY bm25(articles_fts, 10.0, 1.0), a.date DESC LIMIT ?")
+            return self._query(sql, [query] + params + [limit])
+
+        pattern = '%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        where = ' AND '.join(["(a.title LIKE ? ESCAPE '\\' OR a.content LIKE ? ESCAPE '\\')"] + clauses)
+        sql = (f"SELECT {fields}, substr(a.content, 1, 80) AS snippet FROM articles a "
+               f"WHERE {where} ORDER BY a.date DESC, a.id DESC LIMIT ?")
+        return self._query(sql, [pattern, pattern] + params + [limit])
+
+    def count_by_source_day(self, start_date: str = None, end_date: str = None,
+                            sources: List[str] = None) -> List[Dict]:
+        """按日期、数据源统计文章数 [{'date', 'source_key', 'count'}]"""
+        clauses, params = self._filters(start_date, end_date, sources)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = (f"SELECT a.date, a.source_key, COUNT(*) AS count FROM articles a {where} "
+               f"GROUP BY a.date, a.source_key ORDER BY a.date DESC, a.source_key")
+        return self._query(sql, params)
+
+    def get_stats(self) -> Dict:
+        """文章库统计"""
+        if not self.enabled:
+            return {'enabled': False}
+        with self._lock:
+            conn = self._connect()
+            total, first_date, last_date = conn.execute(
+                'SELECT COUNT(*), MIN(date), MAX(date) FROM articles'
+            ).fetchone()
+        return {
+            'enabled': True,
+            'total': total,
+            'first_date': first_date,
+            'last_date': last_date,
+            'fts': 'fts5-trigram' if self.fts_enabled else 'like',
+            'size_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 全局实例
+article_db = ArticleDB()
@@ -0,0 +1,418 @@
+"""
+统一的文章缓存
+采集结果、多日期合并结果等都通过这里读写，不再各自写 articles_*.json 文件：
+- 数据按内容的SHA-256哈希存放（objects/<hash>.json），名称（如 articles_20250101）只是指向内容的引用，内容相同的结果只存一份
+- 按 CACHE_CONFIG 的 expire_hours 过期，按条目数（max_cache_files）和总大小（max_size_mb）淘汰最久未访问的条目
+- 最近访问的条目保留在内存中（memory_entries），命中时无需读盘和解析JSON
+- 按（日期, 数据源）登记每份采集结果所在的条目和采集时间，生成日报和新的采集都可以复用任意一次采集（包括多日期采集）的结果
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from config import Config
+    CACHE_CONFIG = Config.CACHE_CONFIG
+    DEFAULT_STORE_DIR = os.path.join(Config.CACHE_DIR, 'articles')
+except (ImportError, AttributeError):
+    CACHE_CONFIG = {}
+    DEFAULT_STORE_DIR = os.path.join('cache', 'articles')
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(data: Any) -> str:
+    """计算内容哈希（键顺序无关）"""
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def date_entry_name(target_date: str) -> str:
+    """单日采集结果的条目名称"""
+    return f"articles_{target_date.replace('-', '')}"
+
+
+def range_entry_name(date_list) -> str:
+    """多日期采集结果的条目名称"""
+    date_range = f"{date_list[0]}_to_{date_list[-1]}" if len(date_list) > 1 else date_list[0]
+    return f"articles_multi_{date_range.replace('-', '')}"
+
+
+def _partition_key(target_date: str, source: str) -> str:
+    return f"{target_date}|{source}"
+
+
+class ArticleStore:
+    """内容寻址的文章缓存：磁盘存储 + 内存LRU"""
+
+    def __init__(self, store_dir: str = None, expire_hours: float = None, max_entries: int = None,
+                 max_size_mb: float = None, memory_entries: int = None):
+        self.store_dir = store_dir or DEFAULT_STORE_DIR
+        self.objects_dir = os.path.join(self.store_dir, 'objects')
+        self.refs_file = os.path.join(self.store_dir, 'refs.json')
+        self.index_file = os.path.join(self.store_dir, 'index.json')
+        self.enabled = CACHE_CONFIG.get('enabled', True)
+        self.ttl_seconds = (expire_hours or CACHE_CONFIG.get('expire_hours', 24)) * 3600
+        self.max_entries = max_entries or CACHE_CONFIG.get('max_cache_files', 100)
+        self.max_bytes = int((max_size_mb or CACHE_CONFIG.get('max_size_mb', 200)) * 1024 * 1024)
+        self.memory_entries = memory_entries if memory_entries is not None else CACHE_CONFIG.get('memory_entries', 16)
+        self.reuse_hours = CACHE_CONFIG.get('crawl_reuse_hours', 12)
+
+        self._lock = threading.RLock()
+        self._refs: Optional[Dict[str, Dict]] = None  # 名称 -> {key, created_at, accessed_at, size, meta}
+        self._index: Optional[Dict[str, Dict]] = None  # "日期|数据源" -> {entry, start, end, count, crawled_at}
+        self._memory: OrderedDict = OrderedDict()      # 内容哈希 -> 数据
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _load_refs(self) -> Dict[str, Dict]:
+        """懒加载引用表，调用方需持有锁"""
+        if self._refs is None:
+            try:
+                with open(self.refs_file, 'r', encoding='utf-8') as f:
+                    self._refs = json.load(f)
+            except FileNotFoundError:
+                self._refs = {}
+            except Exception as e:
+                logger.warning(f"读取文章缓存索引失败，将重新建立: {e}")
+                self._refs = {}
+        return self._refs
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """懒加载（日期, 数据源）索引，调用方需持有锁"""
+        if self._index is None:
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except FileNotFoundError:
+                self._index = {}
+            except Exception as e:
+                logger.warning(f"读取采集索引失败，将重新建立: {e}")
+                self._index = {}
+        return self._index
+
+    def _write_json(self, path: str, data: Dict):
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _save_refs(self):
+        """原子写入引用表，并删除指向已不存在条目的索引，调用方需持有锁"""
+        self._write_json(self.refs_file, self._refs)
+        index = self._load_index()
+        for partition in [partition for partition, item in index.items() if item['entry'] not in self._refs]:
+            del index[partition]
+        self._write_json(self.index_file, index)
+
+    def _object_path(self, key: str) -> str:
+        return os.path.join(self.objects_dir, f"{key}.json")
+
+    def _remember(self, key: str, data: Any):
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def put(self, name: str, data: Any, meta: Dict = None) -> Optional[str]:
+        """
+        写入一个条目
+        Args:
+            name: 条目名称（如 articles_20250101）
+            data: 可JSON序列化的数据
+            meta: 附加信息（日期、数据源等）
+        Returns:
+            内容哈希；缓存未启用或写入失败时返回 None
+        """
+        if not self.enabled:
+            return None
+        key = content_key(data)
+        with self._lock:
+            try:
+                refs = self._load_refs()
+                path = self._object_path(key)
+                if not os.path.exists(path):
+                    os.makedirs(self.objects_dir, exist_ok=True)
+                    tmp_path = f"{path}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, ensure_ascii=False)
+                    os.replace(tmp_path, path)
+                now = time.time()
+                refs[name] = {
+                    'key': key,
+                    'created_at': now,
+                    'accessed_at': now,
+                    'size': os.path.getsize(path),
+                    'meta': meta or {}
+                }
+                self._remember(key, data)
+                self._evict()
+                self._save_refs()
+                return key
+            except Exception as e:
+                logger.warning(f"写入文章缓存失败 {name}: {e}")
+                return None
+
+    def get(self, name: str, max_age_hours: float = None) -> Optional[Any]:
+        """
+        读取一个条目
+        Args:
+            name: 条目名称
+            max_age_hours: 比 expire_hours 更严格的有效期（可选）
+        Returns:
+            数据；不存在、已过期或读取失败时返回 None
+        """
+        entry = self.get_entry(name, max_age_hours)
+        return entry['data'] if entry else None
+
+    def get_entry(self, name: str, max_age_hours: float = None) -> Optional[Dict]:
+        """读取一个条目及其元数据 {'name', 'key', 'created_at', 'meta', 'data'}"""
+        if not self.enabled:
+            return None
+        ttl = self.ttl_seconds
+        if max_age_hours is not None:
+            ttl = min(ttl, max_age_hours * 3600)
+        with self._lock:
+            ref = self._load_refs().get(name)
+            if not ref or time.time() - ref['created_at'] > ttl:
+                self.misses += 1
+                return None
+
+            key = ref['key']
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                data = self._memory[key]
+                self.memory_hits += 1
+            else:
+                try:
+                    with open(self._object_path(key), 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except Exception as e:
+                    logger.warning(f"读取文章缓存失败 {name}: {e}")
+                    self._refs.pop(name, None)
+                    self.misses += 1
+                    return None
+                self._remember(key, data)
+                self.disk_hits += 1
+            ref['accessed_at'] = time.time()
+            return {
+                'name': name,
+                'key': key,
+                'created_at': ref['created_at'],
+                'meta': ref.get('meta', {}),
+                'data': data
+            }
+
+    def put_crawl(self, name: str, partitions: Iterable[Tuple[str, str, List]], meta: Dict = None,
+                  indexed: Iterable[Tuple[str, str]] = None,
+                  partial: Iterable[Tuple[str, str]] = None) -> Optional[str]:
+        """
+        写入一次采集结果，并登记其中各（日期, 数据源）的位置和采集时间
+        Args:
+            name: 条目名称
+            partitions: [(日期, 数据源, 文章列表)]，按合并顺序排列
+            meta: 附加信息
+            indexed: 本次实际采集的（日期, 数据源），默认为全部；复用的旧结果改为指向本条目中的位置，保留其原采集时间
+            partial: 其中采集不完整的（日期, 数据源）（部分页面获取失败等），登记为 complete=False，
+                仍可用于生成日报，但不作为新采集任务可复用的结果
+        Returns:
+            内容哈希；缓存未启用或写入失败时返回 None
+        """
+        articles = []
+        slices = []
+        for target_date, source, part in partitions:
+            start = len(articles)
+            articles.extend(part)
+            slices.append((target_date, source, start, len(articles)))
+        indexed = None if indexed is None else set(indexed)
+        partial = set(partial or ())
+        # 条目内各分区的位置也记在元数据中，索引被覆盖后仍可按数据源读取（见 get_date_articles）
+        meta = dict(meta or {}, partitions={_partition_key(target_date, source): [start, end]
+                                            for target_date, source, start, end in slices})
+
+        with self._lock:
+            key = self.put(name, articles, meta)
+            if key is None:
+                return None
+            index = self._load_index()
+            now = time.time()
+            for target_date, source, start, end in slices:
+                partition = _partition_key(target_date, source)
+                previous = index.get(partition)
+                if indexed is None or (target_date, source) in indexed:
+                    # 采集结果为空的不登记（可能是采集失败或尚未发布），下次仍重新采集
+                    if end > start:
+                        index[partition] = {'entry': name, 'start': start, 'end': end,
+                                            'count': end - start, 'crawled_at': now,
+                                            'complete': (target_date, source) not in partial}
+                elif previous and end > start and previous.get('count') == end - start:
+                    # 复用的结果已复制到本条目：改为指向本条目（原条目之后可能被淘汰或被同名采集覆盖），
+                    # 保留原采集时间和完整性标记
+                    index[partition] = dict(previous, entry=name, start=start, end=end)
+            # 同名条目中已不存在的分区
+            present = {_partition_key(target_date, source) for target_date, source, _, _ in slices}
+            for partition in [partition for partition, item in index.items()
+                              if item['entry'] == name and partition not in present]:
+                del index[partition]
+            self._write_json(self.index_file, index)
+            return key
+
+    def get_partition(self, target_date: str, source: str, max_age_hours: float = None) -> Optional[List]:
+        """
+        读取某个日期、某个数据源的文章（来自登记过的任意一次采集）
+        Args:
+            max_age_hours: 比 expire_hours 更严格的有效期（可选，按采集时间计算）
+        Returns:
+            文章列表；没有登记、已过期或所在条目已被淘汰时返回 None
+        """
+        if not self.enabled:
+            return None
+        ttl = self.ttl_seconds
+        if max_age_hours is not None:
+            ttl = min(ttl, max_age_hours * 3600)
+        with self._lock:
+            item = self._load_index().get(_partition_key(target_date, source))
+            if not item or time.time() - item['crawled_at'] > ttl:
+                return None
+            entry = self.get_entry(item['entry'])
+            if entry is None:
+                self._index.pop(_partition_key(target_date, source), None)
+                return None
+            return entry['data'][item['start']:item['end']]
+
+    def get_reusable(self, target_date: str, source: str) -> Optional[Tuple[List, float]]:
+        """
+        新的采集任务可以直接复用的结果（crawl_reuse_hours 内完整采集过的）
+        Returns:
+            (文章列表, 采集时间戳)；不可复用时返回 None
+        """
+        if not self.reuse_hours:
+            return None
+        with self._lock:
+            articles = self.get_partition(target_date, source, max_age_hours=self.reuse_hours)
+            if articles is None:
+                return None
+            item = self._index[_partition_key(target_date, source)]
+            if item.get('complete') is False:
+                logger.info(f"{target_date} {source} 上次采集不完整，重新采集")
+                return None
+            return articles, item['crawled_at']
+
+    def _entry_partition(self, name: str, target_date: str, source: str) -> Optional[List]:
+        """按条目元数据中记录的位置读取其中某个（日期, 数据源）的文章"""
+        entry = self.get_entry(name)
+        if entry is None:
+            return None
+        bounds = entry['meta'].get('partitions', {}).get(_partition_key(target_date, source))
+        return entry['data'][bounds[0]:bounds[1]] if bounds else None
+
+    def get_date_articles(self, target_date: str, sources: List[str] = None) -> Optional[List]:
+        """
+        读取某个日期的文章：按数据源顺序合并登记过的采集结果，某个数据源没有登记时读取该日期单日采集条目中的对应部分，
+        都没有登记时读取整个单日采集条目
+        Returns:
+            文章列表；都没有时返回 None
+        """
+        articles = []
+        found = False
+        for source in sources or ['tencent', 'aibase']:
+            part = self.get_partition(target_date, source)
+            if part is None:
+                part = self._entry_partition(date_entry_name(target_date), target_date, source)
+            if part is not None:
+                articles.extend(part)
+                found = True
+        if found:
+            return articles
+        return self.get(date_entry_name(target_date))
+
+    def object_path(self, name: str) -> Optional[str]:
+        """条目内容所在的文件路径"""
+        with self._lock:
+            ref = self._load_refs().get(name)
+            return self._object_path(ref['key']) if ref else None
+
+    def delete(self, name: str):
+        """删除一个条目（内容没有其它引用时一并删除）"""
+        with self._lock:
+            if self._load_refs().pop(name, None) is not None:
+                self._collect_garbage()
+                self._save_refs()
+
+    def _evict(self, max_entries: int = None):
+        """删除过期条目，再按最近访问时间淘汰超出条目数或总大小的条目，调用方需持有锁"""
+        max_entries = max_entries or self.max_entries
+        refs = self._load_refs()
+        now = time.time()
+        for name in [name for name, ref in refs.items() if now - ref['created_at'] > self.ttl_seconds]:
+            del refs[name]
+            self.evictions += 1
+
+        def total_bytes():
+            sizes = {ref['key']: ref.get('size', 0) for ref in refs.values()}
+            return sum(sizes.values())
+
+        ordered = sorted(refs, key=lambda name: refs[name]['accessed_at'])
+        while ordered and (len(refs) > max_entries or total_bytes() > self.max_bytes):
+            name = ordered.pop(0)
+            del refs[name]
+            self.evictions += 1
+            logger.debug(f"淘汰文章缓存: {name}")
+
+        self._collect_garbage()
+
+    def _collect_garbage(self):
+        """删除没有引用的内容文件，调用方需持有锁"""
+        if not os.path.isdir(self.objects_dir):
+            return
+        live = {ref['key'] for ref in self._refs.values()}
+        for filename in os.listdir(self.objects_dir):
+            key = filename[:-len('.json')] if filename.endswith('.json') else None
+            if key and key not in live:
+                try:
+                    os.remove(os.path.join(self.objects_dir, filename))
+                except FileNotFoundError:
+                    pass
+                self._memory.pop(key, None)
+
+    def cleanup(self, max_entries: int = None) -> int:
+        """立即执行过期和容量淘汰，返回删除的条目数"""
+        with self._lock:
+            before = self.evictions
+            self._evict(max_entries)
+            self._save_refs()
+            return self.evictions - before
+
+    def get_stats(self) -> Dict:
+        """缓存统计"""
+        with self._lock:
+            refs = self._load_refs()
+            objects = {ref['key']: ref.get('size', 0) for ref in refs.values()}
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(refs),
+                'objects': len(objects),
+                'size_bytes': sum(objects.values()),
+                'memory_entries': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'indexed_partitions': len(self._load_index())
+            }
+
+
+# 全局实例
+article_store = ArticleStore()
@@ -0,0 +1,88 @@
+"""
+AIBase 快讯页面解析微基准
+使用本地生成的仿真页面（不访问网络），统计 _parse_news_from_html 每秒可解析的页面数
+
+用法:
+    python bench_aibase_parse.py [--pages 200] [--rounds 5]
+"""
+import argparse
+import random
+import time
+
+from scrapers.aibase_news_scraper import AIBaseNewsScraper
+
+
+def build_sample_page(news_id: int) -> str:
+    """生成结构接近 news.aibase.com 快讯详情页的HTML（含大段脚本、相关推荐和图片）"""
+    rnd = random.Random(news_id)
+    words = ['模型', '推理', '开源', '发布', '训练', '多模态', '智能体', 'Agent', 'GPU', '数据集', '评测', '参数']
+
+    def sentence(n):
+        return ''.join(rnd.choice(words) for _ in range(n)) + '。'
+
+    paragraphs = ''.join(f'<p class="text">{sentence(rnd.randint(15, 40))}</p>\n' for _ in range(rnd.randint(6, 12)))
+    images = ''.join(
+        f'<p><img src="https://upload.chinaz.com/2026/1017/{news_id}{i}.png" alt="配图{i}"></p>\n'
+        for i in range(rnd.randint(1, 3))
+    )
+    related = ''.join(
+        f'<div class="item"><a href="/zh/news/{news_id - i}"><h3 class="title">{sentence(8)}</h3></a>'
+        f'<p>{sentence(10)}</p><img src="/static/thumb/{i}.jpg" class="thumb"></div>\n'
+        for i in range(1, 21)
+    )
+    nuxt_state = ','.join(f'"k{i}":"{sentence(6)}"' for i in range(3000))
+
+    return f"""<!DOCTYPE html>
+<html lang="zh">
+<head>
+<meta charset="utf-8">
+<title>{sentence(6)} - AIBase快讯</title>
+<meta property="og:title" content="{sentence(6)}">
+<link rel="icon" href="/favicon.ico">
+<script>window.__NUXT__={{{nuxt_state}}}</script>
+<style>.text{{line-height:1.8}}.logo{{width:40px}}</style>
+</head>
+<body>
+<header><img src="/static/logo.png" class="logo"><nav><a href="/">首页</a><a href="/zh/news">快讯</a></nav></header>
+<main>
+<h1 class="news-title">{sentence(10)}</h1>
+<div class="meta"><span>发布时间 : 2026年10月17日 {rnd.randint(0, 23)}:{rnd.randint(0, 59):02d}</span><span>AIbase基地</span></div>
+<div class="post-content">
+{paragraphs}{images}</div>
+<div class="share"><p>分享</p><p>收藏</p></div>
+<section class="related"><h2>相关推荐</h2>
+{related}</section>
+</main>
+<footer><p>© 2026 AIbase 版权所有，转载请注明来源</p></footer>
+</body>
+</html>"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200, help='每轮解析的页面数')
+    parser.add_argument('--rounds', type=int, default=5, help='重复轮数（取最快一轮）')
+    args = parser.parse_args()
+
+    scraper = AIBaseNewsScraper()
+    pages = [(20000 + i, build_sample_page(20000 + i)) for i in range(args.pages)]
+    avg_kb = sum(len(html) for _, html in pages) / len(pages) / 1024
+
+    # 预热并校验解析结果
+    sample = scraper._parse_news_from_html(*pages[0])
+    assert sample and sample['title'] and sample['content'], "样例页面解析失败"
+
+    best = None
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        for news_id, html in pages:
+            scraper._parse_news_from_html(news_id, html)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"页面数: {args.pages}，平均大小: {avg_kb:.1f} KB，轮数: {args.rounds}")
+    print(f"最快一轮: {best:.3f}s，{args.pages / best:.1f} 页/秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -32,7 +32,31 @@ class Config:
         'concurrent_limit': 4,
         'request_timeout': 30,
         'retry_count': 3,
-        'delay_between_requests': 1
+        'delay_between_requests': 1,
+        'multi_date_mode': 'concurrent',  # 多日期采集：concurrent 按(日期, 数据源)并发；sequential 逐日采集
+        'source_concurrency': {           # 各数据源同时运行的任务数上限（总数仍受 concurrent_limit 限制）
+            'aibase': 3                   # 腾讯研究院列表页一次覆盖所有日期，只有一个任务
+        },
+        'parse_executor': 'thread',       # AIBase页面解析方式：inline / thread / process（多核机器可用 process）
+        'parse_workers': 0                # 解析工作者数量，0 表示CPU核数
+    }
+    
+    # 浏览器池配置（Playwright，搜狐采集与海报渲染共用）
+    BROWSER_POOL_CONFIG = {
+        'pool_size': 4,               # 同时借出的页面数上限
+        'max_pages_per_browser': 50,  # 单个Chromium进程服务多少页面后回收重启
+        'headless': True,
+        'idle_timeout': 300           # 空闲多少秒后关闭Chromium（下次使用时再启动）
+    }
+    
+    # 任务注册表配置（采集、海报、定时任务等后台任务共用）
+    JOB_CONFIG = {
+        'max_concurrent_jobs': 3,     # 同时运行的任务数上限
+        'max_details': 200,           # 每个任务保留的明细日志条数
+        'max_finished_jobs': 50,      # 保留的已结束任务数，超出后删除最早结束的
+        'max_events': 1000,           # 进度流可续传的事件数（断线超过此数量后重新下发快照）
+        'stream_keepalive': 15,       # 进度流无事件时的心跳间隔（秒）
+        'stream_timeout': 300         # 单个进度流连接的最长时间（秒），到期后浏览器自动重连续传
     }
     
     # 图片配置
@@ -44,11 +68,50 @@ class Config:
         'poster_height': 844   # iPhone 14 Pro Max 标准高度，支持内容自适应
     }
     
-    # 缓存配置
+    # 缓存配置（采集结果统一由 article_store 管理）
     CACHE_CONFIG = {
         'enabled': True,
-        'expire_hours': 24,
-        'max_cache_files': 100
+        'expire_hours': 24,       # 缓存有效期
+        'max_cache_files': 100,   # 最多保留的条目数
+        'max_size_mb': 200,       # 缓存内容总大小上限
+        'memory_entries': 16,     # 保留在内存中的最近访问条目数
+        'crawl_reuse_hours': 12   # 新的采集任务直接复用多少小时内已采集过的（日期, 数据源），0 表示不复用
+    }
+    
+    # AI日报缓存配置（文章、提示词模板、模型、温度都相同时复用上次生成的日报）
+    REPORT_CACHE_CONFIG = {
+        'enabled': True,
+        'ttl_hours': 72,      # 缓存有效期
+        'max_entries': 200,   # 最多保留的日报数
+        'max_size_mb': 50     # 缓存目录总大小上限
+    }
+    
+    # 页面缓存配置（AIBase快讯页、搜狐文章页的原始内容，gzip压缩保存在 cache/pages）
+    PAGE_CACHE_CONFIG = {
+        'enabled': True,
+        'fresh_hours': 72,      # 多少小时内直接使用缓存不发请求，超过后带 ETag/Last-Modified 条件请求重新验证
+        'max_age_days': 30,     # 超过多少天未验证的页面删除
+        'max_size_mb': 300,     # 缓存总大小上限（压缩后），超出时淘汰最久未验证的页面
+        'evict_interval': 200   # 每写入多少个页面执行一次清理
+    }
+    
+    # 文章数据库配置（SQLite，按日期/数据源查询和全文检索历史文章）
+    ARTICLE_DB_CONFIG = {
+        'enabled': True,
+        'filename': 'articles.db'   # 保存在缓存目录下
+    }
+    
+    # 资讯近似去重配置（生成日报前合并腾讯研究院与AIBase之间、AIBase快讯之间的重复资讯）
+    DEDUP_CONFIG = {
+        'enabled': True,
+        'similarity_threshold': 0.5,      # MinHash 估计的Jaccard相似度达到此值视为重复
+        'containment_threshold': 0.6,     # 或较短一方有此比例的内容包含在另一方中（单条速递与更长的快讯）
+        'min_containment_shingles': 20,   # 较短一方的 shingle 数少于此值时不按包含度判断
+        'digest_sources': ['腾讯研究院'],  # 按“一、二、……”拆成单条再比较的速递来源
+        'shingle_size': 3,                # 字符 shingle 长度
+        'num_perm': 64,                   # MinHash 签名长度
+        'bands': 32,                      # LSH 分段数（num_perm 需能被整除，每段行数越少候选召回越高）
+        'max_chars': 400                  # 参与比较的内容字数（标题 + 内容开头）
     }
     
     # 目录配置
@@ -80,11 +143,21 @@ class Config:
         'max_articles': 15,
         'min_score_threshold': 6,
         'tencent_weight': 8,
-        'aibase_weight': 5
+        'aibase_weight': 5,
+        'input_token_budget': 24000,      # 日报提示词的输入token预算（本地估算，超出时压缩或舍弃低权重文章）
+        'max_sentences_per_article': 4,   # 每篇文章最多保留的句子数
+        'max_chars_per_article': 360,     # 每篇文章内容的最大字数
+        'map_reduce_threshold': 80,       # 文章数超过此值时改用分块初筛+汇总生成日报
+        'map_chunk_size': 25,             # 每个初筛分块的文章数
+        'map_concurrency': 4,             # 同时进行的初筛请求数
+        'map_keep_per_chunk': 8,          # 每个分块最多入选的资讯数
+        'reduce_max_items': 60            # 汇总生成日报时使用的入选资讯数上限
     }
     
-    # AI处理提示词模板
-    AI_PROMPT_TEMPLATE = """你是一位专业的AI资讯编辑，请根据以下采集的资讯生成今日AI日报。
+    # AI处理提示词
+    # 固定的指令放在系统消息中、每天变化的日期和资讯放在用户消息中，请求前缀保持不变，
+    # 可以命中DeepSeek的上下文硬盘缓存（prompt_cache_hit_tokens），降低首字延迟和输入费用
+    AI_REPORT_SYSTEM_PROMPT = """你是一位专业的AI资讯编辑，请根据用户提供的采集资讯生成今日AI日报。
 
 资讯来源及评分标准：
 1. 腾讯研究院AI速递（权重8分）- 深度内容，行业洞察
@@ -104,20 +177,56 @@ class Config:
 
 输出要求：
 1. 生成精炼的AI日报，使用Markdown格式
-2. 包含日报标题“AI前哨日报”（包含具体日期：{date}）
+2. 包含日报标题“AI前哨日报”（包含具体日期，即用户消息中的采集时间）
 3. 分类整理：
    - 🔥 核心要闻（4条最重要的）
    - 🚀 技术动态（4条技术相关）
    - 👀 行业观察（4条趋势分析）
 4. 每条资讯包含：标题、核心内容（2-3句话概括）
 5. 适合金山文档群聊展示，简洁明了
-6. 底部不要有类似“基于腾讯研究院AI速讯和AIBase快讯生成”的描述
-
-采集时间：{date}
+6. 底部不要有类似“基于腾讯研究院AI速讯和AIBase快讯生成”的描述"""
+    
+    # 日报用户消息模板
+    AI_PROMPT_TEMPLATE = """采集时间：{date}
 原始资讯内容：
 {content}
 
 请开始生成日报："""
+    
+    # 分块初筛提示词（文章较多时先分块筛选打分，再用入选资讯生成日报）
+    AI_MAP_SYSTEM_PROMPT = """你是一位专业的AI资讯编辑，正在为AI日报初筛资讯。
+
+请阅读用户提供的资讯，去除重复、广告软文和无关内容，为保留的资讯打分（1-10分，综合来源权重与内容质量），
+并用1-2句话概括核心内容。按分数从高到低排列，保留条数不超过用户消息中的上限。
+
+只输出JSON数组，不要输出其它文字，格式如下：
+[{"id": 资讯编号, "score": 分数, "summary": "核心内容概括"}]"""
+    
+    AI_MAP_PROMPT_TEMPLATE = """日报日期：{date}
+最多保留：{keep}条
+原始资讯内容：
+{content}"""
+    
+    # 海报HTML提示词
+    AI_POSTER_SYSTEM_PROMPT = """设计一个视觉冲击力强的AI资讯海报。
+
+设计要求：
+1. 布局：530px宽度，高度自适应，苹果风格极简设计
+2. 标题：“AI前哨日报”，超大字号(56px)，排版靠左，黑色粗体，吸引眼球，标题下方有一个日期（用户消息中的日期），小字号
+3. 内容：每条不超过50字 根据日报的三大板块划分：核心要闻，技术动态，行业观察，根据原顺序分点列出卡片
+4. 视觉元素：
+   - 使用emoji图标增强视觉效果
+   - 数字和关键词用红色高亮
+   - 添加渐变色块作为装饰元素
+5. 排版：大量留白，信息层次分明，一眼看懂
+
+注意：
+- 每条信息精炼（标题+几句话说明）
+- 突出数字和关键成果
+- 直接输出完整HTML代码，不要任何markdown标记"""
+    
+    AI_POSTER_PROMPT_TEMPLATE = """将以下日报内容提炼成海报（{date}）：
+{report_content}"""
 
 # 环境变量配置示例
 ENV_TEMPLATE = """# AI资讯采集系统环境变量配置
@@ -0,0 +1,297 @@
+"""
+资讯近似去重
+同一条新闻经常同时出现在腾讯研究院AI速递和多条AIBase快讯中。生成日报前先在本地用 MinHash
+（标题+内容的字符 shingle）找出近似重复的文章，每组只保留一篇代表文章并合并来源，
+不再把重复资讯交给DeepSeek去重，减少输入token和延迟。
+腾讯研究院AI速递一篇包含多条资讯，先按“一、二、……”拆成单条再比较；某条与快讯重复时，
+这篇速递按条输出，重复的快讯合并到对应的那一条上，不会被整篇速递吞掉。
+安装了 NumPy 时签名计算和相似度校验向量化执行，否则使用纯Python实现（结果相同）
+"""
+import logging
+import random
+import re
+import zlib
+from typing import Dict, List, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from config import Config
+    DEDUP_CONFIG = Config.DEDUP_CONFIG
+except (ImportError, AttributeError):
+    DEDUP_CONFIG = {}
+
+from prompt_builder import estimate_tokens, report_prompt_builder
+
+logger = logging.getLogger(__name__)
+
+_MASK64 = (1 << 64) - 1
+_NOISE_RE = re.compile(r'https?://\S+|[\s\W_]+')
+# 速递中每条资讯的标题行：“一、”“二、”，没有时再尝试“1、”“2.”
+_ITEM_HEADING_RES = (
+    re.compile(r'^[ \t]*[一二三四五六七八九十]{1,3}[、.．][ \t]*', re.M),
+    re.compile(r'^[ \t]*\d{1,2}[、.．](?!\d)[ \t]*', re.M)
+)
+
+
+def split_digest(article: Dict) -> List[Dict]:
+    """
+    把多条资讯组成的速递拆成单条（标题为编号后的第一行，其余为内容，链接和来源与原文相同）
+    Returns:
+        单条资讯列表；不足两条时返回空列表（按整篇处理）
+    """
+    content = article.get('content', article.get('summary', '')) or ''
+    for heading_re in _ITEM_HEADING_RES:
+        matches = list(heading_re.finditer(content))
+        if len(matches) < 2:
+            continue
+        items = []
+        for number, match in enumerate(matches):
+            end = matches[number + 1].start() if number + 1 < len(matches) else len(content)
+            title, _, body = content[match.end():end].strip().partition('\n')
+            if not title.strip():
+                return []
+            items.append(dict(article, title=title.strip(), content=body.strip(),
+                              digest_title=article.get('title', ''), item_index=number + 1))
+        return items
+    return []
+
+
+def shingles(text: str, size: int = 3) -> List[int]:
+    """文本规范化（去掉链接、空白和标点，英文转小写）后的字符 shingle 哈希（32位）"""
+    text = _NOISE_RE.sub('', (text or '').lower())
+    if len(text) <= size:
+        return [zlib.crc32(text.encode('utf-8'))] if text else []
+    return sorted({zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)})
+
+
+class ArticleDeduplicator:
+    """MinHash + LSH 分桶的近似重复检测"""
+
+    def __init__(self, config: Dict = None):
+        config = config or DEDUP_CONFIG
+        self.enabled = config.get('enabled', True)
+        self.threshold = config.get('similarity_threshold', 0.5)
+        self.containment_threshold = config.get('containment_threshold', 0.6)
+        self.min_containment_shingles = config.get('min_containment_shingles', 20)
+        self.digest_sources = config.get('digest_sources', ['腾讯研究院'])
+        self.shingle_size = config.get('shingle_size', 3)
+        self.num_perm = config.get('num_perm', 64)
+        self.bands = config.get('bands', 32)
+        self.max_chars = config.get('max_chars', 400)
+        self.rows = self.num_perm // self.bands
+        # 乘移位哈希族 h(x) = ((a*x + b) mod 2^64) >> 32，固定种子保证每次运行的签名一致
+        rng = random.Random(20240101)
+        self._a = [rng.getrandbits(64) | 1 for _ in range(self.num_perm)]
+        self._b = [rng.getrandbits(64) for _ in range(self.num_perm)]
+        self.backend = 'numpy' if np is not None else 'python'
+
+    def fingerprint(self) -> Dict:
+        """影响去重结果的参数（参与日报缓存键的计算）"""
+        return {
+            'enabled': self.enabled,
+            'threshold': self.threshold,
+            'containment_threshold': self.containment_threshold,
+            'min_containment_shingles': self.min_containment_shingles,
+            'digest_sources': self.digest_sources,
+            'shingle_size': self.shingle_size,
+            'num_perm': self.num_perm,
+            'bands': self.bands,
+            'max_chars': self.max_chars
+        }
+
+    def _text(self, article: Dict) -> str:
+        """参与比较的文本：标题 + 内容开头（转载和快讯的差异多在后半部分）"""
+        content = article.get('content', article.get('summary', '')) or ''
+        return f"{article.get('title', '')} {content[:self.max_chars]}"
+
+    def signatures(self, articles: List[Dict]):
+        """计算每篇文章的 MinHash 签名（num_perm 个32位整数）"""
+        return self._signatures([shingles(self._text(article), self.shingle_size) for article in articles])
+
+    def _signatures(self, shingle_sets: List[List[int]]):
+        """按 shingle 哈希计算签名；没有 shingle 的文章签名全为 0xFFFFFFFF（不参与分桶，见 _candidate_pairs）"""
+        if np is not None:
+            a = np.array(self._a, dtype=np.uint64)[:, None]
+            b = np.array(self._b, dtype=np.uint64)[:, None]
+            empty = np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint64)
+            rows = []
+            for values in shingle_sets:
+                if not values:
+                    rows.append(empty)
+                    continue
+                x = np.array(values, dtype=np.uint64)[None, :]
+                # uint64 乘加按 2^64 自然溢出，即 mod 2^64
+                rows.append(((a * x + b) >> np.uint64(32)).min(axis=1))
+            return np.vstack(rows) if rows else np.empty((0, self.num_perm), dtype=np.uint64)
+
+        return [
+            [min(((a * x + b) & _MASK64) >> 32 for x in values) if values else 0xFFFFFFFF
+             for a, b in zip(self._a, self._b)]
+            for values in shingle_sets
+        ]
+
+    def _candidate_pairs(self, signatures, skip: Set[int] = frozenset()) -> List[Tuple[int, int]]:
+        """
+        LSH 分桶：任一段签名完全相同的文章对作为候选
+        Args:
+            skip: 不参与分桶的文章下标（没有 shingle 的文章签名完全相同，分桶后会被互相合并）
+        """
+        pairs = set()
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets = {}
+            for index, signature in enumerate(signatures):
+                if index in skip:
+                    continue
+                buckets.setdefault(tuple(int(v) for v in signature[start:start + self.rows]), []).append(index)
+            for members in buckets.values():
+                for i in range(len(members)):
+                    for j in range(i + 1, len(members)):
+                        pairs.add((members[i], members[j]))
+        return sorted(pairs)
+
+    def _similarities(self, signatures, pairs: List[Tuple[int, int]]) -> List[float]:
+        """候选文章对的签名相同比例（Jaccard 相似度的估计）"""
+        if not pairs:
+            return []
+        if np is not None:
+            left = np.array([i for i, _ in pairs])
+            right = np.array([j for _, j in pairs])
+            return (signatures[left] == signatures[right]).mean(axis=1).tolist()
+        return [sum(x == y for x, y in zip(signatures[i], signatures[j])) / self.num_perm for i, j in pairs]
+
+    def _is_duplicate(self, similarity: float, size_a: int, size_b: int) -> bool:
+        """
+        Jaccard 相似度达到阈值，或较短一方的大部分内容包含在另一方中（单条速递与篇幅更长的快讯）
+        包含度按 |A∩B| = J(|A|+|B|)/(1+J) 由 Jaccard 估计换算，较短一方太短时不按包含度判断
+        """
+        if similarity >= self.threshold:
+            return True
+        shorter = min(size_a, size_b)
+        if shorter < self.min_containment_shingles:
+            return False
+        return similarity * (size_a + size_b) / ((1 + similarity) * shorter) >= self.containment_threshold
+
+    def _units(self, articles: List[Dict]) -> List[Tuple[int, Dict, bool]]:
+        """参与比较的单元 [(原文章下标, 文章或速递中的单条, 是否为单条)]，速递按条拆开"""
+        units = []
+        for index, article in enumerate(articles):
+            source = article.get('source', '') or ''
+            items = split_digest(article) if any(name in source for name in self.digest_sources) else []
+            if items:
+                units.extend((index, item, True) for item in items)
+            else:
+                units.append((index, article, False))
+        return units
+
+    @staticmethod
+    def _representative(group: List[Dict]) -> Dict:
+        """代表文章：来源权重最高、内容最长的一篇（速递中的单条只代表这一条，不是整篇速递）"""
+        return max(group, key=lambda article: (
+            report_prompt_builder.source_weight(article),
+            len(article.get('content', article.get('summary', '')) or '')
+        ))
+
+    @staticmethod
+    def _merge(representative: Dict, group: List[Dict]) -> Dict:
+        """在代表文章的副本上合并整组文章的来源和其余文章的链接"""
+        merged = dict(representative)
+        sources = []
+        for article in group:
+            source = article.get('source', '')
+            if source and source not in sources:
+                sources.append(source)
+        merged['merged_sources'] = sources
+        merged['duplicate_urls'] = [article.get('url', '') for article in group
+                                    if article is not representative and article.get('url')]
+        return merged
+
+    def dedupe(self, articles: List[Dict]) -> Tuple[List[Dict], Dict]:
+        """
+        合并近似重复的文章
+        Args:
+            articles: 采集的文章列表
+        Returns:
+            (去重后的文章列表（保持每组首篇文章的位置；有单条与其它文章重复的速递按条输出）, 统计信息
+             {'articles_in', 'articles_out', 'groups', 'removed', 'digests_split', 'tokens_saved', 'backend'})
+        """
+        stats = {
+            'articles_in': len(articles),
+            'articles_out': len(articles),
+            'groups': 0,
+            'removed': 0,
+            'digests_split': 0,
+            'tokens_saved': 0,
+            'backend': self.backend
+        }
+        if not self.enabled or len(articles) < 2:
+            return list(articles), stats
+
+        units = self._units(articles)
+        shingle_sets = [shingles(self._text(unit), self.shingle_size) for _, unit, _ in units]
+        signatures = self._signatures(shingle_sets)
+        # 标题和内容都为空（或只有标点、链接）的文章无法比较，始终单独保留
+        pairs = self._candidate_pairs(signatures, skip={i for i, values in enumerate(shingle_sets) if not values})
+
+        # 并查集合并重复的单元（同一篇速递中的各条不互相合并）
+        parent = list(range(len(units)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for (i, j), similarity in zip(pairs, self._similarities(signatures, pairs)):
+            if units[i][0] != units[j][0] and self._is_duplicate(similarity, len(shingle_sets[i]),
+                                                                  len(shingle_sets[j])):
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups = {}
+        for index in range(len(units)):
+            groups.setdefault(find(index), []).append(index)
+        # 有单条与其它文章重复的速递按条输出，其余速递保持整篇
+        split = {units[i][0] for members in groups.values() if len(members) > 1 for i in members if units[i][2]}
+        stats['digests_split'] = len(split)
+
+        result = []
+        emitted = set()
+        for index, (article_index, unit, is_item) in enumerate(units):
+            if is_item and article_index not in split:
+                if article_index not in emitted:
+                    emitted.add(article_index)
+                    result.append(articles[article_index])
+                continue
+            members = groups[find(index)]
+            if len(members) == 1:
+                result.append(unit)
+            elif index == members[0]:
+                group = [units[i][1] for i in members]
+                result.append(self._merge(self._representative(group), group))
+                stats['groups'] += 1
+                stats['removed'] += len(members) - 1
+
+        # 节省的token按去重前后文章在提示词中的原始篇幅估算
+        stats['tokens_saved'] = max(0, self._prompt_tokens(articles) - self._prompt_tokens(result))
+        stats['articles_out'] = len(result)
+        if stats['removed']:
+            logger.info(f"资讯去重: {stats['articles_in']} → {stats['articles_out']} 篇，"
+                        f"合并 {stats['groups']} 组近似重复（拆分速递 {stats['digests_split']} 篇），"
+                        f"约节省 {stats['tokens_saved']} tokens（{self.backend}）")
+        return result, stats
+
+    @staticmethod
+    def _prompt_tokens(articles: List[Dict]) -> int:
+        return sum(estimate_tokens(report_prompt_builder.format_article(
+            0, article, article.get('content', article.get('summary', '')) or '', article.get('weight', 5)))
+            for article in articles)
+
+
+# 全局实例
+article_deduplicator = ArticleDeduplicator()
@@ -6,18 +6,45 @@ import asyncio
 import aiohttp
 import json
 import logging
-from typing import List, Dict, Optional
+import re
+import time
+from collections import deque
+from typing import AsyncIterator, List, Dict, Optional
 from datetime import datetime
 from config import Config
+from report_cache import report_cache, make_report_key
+from prompt_builder import report_prompt_builder
+from dedup import article_deduplicator
+from single_flight import single_flight, make_key
 
 logger = logging.getLogger(__name__)
 
+# 最近的API调用耗时记录（首字延迟 ttft、总耗时 latency 等）
+recent_call_stats = deque(maxlen=50)
+
+
+def get_cache_summary() -> Dict:
+    """最近调用的上下文缓存命中汇总"""
+    hit = sum(stats.get('cache_hit_tokens') or 0 for stats in recent_call_stats)
+    miss = sum(stats.get('cache_miss_tokens') or 0 for stats in recent_call_stats)
+    return {
+        'cache_hit_tokens': hit,
+        'cache_miss_tokens': miss,
+        'cache_hit_rate': round(hit / (hit + miss), 3) if hit + miss else None
+    }
+
+
 class DeepSeekAPI:
+    REPORT_TEMPERATURE = 0.3  # 生成日报的温度参数
+    
     def __init__(self, api_key: str = None):
         self.api_key = api_key or Config.DEEPSEEK_API_KEY
         self.base_url = Config.DEEPSEEK_BASE_URL
         self.model = Config.DEEPSEEK_MODEL
         self.session = None
+        self.last_call_stats = None  # 最近一次API调用的耗时统计
+        self.last_prompt_stats = None  # 最近一次日报提示词的token统计
+        self._stream_tasks = set()  # 进行中的流式日报生成任务（客户端断开后仍继续执行）
         
         # 验证API Key
         if not self.api_key:
@@ -32,61 +59,73 @@ class DeepSeekAPI:
             self.session = aiohttp.ClientSession()
     
     async def close_session(self):
-        """关闭HTTP会话"""
+        """关闭HTTP会话（先等待进行中的流式日报生成完成）"""
+        if self._stream_tasks:
+            await asyncio.wait(set(self._stream_tasks))
         if self.session:
             await self.session.close()
             self.session = None
     
-    async def generate_daily_report(self, articles: List[Dict], target_date: str) -> Dict:
+    async def generate_daily_report(self, articles: List[Dict], target_date: str,
+                                    force_refresh: bool = False) -> Dict:
         """
         生成AI日报
         Args:
             articles: 采集的文章列表
             target_date: 目标日期 (YYYY-MM-DD)
+            force_refresh: 忽略缓存，重新调用API生成
         Returns:
-            生成的日报内容字典
+            生成的日报内容字典（命中缓存时带 cached: True）；相同文章与日期的日报正在生成时等待其结果
         """
         try:
-            await self._ensure_session()
+            # 文章、提示词模板、模型、温度、token预算都没有变化时直接使用上次生成的日报
+            cache_key = make_report_key(articles, target_date, Config.AI_REPORT_SYSTEM_PROMPT + Config.AI_PROMPT_TEMPLATE,
+                                        self.model, self.REPORT_TEMPERATURE, options=self._report_cache_options())
+        except Exception as e:
+            logger.error(f"生成AI日报时出错: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'date': target_date,
+                'source_count': len(articles)
+            }
+        
+        return await single_flight.do(
+            make_key('daily_report', cache_key),
+            lambda: self._generate_daily_report(articles, target_date, force_refresh, cache_key)
+        )
+    
+    async def _generate_daily_report(self, articles: List[Dict], target_date: str,
+                                     force_refresh: bool, cache_key: str) -> Dict:
+        """生成AI日报（generate_daily_report 的实际执行部分）"""
+        temperature = self.REPORT_TEMPERATURE
+        try:
+            if not force_refresh:
+                cached = report_cache.get(cache_key)
+                if cached:
+                    logger.info(f"{target_date}的AI日报命中缓存（{cache_key[:12]}），跳过API调用")
+                    return dict(cached, cached=True, cache_key=cache_key)
             
-            # 准备文章内容
-            content_parts = []
-            for i, article in enumerate(articles, 1):
-                content_part = f"""
-【资讯{i}】
-来源：{article.get('source', '未知')}（权重：{article.get('weight', 5)}分）
-标题：{article.get('title', '')}
-时间：{article.get('date', '')} {article.get('time_text', '')}
-内容：{article.get('content', article.get('summary', ''))}
-URL：{article.get('url', '')}
----
-"""
-                content_parts.append(content_part)
+            await self._ensure_session()
             
-            # 构建完整的prompt
-            full_content = "".join(content_parts)
-            prompt = Config.AI_PROMPT_TEMPLATE.format(
-                date=target_date,
-                content=full_content
-            )
+            unique_articles, dedup_stats = article_deduplicator.dedupe(articles)
+            report_articles, map_stats = await self._prepare_report_articles(unique_articles, target_date)
+            prompt = self._build_report_prompt(report_articles, target_date)
             
             logger.info(f"开始生成{target_date}的AI日报，输入{len(articles)}条原始资讯")
             
             # 调用DeepSeek API
-            response = await self._call_api(prompt)
+            response = await self._call_api(prompt, temperature=temperature,
+                                            system_prompt=Config.AI_REPORT_SYSTEM_PROMPT)
             
             if response and response.get('success'):
                 report_content = response.get('content', '')
                 logger.info(f"AI日报生成成功，输出内容长度：{len(report_content)}")
                 
-                return {
-                    'success': True,
-                    'date': target_date,
-                    'content': report_content,
-                    'source_count': len(articles),
-                    'generated_at': datetime.now().isoformat(),
-                    'model': self.model
-                }
+                result = self._build_report_result(articles, target_date, report_content)
+                self._cache_report(cache_key, result, map_stats)
+                return dict(result, cached=False, cache_key=cache_key, stats=response.get('stats'),
+                            prompt_stats=self.last_prompt_stats, map_reduce=map_stats, dedup=dedup_stats)
             else:
                 error_msg = response.get('error', 'API调用失败') if response else 'API响应为空'
                 logger.error(f"AI日报生成失败: {error_msg}")
@@ -106,6 +145,253 @@ URL：{article.get('url', '')}
                 'source_count': len(articles)
             }
     
+    async def generate_daily_report_stream(self, articles: List[Dict], target_date: str,
+                                           force_refresh: bool = False) -> AsyncIterator[Dict]:
+        """
+        流式生成AI日报
+        Args:
+            articles: 采集的文章列表
+            target_date: 目标日期 (YYYY-MM-DD)
+            force_refresh: 忽略缓存，重新调用API生成
+        Yields:
+            分块初筛时先产出 {'type': 'stage', 'message': 阶段说明}，之后是 {'type': 'delta', 'text': 新增文本}，
+            最后是 {'type': 'done', 'result': 与 generate_daily_report 相同的结果字典}；命中缓存时直接产出 done。
+            相同文章与日期的日报正在生成时产出 stage 后等待其结果
+        """
+        temperature = self.REPORT_TEMPERATURE
+        cache_key = make_report_key(articles, target_date, Config.AI_REPORT_SYSTEM_PROMPT + Config.AI_PROMPT_TEMPLATE,
+                                    self.model, temperature, options=self._report_cache_options())
+        if not force_refresh:
+            cached = report_cache.get(cache_key)
+            if cached:
+                logger.info(f"{target_date}的AI日报命中缓存（{cache_key[:12]}），跳过API调用")
+                yield {'type': 'done', 'result': dict(cached, cached=True, cache_key=cache_key)}
+                return
+        
+        flight_key = make_key('daily_report', cache_key)
+        pending = single_flight.join(flight_key)
+        if pending is not None:
+            yield {'type': 'stage', 'message': '相同的日报正在生成，等待其结果...'}
+            yield {'type': 'done', 'result': dict(await asyncio.shield(pending))}
+            return
+        
+        # 登记为进行中的调用，其它相同请求等待本次生成的结果。生成在独立任务中执行，
+        # 本连接只读取事件队列：客户端断开时生成继续完成，等待中的请求仍拿到完整日报
+        flight = single_flight.begin(flight_key)
+        events = asyncio.Queue()
+        task = asyncio.ensure_future(self._produce_report_stream(articles, target_date, cache_key,
+                                                                 flight_key, flight, events))
+        self._stream_tasks.add(task)
+        task.add_done_callback(self._stream_tasks.discard)
+        while True:
+            event = await events.get()
+            if event is None:
+                return
+            yield event
+    
+    async def _produce_report_stream(self, articles: List[Dict], target_date: str, cache_key: str,
+                                     flight_key: str, flight: asyncio.Future, events: asyncio.Queue):
+        """执行流式生成并把事件放入队列（结束时放入 None），完成后把结果交给等待中的相同请求"""
+        result = {
+            'success': False,
+            'error': '日报生成已中断',
+            'date': target_date,
+            'source_count': len(articles)
+        }
+        try:
+            async for event in self._stream_daily_report(articles, target_date, cache_key):
+                if event['type'] == 'done':
+                    result = event['result']
+                events.put_nowait(event)
+        finally:
+            single_flight.finish(flight_key, flight, result)
+            events.put_nowait(None)
+    
+    async def _stream_daily_report(self, articles: List[Dict], target_date: str,
+                                   cache_key: str) -> AsyncIterator[Dict]:
+        """流式生成AI日报（generate_daily_report_stream 的实际执行部分）"""
+        temperature = self.REPORT_TEMPERATURE
+        parts = []
+        map_stats = None
+        dedup_stats = None
+        try:
+            unique_articles, dedup_stats = article_deduplicator.dedupe(articles)
+            if self._use_map_reduce(unique_articles):
+                yield {'type': 'stage', 'message': f'资讯较多（{len(unique_articles)}条），正在分块初筛...'}
+            await self._ensure_session()
+            report_articles, map_stats = await self._prepare_report_articles(unique_articles, target_date)
+            if map_stats:
+                yield {'type': 'stage', 'message': f"初筛完成，{map_stats['shortlisted']}条资讯入选，正在生成日报..."}
+            
+            prompt = self._build_report_prompt(report_articles, target_date)
+            logger.info(f"开始流式生成{target_date}的AI日报，输入{len(articles)}条原始资讯")
+            
+            async for delta in self.stream_completion(prompt, temperature=temperature,
+                                                      system_prompt=Config.AI_REPORT_SYSTEM_PROMPT):
+                parts.append(delta)
+                yield {'type': 'delta', 'text': delta}
+        except Exception as e:
+            logger.error(f"流式生成AI日报失败: {e}")
+            yield {'type': 'done', 'result': {
+                'success': False,
+                'error': str(e),
+                'date': target_date,
+                'source_count': len(articles),
+                'stats': self.last_call_stats,
+                'prompt_stats': self.last_prompt_stats,
+                'map_reduce': map_stats,
+                'dedup': dedup_stats
+            }}
+            return
+        
+        report_content = ''.join(parts)
+        logger.info(f"AI日报生成成功，输出内容长度：{len(report_content)}")
+        result = self._build_report_result(articles, target_date, report_content)
+        self._cache_report(cache_key, result, map_stats)
+        yield {'type': 'done', 'result': dict(result, cached=False, cache_key=cache_key, stats=self.last_call_stats,
+                                              prompt_stats=self.last_prompt_stats, map_reduce=map_stats,
+                                              dedup=dedup_stats)}
+    
+    def _build_report_result(self, articles: List[Dict], target_date: str, report_content: str) -> Dict:
+        """组装日报结果字典"""
+        return {
+            'success': True,
+            'date': target_date,
+            'content': report_content,
+            'source_count': len(articles),
+            'generated_at': datetime.now().isoformat(),
+            'model': self.model
+        }
+    
+    @staticmethod
+    def _cache_report(cache_key: str, result: Dict, map_stats: Optional[Dict]):
+        """写入日报缓存；有分块初筛失败时日报是降级生成的，不缓存，下次重新生成"""
+        if map_stats and map_stats.get('failed_chunks'):
+            logger.warning(f"{map_stats['failed_chunks']}个分块初筛失败，本次日报不写入缓存")
+            return
+        report_cache.put(cache_key, result)
+    
+    def _report_cache_options(self) -> Dict:
+        """影响日报内容的其它参数（参与日报缓存键的计算）"""
+        report_config = Config.REPORT_CONFIG
+        return dict(report_prompt_builder.fingerprint(), dedup=article_deduplicator.fingerprint(), map_reduce={
+            key: report_config.get(key) for key in ('map_reduce_threshold', 'map_chunk_size',
+                                                    'map_keep_per_chunk', 'reduce_max_items')
+        })
+    
+    def _use_map_reduce(self, articles: List[Dict]) -> bool:
+        """文章数超过阈值时使用分块初筛+汇总"""
+        threshold = Config.REPORT_CONFIG.get('map_reduce_threshold', 80)
+        return bool(threshold) and len(articles) > threshold
+    
+    async def _prepare_report_articles(self, articles: List[Dict], target_date: str):
+        """
+        准备生成日报使用的文章
+        Returns:
+            (文章列表, 分块初筛统计)；文章数未超过阈值时原样返回，统计为 None
+        """
+        if not self._use_map_reduce(articles):
+            return articles, None
+        
+        report_config = Config.REPORT_CONFIG
+        chunk_size = report_config.get('map_chunk_size', 25)
+        keep = report_config.get('map_keep_per_chunk', 8)
+        semaphore = asyncio.Semaphore(report_config.get('map_concurrency', 4))
+        chunks = [articles[i:i + chunk_size] for i in range(0, len(articles), chunk_size)]
+        
+        logger.info(f"{target_date}共{len(articles)}条资讯，分{len(chunks)}块初筛（每块{chunk_size}条）")
+        started = time.monotonic()
+        results = await asyncio.gather(*[
+            self._summarize_chunk(chunk, target_date, keep, semaphore) for chunk in chunks
+        ])
+        
+        shortlist = [item for items, _ in results for item in items]
+        shortlist.sort(key=lambda item: item['score'], reverse=True)
+        shortlist = shortlist[:report_config.get('reduce_max_items', 60)]
+        
+        map_stats = {
+            'chunks': len(chunks),
+            'failed_chunks': sum(1 for _, ok in results if not ok),
+            'shortlisted': len(shortlist),
+            'map_seconds': round(time.monotonic() - started, 3)
+        }
+        logger.info(f"分块初筛完成: {map_stats['shortlisted']}条入选，{map_stats['failed_chunks']}块失败，"
+                    f"耗时 {map_stats['map_seconds']}s")
+        return shortlist, map_stats
+    
+    async def _summarize_chunk(self, chunk: List[Dict], target_date: str, keep: int,
+                               semaphore: asyncio.Semaphore):
+        """
+        初筛一个分块
+        Returns:
+            (入选的文章列表（内容替换为概括，带 score）, 是否成功)；失败时保留前 keep 篇原文（见 _fallback_chunk）
+        """
+        prompt = Config.AI_MAP_PROMPT_TEMPLATE.format(
+            date=target_date,
+            keep=keep,
+            content=report_prompt_builder.format_chunk(chunk)
+        )
+        async with semaphore:
+            response = await self._call_api(prompt, temperature=self.REPORT_TEMPERATURE,
+                                            system_prompt=Config.AI_MAP_SYSTEM_PROMPT)
+        
+        if response and response.get('success'):
+            items = self._parse_map_result(response.get('content', ''), chunk, keep)
+            if items is not None:
+                return items, True
+            logger.warning("分块初筛结果无法解析，按来源权重保留")
+        else:
+            logger.warning(f"分块初筛失败: {response.get('error') if response else 'API响应为空'}，按来源权重保留")
+        
+        return self._fallback_chunk(chunk, keep), False
+    
+    @staticmethod
+    def _fallback_chunk(chunk: List[Dict], keep: int) -> List[Dict]:
+        """
+        初筛失败时的保留文章：按来源权重、再按信息量（数字、专有名词、关键词）排序取前 keep 篇
+        分数与模型打分同一量纲（1-10分）：没有质量判断，按排名落在中等质量区间（7 → 5分），
+        汇总排序时不会排在模型给出高分的资讯之前
+        """
+        ranked = sorted(chunk, key=lambda article: (report_prompt_builder.source_weight(article),
+                                                    report_prompt_builder.information_score(article)),
+                        reverse=True)[:keep]
+        last = max(1, len(ranked) - 1)
+        return [dict(article, score=round(7 - 2 * rank / last, 2)) for rank, article in enumerate(ranked)]
+    
+    @staticmethod
+    def _parse_map_result(content: str, chunk: List[Dict], keep: int) -> Optional[List[Dict]]:
+        """解析初筛返回的JSON数组，无法解析时返回 None"""
+        match = re.search(r'\[.*\]', content, re.DOTALL)
+        if not match:
+            return None
+        try:
+            entries = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+        
+        items = []
+        seen = set()
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                index = int(entry.get('id'))
+                score = float(entry.get('score', 0))
+            except (TypeError, ValueError):
+                continue
+            if not 1 <= index <= len(chunk) or index in seen:
+                continue
+            seen.add(index)
+            article = chunk[index - 1]
+            summary = str(entry.get('summary') or '').strip()
+            items.append(dict(article, content=summary or article.get('content', ''), score=score))
+        return items[:keep]
+    
+    def _build_report_prompt(self, articles: List[Dict], target_date: str) -> str:
+        """拼接日报提示词（按 REPORT_CONFIG 的token预算压缩文章内容）"""
+        prompt, self.last_prompt_stats = report_prompt_builder.build(articles, target_date)
+        return prompt
+    
     async def generate_poster_html(self, report_content: str, date: str) -> Dict:
         """
         生成海报HTML
@@ -113,34 +399,22 @@ URL：{article.get('url', '')}
             report_content: 日报内容
             date: 日期
         Returns:
-            生成的HTML内容字典
+            生成的HTML内容字典；相同日报内容与日期的海报正在生成时等待其结果
         """
+        return await single_flight.do(
+            make_key('poster_html', report_content, date, self.model),
+            lambda: self._generate_poster_html(report_content, date)
+        )
+    
+    async def _generate_poster_html(self, report_content: str, date: str) -> Dict:
+        """生成海报HTML（generate_poster_html 的实际执行部分）"""
         try:
             await self._ensure_session()
             
-            prompt = f"""设计一个视觉冲击力强的AI资讯海报。
-
-设计要求：
-1. 布局：530px宽度，高度自适应，苹果风格极简设计
-2. 标题：“AI前哨日报”，超大字号(56px)，排版靠左，黑色粗体，吸引眼球，标题下方有一个日期（{date}），小字号
-3. 内容：每条不超过50字 根据日报的三大板块划分：核心要闻，技术动态，行业观察，根据原顺序分点列出卡片
-4. 视觉元素：
-   - 使用emoji图标增强视觉效果
-   - 数字和关键词用红色高亮
-   - 添加渐变色块作为装饰元素
-5. 排版：大量留白，信息层次分明，一眼看懂
-
-将以下日报内容提炼成海报（{date}）：
-{report_content}
-
-注意：
-- 每条信息精炼（标题+几句话说明）
-- 突出数字和关键成果
-- 直接输出完整HTML代码，不要任何markdown标记
-"""
+            prompt = Config.AI_POSTER_PROMPT_TEMPLATE.format(date=date, report_content=report_content)
             logger.info(f"开始生成{date}的海报HTML")
             
-            response = await self._call_api(prompt, temperature=0.7)
+            response = await self._call_api(prompt, temperature=0.7, system_prompt=Config.AI_POSTER_SYSTEM_PROMPT)
             
             if response and response.get('success'):
                 html_content = response.get('content', '')
@@ -232,35 +506,84 @@ URL：{article.get('url', '')}
         logger.warning("无法提取HTML内容，将使用原始内容")
         return content
     
-    async def _call_api(self, prompt: str, temperature: float = 0.3) -> Optional[Dict]:
+    def _build_request(self, prompt: str, temperature: float, stream: bool, system_prompt: str = None):
+        """
+        构造 /v1/chat/completions 请求的URL、请求头和请求体
+        固定的指令放在最前面的系统消息中，请求前缀不随日期和资讯变化，可以命中DeepSeek的上下文硬盘缓存
+        """
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        messages = []
+        if system_prompt:
+            messages.append({
+                'role': 'system',
+                'content': system_prompt
+            })
+        messages.append({
+            'role': 'user',
+            'content': prompt
+        })
+        
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': 4000,
+            'stream': stream
+        }
+        if stream:
+            # 在最后一个数据块中返回token用量
+            payload['stream_options'] = {'include_usage': True}
+        
+        return f"{self.base_url}/v1/chat/completions", headers, payload
+    
+    def _record_stats(self, started: float, stream: bool, ttft: Optional[float] = None,
+                      usage: Dict = None, output_chars: int = 0, error: str = None) -> Dict:
+        """记录一次API调用的耗时统计（含上下文缓存命中的输入token数）"""
+        usage = usage or {}
+        cache_hit = usage.get('prompt_cache_hit_tokens')
+        cache_miss = usage.get('prompt_cache_miss_tokens')
+        stats = {
+            'model': self.model,
+            'stream': stream,
+            'ttft': round(ttft, 3) if ttft is not None else None,
+            'latency': round(time.monotonic() - started, 3),
+            'output_chars': output_chars,
+            'usage': usage,
+            'cache_hit_tokens': cache_hit,
+            'cache_miss_tokens': cache_miss,
+            'cache_hit_rate': round(cache_hit / (cache_hit + cache_miss), 3) if cache_hit is not None
+                              and cache_miss is not None and cache_hit + cache_miss > 0 else None,
+            'error': error,
+            'finished_at': datetime.now().isoformat()
+        }
+        self.last_call_stats = stats
+        recent_call_stats.append(stats)
+        if error:
+            logger.warning(f"DeepSeek调用失败: 耗时 {stats['latency']}s, 错误: {error}")
+        else:
+            ttft_text = f"首字 {stats['ttft']}s, " if stream and stats['ttft'] is not None else ''
+            cache_text = (f", 缓存命中 {cache_hit}/{cache_hit + cache_miss} 输入tokens"
+                          if stats['cache_hit_rate'] is not None else '')
+            logger.info(f"DeepSeek调用完成: {ttft_text}总耗时 {stats['latency']}s, 输出 {output_chars} 字{cache_text}")
+        return stats
+    
+    async def _call_api(self, prompt: str, temperature: float = 0.3, system_prompt: str = None) -> Optional[Dict]:
         """
         调用DeepSeek API
         Args:
-            prompt: 提示词
+            prompt: 提示词（用户消息）
             temperature: 温度参数
+            system_prompt: 系统消息（固定的指令部分）
         Returns:
-            API响应结果
+            API响应结果（含耗时统计 stats）
         """
+        started = time.monotonic()
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            payload = {
-                'model': self.model,
-                'messages': [
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                'temperature': temperature,
-                'max_tokens': 4000,
-                'stream': False
-            }
-            
-            url = f"{self.base_url}/v1/chat/completions"
+            url, headers, payload = self._build_request(prompt, temperature, stream=False, system_prompt=system_prompt)
             
             async with self.session.post(url, headers=headers, json=payload, timeout=120) as response:
                 if response.status == 200:
@@ -272,10 +595,13 @@ URL：{article.get('url', '')}
                             'success': True,
                             'content': content,
                             'usage': result.get('usage', {}),
-                            'model': result.get('model', self.model)
+                            'model': result.get('model', self.model),
+                            'stats': self._record_stats(started, False, usage=result.get('usage'),
+                                                        output_chars=len(content))
                         }
                     else:
                         logger.error(f"API响应格式错误: {result}")
+                        self._record_stats(started, False, error='响应格式错误')
                         return {
                             'success': False,
                             'error': f'响应格式错误: {result}'
@@ -283,6 +609,7 @@ URL：{article.get('url', '')}
                 else:
                     error_text = await response.text()
                     logger.error(f"API请求失败，状态码: {response.status}, 错误: {error_text}")
+                    self._record_stats(started, False, error=f'HTTP {response.status}')
                     return {
                         'success': False,
                         'error': f'HTTP {response.status}: {error_text}'
@@ -290,17 +617,74 @@ URL：{article.get('url', '')}
                     
         except asyncio.TimeoutError:
             logger.error("API请求超时")
+            self._record_stats(started, False, error='API请求超时')
             return {
                 'success': False,
                 'error': 'API请求超时'
             }
         except Exception as e:
             logger.error(f"API请求异常: {e}")
+            self._record_stats(started, False, error=str(e))
             return {
                 'success': False,
                 'error': str(e)
             }
     
+    async def stream_completion(self, prompt: str, temperature: float = 0.3,
+                                system_prompt: str = None) -> AsyncIterator[str]:
+        """
+        以流式模式调用DeepSeek API，逐段产出生成的文本
+        Args:
+            prompt: 提示词（用户消息）
+            temperature: 温度参数
+            system_prompt: 系统消息（固定的指令部分）
+        Yields:
+            文本增量
+        Raises:
+            Exception: HTTP错误、超时或连接异常（耗时统计在 self.last_call_stats 中）
+        """
+        await self._ensure_session()
+        url, headers, payload = self._build_request(prompt, temperature, stream=True, system_prompt=system_prompt)
+        
+        started = time.monotonic()
+        ttft = None
+        usage = None
+        output_chars = 0
+        # 生成可能持续数分钟，只限制两个数据块之间的间隔
+        timeout = aiohttp.ClientTimeout(total=None, connect=30, sock_read=120)
+        try:
+            async with self.session.post(url, headers=headers, json=payload, timeout=timeout) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise Exception(f'HTTP {response.status}: {error_text}')
+                
+                # SSE：每个事件一行 "data: {...}"，以 "data: [DONE]" 结束
+                async for raw_line in response.content:
+                    line = raw_line.decode('utf-8').strip()
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        break
+                    chunk = json.loads(data)
+                    if chunk.get('usage'):
+                        usage = chunk['usage']
+                    for choice in chunk.get('choices') or []:
+                        delta = (choice.get('delta') or {}).get('content')
+                        if delta:
+                            if ttft is None:
+                                ttft = time.monotonic() - started
+                            output_chars += len(delta)
+                            yield delta
+        except asyncio.TimeoutError:
+            self._record_stats(started, True, ttft, usage, output_chars, error='API请求超时')
+            raise Exception('API请求超时')
+        except Exception as e:
+            self._record_stats(started, True, ttft, usage, output_chars, error=str(e))
+            raise
+        
+        self._record_stats(started, True, ttft, usage, output_chars)
+    
     async def test_connection(self) -> Dict:
         """
         测试API连接
@@ -0,0 +1,146 @@
+"""
+后台事件循环服务
+进程内常驻一个asyncio事件循环（独立线程），Flask请求处理函数和定时任务通过它执行协程，
+浏览器池、HTTP连接等绑定事件循环的资源可以跨请求复用
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import queue
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional
+
+from scrapers.browser_pool import close_browser_pool
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundEventLoop:
+    """在专用线程中运行的常驻事件循环"""
+
+    def __init__(self, name: str = 'async-loop'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """获取事件循环（未启动时自动启动）"""
+        self.start()
+        return self._loop
+
+    def is_running(self) -> bool:
+        """事件循环线程是否在当前进程中运行"""
+        return (self._thread is not None and self._thread.is_alive()
+                and self._pid == os.getpid())
+
+    def start(self):
+        """启动事件循环线程（幂等）；fork 出的子进程中会重新创建"""
+        if self.is_running():
+            return
+        with self._lock:
+            if self.is_running():
+                return
+            ready = threading.Event()
+            loop = asyncio.new_event_loop()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    try:
+                        loop.run_until_complete(loop.shutdown_asyncgens())
+                    finally:
+                        loop.close()
+
+            self._loop = loop
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            logger.info(f"后台事件循环已启动（线程 {self.name}）")
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        提交协程到后台事件循环，立即返回
+        Returns:
+            concurrent.futures.Future，可在任意线程中等待结果
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        提交协程并阻塞等待结果（供Flask请求处理函数、定时任务线程调用）
+        Args:
+            coro: 协程
+            timeout: 超时秒数，超时后取消协程并抛出 TimeoutError
+        """
+        if self._thread is threading.current_thread():
+            coro.close()
+            raise RuntimeError("不能在后台事件循环线程内同步等待协程，请直接 await")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def iterate(self, agen: AsyncIterator, timeout: Optional[float] = None) -> Iterator:
+        """
+        在后台事件循环中消费异步迭代器，以同步迭代器的形式逐项返回（供Flask流式响应使用）
+        调用方提前结束迭代（如客户端断开）时取消后台协程
+        Args:
+            agen: 异步迭代器（如异步生成器）
+            timeout: 等待下一项的超时秒数，超时抛出 queue.Empty
+        """
+        items: queue.Queue = queue.Queue()
+        finished = object()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put((item, None))
+            except Exception as e:
+                items.put((finished, e))
+                return
+            finally:
+                if hasattr(agen, 'aclose'):
+                    await agen.aclose()
+            items.put((finished, None))
+
+        future = self.submit(pump())
+        try:
+            while True:
+                item, error = items.get(timeout=timeout)
+                if item is finished:
+                    if error:
+                        raise error
+                    return
+                yield item
+        finally:
+            future.cancel()
+
+    def stop(self, timeout: float = 10):
+        """释放绑定在事件循环上的资源（浏览器池等）并停止事件循环"""
+        if not self.is_running():
+            return
+        try:
+            self.run(close_browser_pool(), timeout=timeout)
+        except Exception as e:
+            logger.debug(f"关闭浏览器池失败: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info("后台事件循环已停止")
+
+
+# 全局实例
+event_loop_service = BackgroundEventLoop()
+atexit.register(event_loop_service.stop)
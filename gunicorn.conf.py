@@ -6,6 +6,10 @@ bind = f"0.0.0.0:{os.getenv('PORT', 8080)}"
 # 工作进程数
 workers = 1
 
+# 线程工作模式：进度流（SSE）是长连接，需要多个线程才能同时处理其它请求
+worker_class = "gthread"
+threads = 16
+
 # 超时设置
 timeout = 300
 keepalive = 2
@@ -0,0 +1,374 @@
+"""
+后台任务注册表
+每个任务（手动采集、海报生成、定时任务等）拥有独立的ID、状态、进度、耗时和有限长度的明细日志，
+多个任务可以在同一进程中并行执行，互不覆盖进度；同时运行的任务数受 JOB_CONFIG 限制。
+任务的状态变化和新增明细同时写入一个有序的事件日志，供进度流（SSE）按序号增量推送。
+采集结果（文章列表）单独存放，进度数据中只带数量和版本号，文章通过分页接口获取
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from config import Config
+    JOB_CONFIG = Config.JOB_CONFIG
+except (ImportError, AttributeError):
+    JOB_CONFIG = {}
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+ERROR = 'error'
+FINISHED_STATES = (COMPLETED, ERROR)
+
+# 状态事件携带的字段（不含明细日志、采集结果等大字段）
+STATE_FIELDS = ('job_id', 'operation', 'name', 'ref', 'status', 'progress', 'message',
+                'start_time', 'end_time', 'duration', 'error', 'version', 'article_count')
+
+
+class JobLimitExceeded(Exception):
+    """同时运行的任务数已达上限"""
+
+
+class JobRegistry:
+    """后台任务注册表（线程安全）"""
+
+    def __init__(self, max_concurrent_jobs: int = None, max_details: int = None,
+                 max_finished_jobs: int = None, max_events: int = None):
+        self.max_concurrent_jobs = max_concurrent_jobs or JOB_CONFIG.get('max_concurrent_jobs', 3)
+        self.max_details = max_details or JOB_CONFIG.get('max_details', 200)
+        self.max_finished_jobs = max_finished_jobs or JOB_CONFIG.get('max_finished_jobs', 50)
+        self.max_events = max_events or JOB_CONFIG.get('max_events', 1000)
+
+        self._jobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._condition = threading.Condition()
+
+        # 事件日志：(序号, 事件类型, 数据)，序号全局递增；epoch 区分进程重启前后的序号
+        self._events: deque = deque(maxlen=self.max_events)
+        self._seq = 0
+        self.epoch = uuid.uuid4().hex[:8]
+
+    def _emit_state(self, job: Dict):
+        """记录一次状态变化事件，调用方需持有锁"""
+        self._bump(job)
+        self._emit('state', {field: job.get(field) for field in STATE_FIELDS})
+
+    def _emit_details(self, job: Dict, lines: List[str]):
+        """记录新增明细事件，调用方需持有锁"""
+        self._bump(job)
+        self._emit('details', {'job_id': job['job_id'], 'operation': job['operation'],
+                               'ref': job['ref'], 'version': job['version'], 'lines': lines})
+
+    def _bump(self, job: Dict):
+        """任务版本号取最近一次变化的事件序号"""
+        job['version'] = self._seq + 1
+
+    def _emit(self, event: str, data: Dict):
+        self._seq += 1
+        self._events.append((self._seq, event, data))
+        self._condition.notify_all()
+
+    @staticmethod
+    def _apply_fields(job: Dict, fields: Dict) -> bool:
+        """写入额外字段，articles 单独存放并更新数量与版本；返回文章是否变化"""
+        articles = fields.pop('articles', None)
+        job.update(fields)
+        if articles is None:
+            return False
+        job['_articles'] = list(articles)
+        job['article_count'] = len(job['_articles'])
+        job['articles_version'] += 1
+        return True
+
+    def _running_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job['status'] == RUNNING)
+
+    def create_job(self, operation: str, name: str = None, ref: str = None,
+                   params: Dict = None, wait: bool = False) -> str:
+        """
+        登记一个新任务并占用一个运行名额
+        Args:
+            operation: 任务类型，如 crawl / generate_poster / scheduled
+            name: 任务说明
+            ref: 关联对象ID（如定时任务的调度ID）
+            params: 任务参数（仅用于展示）
+            wait: 名额已满时是否排队等待；为 False 时直接抛出 JobLimitExceeded
+        Returns:
+            任务ID
+        """
+        job_id = f"{operation}_{uuid.uuid4().hex[:12]}"
+        job = {
+            'job_id': job_id,
+            'operation': operation,
+            'name': name or operation,
+            'ref': ref,
+            'params': params or {},
+            'status': QUEUED,
+            'progress': 0,
+            'message': '等待执行...',
+            'details': deque(maxlen=self.max_details),
+            'created_at': datetime.now().isoformat(),
+            'start_time': None,
+            'end_time': None,
+            'duration': None,
+            'result': None,
+            'error': None,
+            'version': 0,
+            'article_count': 0,
+            'articles_version': 0,
+            '_articles': None,
+            '_started': None
+        }
+
+        with self._condition:
+            if self._running_count() >= self.max_concurrent_jobs:
+                if not wait:
+                    raise JobLimitExceeded(f"同时运行的任务数已达上限（{self.max_concurrent_jobs}），请稍后再试")
+                self._jobs[job_id] = job
+                self._emit_state(job)
+                logger.info(f"任务排队等待: {job_id}")
+                while self._running_count() >= self.max_concurrent_jobs:
+                    self._condition.wait()
+            self._jobs[job_id] = job
+            job.update({
+                'status': RUNNING,
+                'message': '开始执行...',
+                'start_time': datetime.now().isoformat(),
+                '_started': time.monotonic()
+            })
+            self._emit_state(job)
+            self._prune()
+
+        logger.info(f"任务开始: {job_id} ({job['name']})")
+        return job_id
+
+    def start_job(self, operation: str, target: Callable[[str], Optional[Dict]], name: str = None,
+                  ref: str = None, params: Dict = None) -> str:
+        """
+        登记任务并在后台线程中执行 target(job_id)
+        target 的返回值作为任务结果；target 抛出异常时任务标记为失败，
+        target 自行调用 complete/fail 结束任务时以其为准
+        """
+        job_id = self.create_job(operation, name=name, ref=ref, params=params)
+
+        def run():
+            try:
+                result = target(job_id)
+                self.complete(job_id, result=result)
+            except Exception as e:
+                logger.error(f"任务执行失败: {job_id}, 错误: {e}")
+                self.fail(job_id, f"任务执行失败: {str(e)}", error=str(e))
+
+        threading.Thread(target=run, name=job_id, daemon=True).start()
+        return job_id
+
+    def update(self, job_id: str, progress: int = None, message: str = None,
+               detail: str = None, **fields):
+        """更新运行中任务的进度、消息，并可追加一条明细；其它关键字参数直接写入任务记录"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if not job or job['status'] in FINISHED_STATES:
+                return
+            changed = False
+            if progress is not None:
+                progress = max(0, min(100, int(progress)))
+                changed = changed or progress != job['progress']
+                job['progress'] = progress
+            if message is not None:
+                changed = changed or message != job['message']
+                job['message'] = message
+            changed = self._apply_fields(job, fields) or changed
+            if changed:
+                self._emit_state(job)
+            if detail:
+                job['details'].append(detail)
+                self._emit_details(job, [detail])
+
+    def add_detail(self, job_id: str, *details: str):
+        """追加明细日志（超出 max_details 时丢弃最早的条目）"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            lines = [d for d in details if d]
+            if job and lines:
+                job['details'].extend(lines)
+                self._emit_details(job, lines[-self.max_details:])
+
+    def complete(self, job_id: str, message: str = None, result: Dict = None, **fields):
+        """标记任务完成并释放运行名额（已结束的任务不受影响）"""
+        self._finish(job_id, COMPLETED, message or '任务完成', result=result, progress=100, **fields)
+
+    def fail(self, job_id: str, message: str, error: str = None, **fields):
+        """标记任务失败并释放运行名额（已结束的任务不受影响）"""
+        self._finish(job_id, ERROR, message, error=error or message, **fields)
+
+    def _finish(self, job_id: str, status: str, message: str, **fields):
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if not job or job['status'] in FINISHED_STATES:
+                return
+            self._apply_fields(job, {key: value for key, value in fields.items() if value is not None})
+            job['status'] = status
+            job['message'] = message
+            job['end_time'] = datetime.now().isoformat()
+            if job['_started'] is not None:
+                job['duration'] = round(time.monotonic() - job['_started'], 2)
+            self._emit_state(job)
+            self._prune()
+
+        log = logger.info if status == COMPLETED else logger.warning
+        log(f"任务结束: {job_id} [{status}] {message}")
+
+    def _prune(self):
+        """只保留最近 max_finished_jobs 个已结束任务，调用方需持有锁"""
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _snapshot(job: Dict, include_details: bool = True) -> Dict:
+        data = {key: value for key, value in job.items() if not key.startswith('_')}
+        data['details'] = list(job['details']) if include_details else len(job['details'])
+        if job['status'] == RUNNING and job['_started'] is not None:
+            data['elapsed'] = round(time.monotonic() - job['_started'], 2)
+        return data
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """获取任务快照（不含文章数据，只有 article_count / articles_version）"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def get_latest(self, operation: str = None, ref: str = None) -> Optional[Dict]:
+        """获取最近创建的（指定类型或关联对象的）任务快照"""
+        with self._condition:
+            for job in reversed(self._jobs.values()):
+                if operation and job['operation'] != operation:
+                    continue
+                if ref and job['ref'] != ref:
+                    continue
+                return self._snapshot(job)
+            return None
+
+    def list_jobs(self, operation: str = None, active_only: bool = False) -> List[Dict]:
+        """列出任务（新任务在前，不含明细日志与结果数据）"""
+        with self._condition:
+            jobs = []
+            for job in reversed(self._jobs.values()):
+                if operation and job['operation'] != operation:
+                    continue
+                if active_only and job['status'] in FINISHED_STATES:
+                    continue
+                snapshot = self._snapshot(job, include_details=False)
+                snapshot.pop('result', None)
+                jobs.append(snapshot)
+            return jobs
+
+    def get_articles(self, job_id: str, offset: int = 0, limit: int = 50,
+                     fields: List[str] = None) -> Optional[Dict]:
+        """
+        分页获取任务的采集结果
+        Args:
+            job_id: 任务ID
+            offset: 起始位置
+            limit: 每页数量
+            fields: 只返回这些字段（如 ['title', 'url']），为空时返回完整文章
+        Returns:
+            {'total', 'offset', 'limit', 'version', 'articles'}，任务不存在时返回 None
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            articles = job['_articles'] or []
+            page = articles[offset:offset + limit]
+            version = job['articles_version']
+            total = len(articles)
+
+        if fields:
+            page = [{field: article.get(field) for field in fields} for article in page]
+        return {
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'version': version,
+            'articles': page
+        }
+
+    def make_token(self, seq: int) -> str:
+        """生成进度流的续传标记"""
+        return f"{self.epoch}-{seq}"
+
+    def parse_token(self, token: Optional[str]) -> Optional[int]:
+        """解析续传标记，标记无效、来自重启前的进程或对应事件已被淘汰时返回 None"""
+        if not token:
+            return None
+        epoch, _, seq = token.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._condition:
+            oldest = self._events[0][0] if self._events else self._seq + 1
+            if seq > self._seq or seq < oldest - 1:
+                return None
+        return seq
+
+    def get_stream_snapshot(self, job_id: str = None, operation: str = None) -> Tuple[List[Dict], int]:
+        """
+        进度流建立（或无法续传）时的初始快照
+        Returns:
+            (任务快照列表（新任务在前，含明细日志，不含文章数据）, 快照对应的事件序号)
+        """
+        with self._condition:
+            jobs = [self._snapshot(job) for job in reversed(self._jobs.values())
+                    if (not job_id or job['job_id'] == job_id)
+                    and (not operation or job['operation'] == operation)]
+            return jobs, self._seq
+
+    def wait_events(self, after: int, timeout: float, job_id: str = None,
+                    operation: str = None) -> Tuple[List[Tuple[int, str, Dict]], Optional[int]]:
+        """
+        等待序号大于 after 的事件
+        Args:
+            after: 客户端已收到的最后一个事件序号
+            timeout: 最长等待秒数
+            job_id / operation: 只返回匹配的事件
+        Returns:
+            (事件列表, 新的序号)；after 对应的事件已被淘汰时新序号为 None，需要重新获取快照
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq > after, timeout)
+            oldest = self._events[0][0] if self._events else self._seq + 1
+            if after < oldest - 1 or after > self._seq:
+                return [], None
+            events = [(seq, event, data) for seq, event, data in self._events
+                      if seq > after
+                      and (not job_id or data['job_id'] == job_id)
+                      and (not operation or data['operation'] == operation)]
+            return events, self._seq
+
+    def remove_ref(self, ref: str):
+        """删除关联对象的所有已结束任务（如移除定时任务时）"""
+        with self._condition:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job['ref'] == ref and job['status'] in FINISHED_STATES]:
+                del self._jobs[job_id]
+
+    def get_stats(self) -> Dict:
+        """任务统计"""
+        with self._condition:
+            counts = {QUEUED: 0, RUNNING: 0, COMPLETED: 0, ERROR: 0}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            counts['max_concurrent_jobs'] = self.max_concurrent_jobs
+            return counts
+
+
+# 全局实例
+job_registry = JobRegistry()
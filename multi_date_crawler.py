@@ -3,26 +3,39 @@
 支持批量采集多个日期的资讯数据
 """
 import asyncio
-import json
-import os
 import logging
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Tuple
+from typing import List, Dict, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor
 import threading
 
 from config import Config
 from scrapers.sohu_scraper import SohuScraper
 from scrapers.aibase_news_scraper import AIBaseNewsScraper
+from scrapers.aibase_id_index import aibase_id_index
+from single_flight import single_flight, make_key
+from article_store import article_store, range_entry_name
+from article_db import article_db
 
 logger = logging.getLogger(__name__)
 
+SOURCE_NAMES = {
+    'tencent': '腾讯研究院',
+    'aibase': 'AIBase快讯'
+}
+
 class MultiDateCrawler:
     """多日期采集管理器"""
     
     def __init__(self):
         self.progress_callback = None
         self.is_running = False
+        self.aibase_index = aibase_id_index  # 各日期共用的AIBase ID索引
+        
+        # 多日期采集方式：concurrent 按 (日期, 数据源) 并发；sequential 逐个日期依次采集
+        self.mode = Config.CRAWLER_CONFIG.get('multi_date_mode', 'concurrent')
+        self.concurrent_limit = Config.CRAWLER_CONFIG.get('concurrent_limit', 4)
+        self.source_concurrency = Config.CRAWLER_CONFIG.get('source_concurrency', {})
         
     def set_progress_callback(self, callback):
         """设置进度回调函数"""
@@ -38,18 +51,34 @@ class MultiDateCrawler:
                 "details": details or []
             })
     
-    async def crawl_multiple_dates(self, date_list: List[str], sources: List[str] = None) -> Dict:
+    async def crawl_multiple_dates(self, date_list: List[str], sources: List[str] = None,
+                                   force_refresh: bool = False) -> Dict:
         """
         采集多个日期的资讯
         Args:
             date_list: 日期列表 ['2024-09-16', '2024-09-17', '2024-09-18']
             sources: 数据源列表 ['tencent', 'aibase']
+            force_refresh: 不复用已采集过的（日期, 数据源），全部重新采集
         Returns:
-            采集结果字典
+            采集结果字典；相同日期、数据源与 force_refresh 的采集正在进行时等待其结果
+            （强制刷新不会合并到可能复用旧数据的普通采集）
         """
         if sources is None:
             sources = ['tencent', 'aibase']
-            
+        
+        def on_join():
+            self._update_progress("running", 10, "相同日期与数据源的采集正在进行，等待其结果...",
+                                  [f"目标日期: {', '.join(date_list)}", "🔗 已合并到进行中的采集任务"])
+        
+        return await single_flight.do(
+            make_key('crawl_multiple_dates', sorted(date_list), sorted(sources), bool(force_refresh)),
+            lambda: self._crawl_multiple_dates(date_list, sources, force_refresh),
+            on_join=on_join
+        )
+    
+    async def _crawl_multiple_dates(self, date_list: List[str], sources: List[str],
+                                    force_refresh: bool = False) -> Dict:
+        """采集多个日期的资讯（crawl_multiple_dates 的实际执行部分）"""
         self.is_running = True
         all_articles = []
         total_dates = len(date_list)
@@ -59,32 +88,32 @@ class MultiDateCrawler:
             self._update_progress("running", 0, f"开始采集 {total_dates} 个日期的资讯...", 
                                 [f"目标日期: {', '.join(date_list)}", f"数据源: {', '.join(sources)}"])
             
-            # 按日期逐个采集
-            for i, target_date in enumerate(date_list):
-                if not self.is_running:
-                    break
-                    
-                date_progress = int((i / total_dates) * 90)  # 留10%给最后的保存
-                self._update_progress("running", date_progress, 
-                                    f"正在采集 {target_date} 的资讯... ({i+1}/{total_dates})")
-                
-                try:
-                    # 采集单个日期的数据
-                    date_articles, date_errors = await self._crawl_single_date(target_date, sources)
-                    all_articles.extend(date_articles)
-                    errors.extend(date_errors)
-                    
-                    self._update_progress("running", date_progress + 5, 
-                                        f"{target_date} 采集完成，获得 {len(date_articles)} 篇文章")
-                    
-                except Exception as e:
-                    error_msg = f"{target_date} 采集失败: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
-                    self._update_progress("running", date_progress, error_msg)
+            # 之前采集过的（日期, 数据源）直接复用，只采集剩下的
+            results = {} if force_refresh else self._reuse_results(date_list, sources)
+            pending = {}
+            for source in sources:
+                source_dates = [target_date for target_date in date_list if (target_date, source) not in results]
+                if source_dates:
+                    pending[source] = source_dates
+            
+            if pending:
+                # AIBase采集会话在所有日期间共用：连接池、keep-alive连接和最新ID只需建立/发现一次
+                aibase_scraper = AIBaseNewsScraper(id_index=self.aibase_index)
+                async with aibase_scraper:
+                    if self.mode == 'concurrent' and sum(len(dates) for dates in pending.values()) > 1:
+                        crawl_results, errors, partial = await self._crawl_concurrently(pending, aibase_scraper)
+                    else:
+                        crawl_results, errors, partial = await self._crawl_sequentially(pending, aibase_scraper)
+                results.update(crawl_results)
+                crawled = set(crawl_results)
+            else:
+                crawled = set()
+                partial = set()
+            
+            all_articles = self._merge_results(date_list, sources, results)
             
             # 保存合并结果
-            return await self._save_results(date_list, all_articles, sources, errors)
+            return await self._save_results(date_list, sources, results, errors, crawled, partial)
             
         except Exception as e:
             error_msg = f"多日期采集失败: {str(e)}"
@@ -103,14 +132,174 @@ class MultiDateCrawler:
         finally:
             self.is_running = False
     
-    async def _crawl_single_date(self, target_date: str, sources: List[str]) -> Tuple[List, List[str]]:
+    def _reuse_results(self, date_list: List[str], sources: List[str]) -> Dict:
+        """查找可以复用的已采集结果 {(日期, 数据源): 文章列表}"""
+        results = {}
+        details = []
+        for target_date in date_list:
+            for source in sources:
+                reusable = article_store.get_reusable(target_date, source)
+                if reusable is None:
+                    continue
+                articles, crawled_at = reusable
+                results[(target_date, source)] = articles
+                details.append(f"♻️ {target_date} {SOURCE_NAMES.get(source, source)}: 复用 "
+                               f"{datetime.fromtimestamp(crawled_at).strftime('%m-%d %H:%M')} 的采集结果（{len(articles)} 篇）")
+        if results:
+            self._update_progress("running", 5, f"已有 {len(results)} 个（日期, 数据源）采集过，直接复用", details)
+        return results
+    
+    async def _crawl_sequentially(self, pending: Dict[str, List[str]],
+                                  aibase_scraper: AIBaseNewsScraper) -> Tuple[Dict, List[str], Set]:
         """
-        采集单个日期的资讯
+        逐个采集：腾讯研究院一次性采集所有日期，AIBase快讯按日期依次采集
+        Args:
+            pending: 各数据源需要采集的日期 {数据源: [日期]}
+        Returns:
+            ({(日期, 数据源): 文章列表}, 错误列表, 采集不完整（有错误）的（日期, 数据源）)
+        """
+        results = {}
+        errors = []
+        partial = set()
+        
+        if 'tencent' in pending and self.is_running:
+            self._update_progress("running", 0, f"正在采集腾讯研究院 {len(pending['tencent'])} 个日期的文章...")
+            tencent_results, tencent_errors = await self._crawl_tencent(pending['tencent'])
+            results.update(tencent_results)
+            errors.extend(tencent_errors)
+            if tencent_errors:
+                partial.update(tencent_results)
+        
+        if 'aibase' in pending:
+            date_list = pending['aibase']
+            total_dates = len(date_list)
+            for i, target_date in enumerate(date_list):
+                if not self.is_running:
+                    break
+                    
+                date_progress = int((i / total_dates) * 90)  # 留10%给最后的保存
+                self._update_progress("running", date_progress, 
+                                    f"正在采集 {target_date} 的AIBase快讯... ({i+1}/{total_dates})")
+                
+                date_articles, date_errors = await self._crawl_aibase(target_date, aibase_scraper)
+                results[(target_date, 'aibase')] = date_articles
+                errors.extend(date_errors)
+                if date_errors:
+                    partial.add((target_date, 'aibase'))
+                
+                self._update_progress("running", date_progress + 5, 
+                                    f"{target_date} 采集完成，获得 {len(date_articles)} 篇文章")
+        
+        return results, errors, partial
+    
+    async def _crawl_concurrently(self, pending: Dict[str, List[str]],
+                                  aibase_scraper: AIBaseNewsScraper) -> Tuple[Dict, List[str], Set]:
+        """
+        并发采集：腾讯研究院（一次覆盖所有日期）与各日期的AIBase快讯同时进行
+        - 同时运行的任务数受 CRAWLER_CONFIG['concurrent_limit'] 限制
+        - 每个数据源另有 CRAWLER_CONFIG['source_concurrency'] 上限
+        Args:
+            pending: 各数据源需要采集的日期 {数据源: [日期]}
+        Returns:
+            ({(日期, 数据源): 文章列表}, 错误列表, 采集不完整（有错误）的（日期, 数据源）)
+        """
+        jobs = []
+        if 'tencent' in pending:
+            jobs.append(('tencent', None))
+        if 'aibase' in pending:
+            jobs.extend(('aibase', target_date) for target_date in pending['aibase'])
+        total = len(jobs)
+        
+        global_semaphore = asyncio.Semaphore(self.concurrent_limit)
+        source_semaphores = {
+            source: asyncio.Semaphore(self.source_concurrency.get(source, self.concurrent_limit))
+            for source in pending
+        }
+        finished = 0
+        
+        async def run_job(source: str, target_date: str) -> Tuple[Dict, List[str]]:
+            nonlocal finished
+            async with source_semaphores[source], global_semaphore:
+                if not self.is_running:
+                    return {}, []
+                if source == 'tencent':
+                    job_results, job_errors = await self._crawl_tencent(pending['tencent'])
+                else:
+                    date_articles, job_errors = await self._crawl_aibase(target_date, aibase_scraper)
+                    job_results = {(target_date, source): date_articles}
+            
+            finished += 1
+            label = SOURCE_NAMES.get(source, source) if target_date is None else f"{target_date} {SOURCE_NAMES.get(source, source)}"
+            count = sum(len(job_articles) for job_articles in job_results.values())
+            self._update_progress("running", int(finished / total * 90),  # 留10%给最后的保存
+                                f"{label} 采集完成，获得 {count} 篇文章 ({finished}/{total})")
+            return job_results, job_errors
+        
+        pairs = sum(len(dates) for dates in pending.values())
+        self._update_progress("running", 0, f"并发采集 {pairs} 个（日期, 数据源）...")
+        outcomes = await asyncio.gather(*(run_job(source, d) for source, d in jobs), return_exceptions=True)
+        
+        results = {}
+        errors = []
+        partial = set()
+        for (source, target_date), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                error_msg = f"{target_date or '全部日期'} {SOURCE_NAMES.get(source, source)} 采集失败: {str(outcome)}"
+                errors.append(error_msg)
+                logger.error(error_msg)
+                continue
+            results.update(outcome[0])
+            errors.extend(outcome[1])
+            if outcome[1]:
+                partial.update(outcome[0])
+        
+        return results, errors, partial
+    
+    def _merge_results(self, date_list: List[str], sources: List[str], results: Dict) -> List:
+        """按日期、数据源顺序合并 {(日期, 数据源): 文章列表}"""
+        all_articles = []
+        for target_date in date_list:
+            for source in sources:
+                all_articles.extend(results.get((target_date, source), []))
+        return all_articles
+    
+    async def _crawl_tencent(self, date_list: List[str]) -> Tuple[Dict, List[str]]:
+        """
+        采集腾讯研究院：列表页只加载一次，覆盖全部日期后按日期分组
+        Args:
+            date_list: 日期列表 YYYY-MM-DD
+        Returns:
+            ({(日期, 'tencent'): 文章列表}, 错误列表)
+        """
+        results = {}
+        errors = []
+        date_range = f"{date_list[0]}~{date_list[-1]}" if len(date_list) > 1 else date_list[0]
+        
+        try:
+            target_dates = [datetime.strptime(target_date, '%Y-%m-%d').date() for target_date in date_list]
+            scraper = SohuScraper()
+            articles_by_date, tencent_errors = await scraper.scrape_articles_by_date(target_dates)
+            
+            for target_date, target_date_obj in zip(date_list, target_dates):
+                results[(target_date, 'tencent')] = articles_by_date.get(target_date_obj, [])
+                logger.info(f"腾讯研究院 {target_date}: 获取 {len(results[(target_date, 'tencent')])} 篇文章")
+            errors.extend([f"腾讯研究院({date_range}): {error}" for error in tencent_errors])
+        except Exception as e:
+            error_msg = f"腾讯研究院 {date_range} 采集异常: {str(e)}"
+            errors.append(error_msg)
+            logger.error(error_msg)
+        
+        return results, errors
+    
+    async def _crawl_aibase(self, target_date: str,
+                            aibase_scraper: AIBaseNewsScraper = None) -> Tuple[List, List[str]]:
+        """
+        采集单个日期的AIBase快讯
         Args:
             target_date: 目标日期 YYYY-MM-DD
-            sources: 数据源列表
+            aibase_scraper: 共用的AIBase采集器（在 async with 会话内），不传则单独创建
         Returns:
-            (文章列表, 错误列表)
+            (文章列表, 错误列表)；采集不完整（部分ID获取失败等）时错误列表中有相应说明
         """
         articles = []
         errors = []
@@ -118,96 +307,92 @@ class MultiDateCrawler:
         # 转换日期格式
         target_date_obj = datetime.strptime(target_date, '%Y-%m-%d').date()
         
-        # 采集腾讯研究院
-        if 'tencent' in sources:
-            try:
-                scraper = SohuScraper()
-                tencent_articles, tencent_errors = await scraper.scrape_articles(target_date_obj, target_date_obj)
-                articles.extend(tencent_articles)
-                errors.extend([f"腾讯研究院({target_date}): {error}" for error in tencent_errors])
-                logger.info(f"腾讯研究院 {target_date}: 获取 {len(tencent_articles)} 篇文章")
-            except Exception as e:
-                error_msg = f"腾讯研究院 {target_date} 采集异常: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
-        
-        # 采集AIBase快讯
-        if 'aibase' in sources:
-            try:
-                scraper = AIBaseNewsScraper()
-                # AIBase采集前一天的数据
-                aibase_date_obj = target_date_obj - timedelta(days=1)
-                aibase_date = aibase_date_obj.strftime('%Y-%m-%d')
-                
-                news_list = await scraper.get_news_by_date(aibase_date)
+        try:
+            scraper = aibase_scraper or AIBaseNewsScraper(id_index=self.aibase_index)
+            # AIBase采集前一天的数据
+            aibase_date_obj = target_date_obj - timedelta(days=1)
+            aibase_date = aibase_date_obj.strftime('%Y-%m-%d')
+            
+            status = {}
+            news_list = await scraper.get_news_by_date(aibase_date, status=status)
+            if not status.get('complete'):
+                errors.append(f"AIBase快讯 {target_date} 采集不完整（{len(status.get('failed_ids', []))} 个ID获取失败"
+                              f"或未回溯到目标日期之前），结果不作为可复用的采集结果")
+            
+            # 转换为Article格式
+            for news in news_list:
+                # 创建一个简单的文章对象
+                article_dict = {
+                    'title': news.get('title', ''),
+                    'date': target_date,  # 使用目标日期
+                    'content': news.get('content', news.get('summary', '')),
+                    'url': news.get('url', ''),
+                    'source': news.get('source', 'AIBase快讯'),
+                    'weight': news.get('weight', 5)
+                }
                 
-                # 转换为Article格式
-                for news in news_list:
-                    # 创建一个简单的文章对象
-                    article_dict = {
-                        'title': news.get('title', ''),
-                        'date': target_date,  # 使用目标日期
-                        'content': news.get('content', news.get('summary', '')),
-                        'url': news.get('url', ''),
-                        'source': news.get('source', 'AIBase快讯'),
-                        'weight': news.get('weight', 5)
-                    }
-                    
-                    # 创建一个具有to_dict方法的对象
-                    class SimpleArticle:
-                        def __init__(self, data):
-                            self.__dict__.update(data)
-                        def to_dict(self):
-                            return self.__dict__
-                    
-                    articles.append(SimpleArticle(article_dict))
+                # 创建一个具有to_dict方法的对象
+                class SimpleArticle:
+                    def __init__(self, data):
+                        self.__dict__.update(data)
+                    def to_dict(self):
+                        return self.__dict__
                 
-                logger.info(f"AIBase快讯 {target_date}(实际{aibase_date}): 获取 {len(news_list)} 条快讯")
-            except Exception as e:
-                error_msg = f"AIBase快讯 {target_date} 采集异常: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+                articles.append(SimpleArticle(article_dict))
+            
+            logger.info(f"AIBase快讯 {target_date}(实际{aibase_date}): 获取 {len(news_list)} 条快讯")
+        except Exception as e:
+            error_msg = f"AIBase快讯 {target_date} 采集异常: {str(e)}"
+            errors.append(error_msg)
+            logger.error(error_msg)
         
         return articles, errors
     
-    async def _save_results(self, date_list: List[str], all_articles: List, sources: List[str], errors: List[str]) -> Dict:
-        """保存采集结果"""
+    async def _save_results(self, date_list: List[str], sources: List[str], results: Dict,
+                            errors: List[str], crawled: set, partial: set = None) -> Dict:
+        """
+        保存采集结果
+        Args:
+            results: {(日期, 数据源): 文章列表}（包括复用的结果）
+            crawled: 本次实际采集的（日期, 数据源），登记到按日期的索引中
+            partial: 其中采集不完整的（日期, 数据源），登记时标记，后续采集不复用
+        """
         self._update_progress("running", 90, "正在保存采集结果...")
         
-        # 生成合并的缓存文件
-        date_range = f"{date_list[0]}_to_{date_list[-1]}" if len(date_list) > 1 else date_list[0]
-        cache_file = os.path.join(Config.CACHE_DIR, f"articles_multi_{date_range.replace('-', '')}.json")
-        
-        result_data = {
-            'date_range': date_list,
-            'articles': [article.to_dict() if hasattr(article, 'to_dict') else article for article in all_articles],
-            'timestamp': datetime.now().isoformat(),
-            'total': len(all_articles),
-            'sources': sources,
-            'errors': errors
-        }
-        
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(result_data, f, ensure_ascii=False, indent=2)
+        # 按日期、数据源顺序保存合并结果到文章缓存
+        partitions = [
+            (target_date, source, [article.to_dict() if hasattr(article, 'to_dict') else article
+                                   for article in results.get((target_date, source), [])])
+            for target_date in date_list for source in sources
+        ]
+        articles = [article for _, _, part in partitions for article in part]
+        reused = sorted(f"{target_date}|{source}" for target_date, source in results if (target_date, source) not in crawled)
+        cache_key = range_entry_name(date_list)
+        article_store.put_crawl(cache_key, partitions, indexed=crawled, partial=partial,
+                                meta={'date_range': date_list, 'sources': sources, 'errors': errors})
+        article_db.upsert_partitions(partitions, crawled)
         
-        success_msg = f"多日期采集完成！共获取 {len(all_articles)} 篇文章"
+        success_msg = f"多日期采集完成！共获取 {len(articles)} 篇文章"
         if errors:
             success_msg += f"，{len(errors)} 个错误"
             
         self._update_progress("completed", 100, success_msg, 
                             [f"采集日期: {len(date_list)} 天", 
-                             f"成功文章: {len(all_articles)} 篇",
+                             f"成功文章: {len(articles)} 篇",
+                             f"复用结果: {len(reused)} 个（日期, 数据源）",
+                             f"不完整: {len(partial or ())} 个（日期, 数据源），下次采集时重新采集",
                              f"错误数量: {len(errors)} 个",
-                             f"缓存文件: {os.path.basename(cache_file)}"])
+                             f"缓存条目: {cache_key}"])
         
         return {
             'success': True,
-            'articles': [article.to_dict() if hasattr(article, 'to_dict') else article for article in all_articles],
-            'total': len(all_articles),
+            'articles': articles,
+            'total': len(articles),
             'date_range': date_list,
             'sources': sources,
             'errors': errors,
-            'cache_file': cache_file
+            'cache_key': cache_key,
+            'reused': reused
         }
     
     def stop_crawling(self):
@@ -4,14 +4,15 @@ import logging
 from datetime import datetime
 from typing import Dict
 from pathlib import Path
-from playwright.async_api import async_playwright
 from config import Config
+from scrapers.browser_pool import BrowserPool, get_browser_pool
 from PIL import Image # 导入Pillow库
 
 logger = logging.getLogger(__name__)
 
 class PosterGenerator:
-    def __init__(self):
+    def __init__(self, browser_pool: BrowserPool = None):
+        self.browser_pool = browser_pool  # 未指定时使用当前事件循环共享的浏览器池
         self.output_dir = Config.POSTERS_DIR
         os.makedirs(self.output_dir, exist_ok=True)
         # 更宽的海报展示尺寸
@@ -130,39 +131,29 @@ class PosterGenerator:
         使用 Playwright 将 HTML 渲染为 JPG
         """
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-dev-shm-usage']
-                )
-                try:
-                    page = await browser.new_page(
-                        viewport=self.viewport_size,
-                        device_scale_factor=2
+            pool = self.browser_pool or get_browser_pool()
+            async with pool.page(viewport=self.viewport_size, device_scale_factor=2) as page:
+                await page.set_content(html_content, wait_until='networkidle')
+                await page.wait_for_timeout(1000)
+                content_height = await page.evaluate("""
+                    () => Math.max(
+                        document.body.scrollHeight, document.body.offsetHeight,
+                        document.documentElement.clientHeight, document.documentElement.scrollHeight,
+                        document.documentElement.offsetHeight
                     )
-                    await page.set_content(html_content, wait_until='networkidle')
-                    await page.wait_for_timeout(1000)
-                    content_height = await page.evaluate("""
-                        () => Math.max(
-                            document.body.scrollHeight, document.body.offsetHeight,
-                            document.documentElement.clientHeight, document.documentElement.scrollHeight,
-                            document.documentElement.offsetHeight
-                        )
-                    """)
-                    await page.set_viewport_size({
-                        "width": self.viewport_size["width"],
-                        "height": max(content_height, self.viewport_size["height"])
-                    })
-                    await page.screenshot(
-                        path=output_path,
-                        type='jpeg',
-                        quality=quality,
-                        full_page=True
-                    )
-                    logger.info(f"HTML 转 JPG 成功: {output_path}")
-                    return True
-                finally:
-                    await browser.close()
+                """)
+                await page.set_viewport_size({
+                    "width": self.viewport_size["width"],
+                    "height": max(content_height, self.viewport_size["height"])
+                })
+                await page.screenshot(
+                    path=output_path,
+                    type='jpeg',
+                    quality=quality,
+                    full_page=True
+                )
+                logger.info(f"HTML 转 JPG 成功: {output_path}")
+                return True
         except Exception as e:
             logger.error(f"HTML 转 JPG 失败: {e}")
             if "playwright" in str(e).lower():
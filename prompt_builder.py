@@ -0,0 +1,227 @@
+"""
+日报提示词组装
+在本地估算token数，按 REPORT_CONFIG 中的输入预算组装日报的用户消息（AI_PROMPT_TEMPLATE）：
+去除套话、每篇文章只保留信息量最高的几句，预算不足时优先保留高权重来源的文章
+"""
+import logging
+import re
+from typing import Dict, List, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 中文字符约 0.6 token/字，其它字符约 0.3 token/字（DeepSeek 官方给出的估算比例）
+_CJK_RE = re.compile(r'[\u3400-\u9fff\uf900-\ufaff\u3000-\u303f\uff00-\uffef]')
+
+# 句子切分：中英文句末标点与换行
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[。！？!?；;])|\n+')
+
+# 套话：来源声明、关注引导、版权与编辑信息等
+_BOILERPLATE_RE = re.compile(
+    r'(点击.{0,6}关注|关注我们|欢迎关注|扫码|二维码|长按识别|免责声明|版权(声明|所有|归)|转载(请|须)|'
+    r'未经授权|原标题|本文(来源|转自|作者)|来源[:：]|责任编辑|编辑[:：]|作者[:：]|图片来源|'
+    r'文章来源|阅读原文|点赞|在看|分享给|AIbase基地|更多AI资讯|投稿)'
+)
+_URL_RE = re.compile(r'https?://\S+')
+_WS_RE = re.compile(r'\s+')
+
+# 信息量特征：数字、英文专有名词、关键动作词
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?\s*(?:%|亿|万|倍|B|K|M|美元|元|个|款|项|家)?')
+_LATIN_TERM_RE = re.compile(r'[A-Za-z][A-Za-z0-9\-\.]{1,}')
+_KEYWORD_RE = re.compile(
+    r'(发布|推出|开源|上线|宣布|融资|收购|首个|首款|突破|超过|提升|降低|模型|芯片|智能体|Agent|'
+    r'大模型|多模态|推理|训练|参数|估值|合作|监管|政策|报告)'
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """本地估算token数（不调用分词器）"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return int(cjk * 0.6 + (len(text) - cjk) * 0.3) + 1
+
+
+class ReportPromptBuilder:
+    """按token预算组装日报提示词"""
+
+    def __init__(self, report_config: Dict = None, template: str = None, system_prompt: str = None):
+        report_config = report_config or Config.REPORT_CONFIG
+        self.template = template or Config.AI_PROMPT_TEMPLATE
+        self.system_prompt = system_prompt if system_prompt is not None else Config.AI_REPORT_SYSTEM_PROMPT
+        self.input_token_budget = report_config.get('input_token_budget', 24000)
+        self.max_sentences = report_config.get('max_sentences_per_article', 4)
+        self.max_chars = report_config.get('max_chars_per_article', 360)
+        self.source_weights = {
+            '腾讯': report_config.get('tencent_weight', 8),
+            'AIBase': report_config.get('aibase_weight', 5)
+        }
+
+    def fingerprint(self) -> Dict:
+        """影响提示词内容的参数（参与日报缓存键的计算）"""
+        return {
+            'input_token_budget': self.input_token_budget,
+            'max_sentences': self.max_sentences,
+            'max_chars': self.max_chars,
+            'source_weights': self.source_weights
+        }
+
+    def source_weight(self, article: Dict) -> int:
+        """来源权重：优先使用 REPORT_CONFIG 中的配置，其次是文章自带的 weight"""
+        source = article.get('source', '') or ''
+        for keyword, weight in self.source_weights.items():
+            if keyword.lower() in source.lower():
+                return weight
+        return article.get('weight', 5)
+
+    @staticmethod
+    def format_article(index: int, article: Dict, content: str, weight: int) -> str:
+        """单篇文章在提示词中的格式（去重合并的文章附带其它来源）"""
+        source = article.get('source', '未知')
+        others = [name for name in article.get('merged_sources', []) if name != source]
+        if others:
+            source = f"{source}，另见{'、'.join(others)}"
+        return f"""
+【资讯{index}】
+来源：{source}（权重：{weight}分）
+标题：{article.get('title', '')}
+时间：{article.get('date', '')} {article.get('time_text', '')}
+内容：{content}
+URL：{article.get('url', '')}
+---
+"""
+
+    @staticmethod
+    def _score_sentence(sentence: str, position: int) -> float:
+        """句子信息量评分：数字、英文专有名词、关键词越多越高，导语句略加分"""
+        score = 0.0
+        score += 1.5 * len(_NUMBER_RE.findall(sentence))
+        score += 1.0 * len(_LATIN_TERM_RE.findall(sentence))
+        score += 1.2 * len(_KEYWORD_RE.findall(sentence))
+        if position == 0:
+            score += 2.0
+        # 过短的句子信息有限，过长的句子按长度折算
+        length = len(sentence)
+        if length < 12:
+            score *= 0.5
+        return score / max(1.0, length / 80)
+
+    def compress_content(self, text: str, max_sentences: int = None, max_chars: int = None) -> str:
+        """去除套话和链接，按原顺序保留信息量最高的句子"""
+        max_sentences = max_sentences or self.max_sentences
+        max_chars = max_chars or self.max_chars
+        text = _URL_RE.sub('', text or '')
+
+        sentences = []
+        seen = set()
+        for raw in _SENTENCE_SPLIT_RE.split(text):
+            sentence = _WS_RE.sub(' ', raw or '').strip()
+            if len(sentence) < 4 or sentence in seen or _BOILERPLATE_RE.search(sentence):
+                continue
+            seen.add(sentence)
+            sentences.append(sentence)
+        if not sentences:
+            return ''
+
+        ranked = sorted(range(len(sentences)),
+                        key=lambda i: self._score_sentence(sentences[i], i), reverse=True)
+        chosen = []
+        total = 0
+        for i in ranked:
+            if len(chosen) >= max_sentences:
+                break
+            if chosen and total + len(sentences[i]) > max_chars:
+                continue
+            chosen.append(i)
+            total += len(sentences[i])
+
+        content = ''.join(sentences[i] for i in sorted(chosen))
+        return content[:max_chars]
+
+    def information_score(self, article: Dict) -> float:
+        """文章信息量评分（标题与压缩后保留句子的评分之和），模型初筛失败时用于排序"""
+        content = self.compress_content(article.get('content', article.get('summary', '')) or '')
+        sentences = [sentence for sentence in _SENTENCE_SPLIT_RE.split(content) if sentence]
+        return (self._score_sentence(article.get('title', '') or '', 0)
+                + sum(self._score_sentence(sentence, i) for i, sentence in enumerate(sentences)))
+
+    def format_chunk(self, articles: List[Dict]) -> str:
+        """分块初筛时的资讯列表（每篇文章压缩后按原顺序编号）"""
+        parts = []
+        for index, article in enumerate(articles, 1):
+            raw_content = article.get('content', article.get('summary', '')) or ''
+            content = self.compress_content(raw_content) or raw_content[:self.max_chars]
+            parts.append(self.format_article(index, article, content, self.source_weight(article)))
+        return ''.join(parts)
+
+    def build(self, articles: List[Dict], target_date: str) -> Tuple[str, Dict]:
+        """
+        组装日报提示词（用户消息部分，系统消息的token数计入预算）
+        未超出预算时文章原样、按原顺序放入；超出时从低权重文章开始依次压缩内容、只保留导语、舍弃，
+        直到不超出预算，文章仍保持原顺序
+        Args:
+            articles: 采集的文章列表
+            target_date: 目标日期
+        Returns:
+            (提示词, 统计信息 {'articles_in', 'articles_out', 'articles_trimmed', 'tokens_before', 'tokens_after', 'budget'})
+        """
+        overhead = (estimate_tokens(self.system_prompt)
+                    + estimate_tokens(self.template.format(date=target_date, content='')))
+        weights = [self.source_weight(article) for article in articles]
+        raw_contents = [article.get('content', article.get('summary', '')) or '' for article in articles]
+        contents = list(raw_contents)
+        costs = [estimate_tokens(self.format_article(0, article, content, weight))
+                 for article, content, weight in zip(articles, contents, weights)]
+        # 原始提示词的token数（所有文章全文）
+        tokens_before = overhead + sum(costs)
+
+        # 低权重的先处理，同权重时靠后的先处理；每一级都在回到预算内时停止
+        order = sorted(range(len(articles)), key=lambda i: (weights[i], -i))
+        kept = [True] * len(articles)
+        total = tokens_before
+        # 三级处理：保留信息量最高的几句 → 只保留导语 → 舍弃（None）
+        steps = (
+            lambda i: self.compress_content(raw_contents[i]) or raw_contents[i][:self.max_chars],
+            lambda i: self.compress_content(raw_contents[i], max_sentences=1, max_chars=self.max_chars // 3),
+            None
+        )
+        for step in steps:
+            for i in order:
+                if total <= self.input_token_budget:
+                    break
+                if not kept[i]:
+                    continue
+                if step is None:
+                    kept[i] = False
+                    total -= costs[i]
+                    continue
+                content = step(i)
+                if len(content) >= len(contents[i]):
+                    continue
+                cost = estimate_tokens(self.format_article(0, articles[i], content, weights[i]))
+                total += cost - costs[i]
+                contents[i] = content
+                costs[i] = cost
+
+        selected = [(articles[i], contents[i], weights[i]) for i in range(len(articles)) if kept[i]]
+        trimmed = sum(1 for i in range(len(articles)) if kept[i] and contents[i] != raw_contents[i])
+        full_content = ''.join(self.format_article(index, article, content, weight)
+                               for index, (article, content, weight) in enumerate(selected, 1))
+        prompt = self.template.format(date=target_date, content=full_content)
+
+        stats = {
+            'articles_in': len(articles),
+            'articles_out': len(selected),
+            'articles_trimmed': trimmed,
+            'tokens_before': tokens_before,
+            'tokens_after': estimate_tokens(self.system_prompt) + estimate_tokens(prompt),
+            'budget': self.input_token_budget
+        }
+        logger.info(f"日报提示词: {stats['articles_out']}/{stats['articles_in']} 篇文章，"
+                    f"约 {stats['tokens_before']} → {stats['tokens_after']} tokens（预算 {stats['budget']}）")
+        return prompt, stats
+
+
+# 全局实例
+report_prompt_builder = ReportPromptBuilder()
@@ -0,0 +1,177 @@
+"""
+AI日报缓存
+以（规范化后的文章、提示词模板、模型、温度）的内容哈希为键，把 DeepSeek 生成的日报保存在磁盘上，
+文章集合与提示词都没有变化时直接返回上次的结果，无需再次调用API
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+try:
+    from config import Config
+    REPORT_CACHE_CONFIG = Config.REPORT_CACHE_CONFIG
+    DEFAULT_CACHE_DIR = os.path.join(Config.CACHE_DIR, 'report_cache')
+except (ImportError, AttributeError):
+    REPORT_CACHE_CONFIG = {}
+    DEFAULT_CACHE_DIR = os.path.join('cache', 'report_cache')
+
+logger = logging.getLogger(__name__)
+
+# 参与生成日报的文章字段（与 DeepSeekAPI.generate_daily_report 拼接提示词时使用的字段一致）
+ARTICLE_KEY_FIELDS = ('source', 'weight', 'title', 'date', 'time_text', 'content', 'url')
+
+
+def _normalize_text(value) -> str:
+    """统一空白字符，避免仅因格式差异导致缓存失效"""
+    return ' '.join(str(value).split()) if value is not None else ''
+
+
+def normalize_articles(articles: Iterable[Dict]) -> list:
+    """提取参与生成日报的字段并规范化（保持原有顺序，顺序会影响提示词中的编号）"""
+    normalized = []
+    for article in articles:
+        item = {field: _normalize_text(article.get(field)) for field in ARTICLE_KEY_FIELDS}
+        if not item['content']:
+            item['content'] = _normalize_text(article.get('summary'))
+        normalized.append(item)
+    return normalized
+
+
+def make_report_key(articles: Iterable[Dict], target_date: str, prompt_template: str,
+                    model: str, temperature: float, options: Dict = None) -> str:
+    """
+    计算日报缓存键（SHA-256）
+    Args:
+        options: 其它影响提示词内容的参数（如提示词组装的token预算）
+    """
+    payload = json.dumps({
+        'articles': normalize_articles(articles),
+        'date': target_date,
+        'prompt_template': prompt_template,
+        'model': model,
+        'temperature': temperature,
+        'options': options or {}
+    }, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """磁盘日报缓存，支持过期时间和按条数、总大小淘汰（最久未使用的先淘汰）"""
+
+    def __init__(self, cache_dir: str = None, ttl_hours: float = None,
+                 max_entries: int = None, max_size_mb: float = None):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.enabled = REPORT_CACHE_CONFIG.get('enabled', True)
+        self.ttl_seconds = (ttl_hours or REPORT_CACHE_CONFIG.get('ttl_hours', 72)) * 3600
+        self.max_entries = max_entries or REPORT_CACHE_CONFIG.get('max_entries', 200)
+        self.max_bytes = int((max_size_mb or REPORT_CACHE_CONFIG.get('max_size_mb', 50)) * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        读取缓存的日报
+        Returns:
+            缓存的结果字典；不存在、已过期或读取失败时返回 None
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                if time.time() - entry.get('created_at', 0) > self.ttl_seconds:
+                    os.remove(path)
+                    self.misses += 1
+                    return None
+                # 更新修改时间，淘汰时按最近使用时间排序
+                os.utime(path, None)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            except Exception as e:
+                logger.warning(f"读取日报缓存失败: {e}")
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry.get('result')
+
+    def put(self, key: str, result: Dict):
+        """写入缓存并执行淘汰"""
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                path = self._path(key)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'key': key, 'created_at': time.time(), 'result': result}, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+                self._evict()
+            except Exception as e:
+                logger.warning(f"写入日报缓存失败: {e}")
+
+    def invalidate(self, key: str):
+        """删除一条缓存"""
+        with self._lock:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        """删除过期条目，再按最近使用时间淘汰超出条数或总大小的条目，调用方需持有锁"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            # 修改时间不早于创建时间，修改时间已超过 TTL 的条目一定已过期
+            if now - stat.st_mtime > self.ttl_seconds:
+                os.remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            os.remove(path)
+            total_bytes -= size
+            logger.debug(f"淘汰日报缓存: {os.path.basename(path)}")
+
+    def get_stats(self) -> Dict:
+        """缓存统计"""
+        entries = 0
+        total_bytes = 0
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json'):
+                    entries += 1
+                    total_bytes += os.path.getsize(os.path.join(self.cache_dir, name))
+        return {
+            'enabled': self.enabled,
+            'entries': entries,
+            'size_bytes': total_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+# 全局实例
+report_cache = ReportCache()
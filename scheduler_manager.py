@@ -2,7 +2,6 @@
 定时任务管理器
 支持定时采集、生成日报、推送海报的完整流程
 """
-import asyncio
 import json
 import os
 import logging
@@ -20,6 +19,8 @@ from multi_date_crawler import MultiDateCrawler
 from deepseek_api import DeepSeekAPI
 from webhook import KingsoftWebhook
 from poster_gen import PosterGenerator
+from event_loop_service import event_loop_service
+from job_registry import job_registry
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +47,6 @@ class ScheduledTaskManager:
             timezone='Asia/Shanghai'
         )
         
-        self.task_status = {}
         self.progress_callbacks = {}
         self.is_running = False
         
@@ -219,17 +219,12 @@ class ScheduledTaskManager:
         task_name = task_config['name']
         job_id = f"daily_report_{task_name}"
         
+        # 每次执行登记为一个独立的后台任务（名额已满时排队等待）
+        run_id = job_registry.create_job('scheduled', name=f"每日报告任务: {task_name}", ref=job_id, wait=True)
+        
         try:
             logger.info(f"开始执行每日报告任务: {task_name}")
-            
-            # 更新任务状态
-            self.task_status[job_id] = {
-                'status': 'running',
-                'progress': 0,
-                'message': '开始执行每日报告任务...',
-                'start_time': datetime.now().isoformat(),
-                'details': []
-            }
+            job_registry.update(run_id, message='开始执行每日报告任务...')
             
             # 计算目标日期列表（周一=近3天，其它=单日）
             days_back = task_config.get('days_back', 0)
@@ -243,15 +238,15 @@ class ScheduledTaskManager:
                     (today - timedelta(days=1)).strftime('%Y-%m-%d'),
                     today.strftime('%Y-%m-%d')
                 ]
-                self.task_status[job_id]['details'].append('📅 周一自动启用多日采集（近3天，含当天）')
+                job_registry.add_detail(run_id, '📅 周一自动启用多日采集（近3天，含当天）')
             else:
                 # 其他工作日：保持单日
                 target_date = (today - timedelta(days=days_back)).strftime('%Y-%m-%d')
                 date_list = [target_date]
             
             # 执行完整流程
-            asyncio.run(self._run_complete_workflow(
-                job_id=job_id,
+            event_loop_service.run(self._run_complete_workflow(
+                job_id=run_id,
                 date_list=date_list,
                 sources=task_config['sources'],
                 webhook_enabled=task_config['webhook_enabled'],
@@ -260,13 +255,7 @@ class ScheduledTaskManager:
             
         except Exception as e:
             logger.error(f"每日报告任务执行失败: {task_name}, 错误: {e}")
-            self.task_status[job_id] = {
-                'status': 'error',
-                'progress': 0,
-                'message': f'任务执行失败: {str(e)}',
-                'end_time': datetime.now().isoformat(),
-                'error': str(e)
-            }
+            job_registry.fail(run_id, f'任务执行失败: {str(e)}', error=str(e))
     
     def _execute_one_time_task(self, task_config: Dict):
         """执行一次性任务"""
@@ -274,21 +263,15 @@ class ScheduledTaskManager:
         execute_time = task_config['execute_time']
         job_id = f"one_time_{task_name}_{int(datetime.strptime(execute_time, '%Y-%m-%d %H:%M').timestamp())}"
         
+        run_id = job_registry.create_job('scheduled', name=f"一次性任务: {task_name}", ref=job_id, wait=True)
+        
         try:
             logger.info(f"开始执行一次性任务: {task_name}")
-            
-            # 更新任务状态
-            self.task_status[job_id] = {
-                'status': 'running',
-                'progress': 0,
-                'message': '开始执行一次性任务...',
-                'start_time': datetime.now().isoformat(),
-                'details': []
-            }
+            job_registry.update(run_id, message='开始执行一次性任务...')
             
             # 执行完整流程
-            asyncio.run(self._run_complete_workflow(
-                job_id=job_id,
+            event_loop_service.run(self._run_complete_workflow(
+                job_id=run_id,
                 date_list=task_config['date_list'],
                 sources=task_config['sources'],
                 webhook_enabled=task_config['webhook_enabled'],
@@ -297,27 +280,26 @@ class ScheduledTaskManager:
             
         except Exception as e:
             logger.error(f"一次性任务执行失败: {task_name}, 错误: {e}")
-            self.task_status[job_id] = {
-                'status': 'error',
-                'progress': 0,
-                'message': f'任务执行失败: {str(e)}',
-                'end_time': datetime.now().isoformat(),
-                'error': str(e)
-            }
+            job_registry.fail(run_id, f'任务执行失败: {str(e)}', error=str(e))
     
     async def _run_complete_workflow(self, job_id: str, date_list: List[str], 
                                    sources: List[str], webhook_enabled: bool, 
                                    poster_enabled: bool):
-        """运行完整的工作流程：采集 -> 生成日报 -> 生成海报 -> 推送"""
+        """
+        运行完整的工作流程：采集 -> 生成日报 -> 生成海报 -> 推送
+        Args:
+            job_id: 任务注册表中本次执行的任务ID
+        """
         
         def update_progress(progress_data):
-            self.task_status[job_id].update(progress_data)
+            # 采集阶段占整体进度的 10% ~ 40%
+            job_registry.update(job_id, progress=10 + progress_data.get('progress', 0) * 0.3,
+                                message=progress_data.get('message'))
+            job_registry.add_detail(job_id, *progress_data.get('details', []))
         
         try:
             # 步骤1: 采集数据
-            self.task_status[job_id]['message'] = '正在采集资讯数据...'
-            self.task_status[job_id]['progress'] = 10
-            self.task_status[job_id]['details'] = ['🔄 开始采集资讯数据...']
+            job_registry.update(job_id, progress=10, message='正在采集资讯数据...', detail='🔄 开始采集资讯数据...')
             
             crawler = MultiDateCrawler()
             crawler.set_progress_callback(update_progress)
@@ -331,12 +313,10 @@ class ScheduledTaskManager:
             if not articles:
                 raise Exception("没有采集到任何文章数据")
             
-            self.task_status[job_id]['details'].append(f'✅ 采集完成，共获取 {len(articles)} 篇文章')
+            job_registry.add_detail(job_id, f'✅ 采集完成，共获取 {len(articles)} 篇文章')
             
             # 步骤2: 生成AI日报
-            self.task_status[job_id]['message'] = '正在生成AI日报...'
-            self.task_status[job_id]['progress'] = 40
-            self.task_status[job_id]['details'].append('🤖 开始生成AI日报...')
+            job_registry.update(job_id, progress=40, message='正在生成AI日报...', detail='🤖 开始生成AI日报...')
             
             # 使用第一个日期作为日报日期
             report_date = date_list[0] if len(date_list) == 1 else f"{date_list[0]}_to_{date_list[-1]}"
@@ -360,7 +340,27 @@ class ScheduledTaskManager:
                 with open(md_file, 'w', encoding='utf-8') as f:
                     f.write(report_content)
                 
-                self.task_status[job_id]['details'].append('✅ AI日报生成完成')
+                job_registry.add_detail(job_id, '✅ AI日报生成完成（文章未变化，使用缓存）' if report_result.get('cached')
+                                        else '✅ AI日报生成完成')
+                call_stats = report_result.get('stats') or {}
+                if call_stats.get('cache_hit_rate') is not None:
+                    job_registry.add_detail(job_id, f"💾 上下文缓存命中 {call_stats['cache_hit_tokens']}/"
+                                                    f"{call_stats['cache_hit_tokens'] + call_stats['cache_miss_tokens']} 输入tokens"
+                                                    f"（耗时 {call_stats['latency']}s）")
+                dedup_stats = report_result.get('dedup')
+                if dedup_stats and dedup_stats['removed']:
+                    job_registry.add_detail(job_id, f"🔁 合并{dedup_stats['groups']}组重复资讯，"
+                                                    f"{dedup_stats['articles_in']} → {dedup_stats['articles_out']} 篇"
+                                                    f"（约节省 {dedup_stats['tokens_saved']} tokens）")
+                map_stats = report_result.get('map_reduce')
+                if map_stats:
+                    job_registry.add_detail(job_id, f"🧩 分{map_stats['chunks']}块初筛，{map_stats['shortlisted']}条入选"
+                                                    f"（耗时 {map_stats['map_seconds']}s）")
+                prompt_stats = report_result.get('prompt_stats')
+                if prompt_stats:
+                    job_registry.add_detail(job_id, f"✂️ 提示词约 {prompt_stats['tokens_before']} → "
+                                                    f"{prompt_stats['tokens_after']} tokens"
+                                                    f"（{prompt_stats['articles_out']}/{prompt_stats['articles_in']} 篇）")
                 
             finally:
                 await api.close_session()
@@ -368,14 +368,12 @@ class ScheduledTaskManager:
             # 步骤3: 生成海报（如果启用）
             poster_path = None
             if poster_enabled:
-                self.task_status[job_id]['message'] = '正在生成海报...'
-                self.task_status[job_id]['progress'] = 65
-                self.task_status[job_id]['details'].append('🎨 开始生成海报...')
+                job_registry.update(job_id, progress=65, message='正在生成海报...', detail='🎨 开始生成海报...')
                 
                 # 首先使用AI生成HTML模板（与手动操作保持一致）
                 custom_html = None
                 try:
-                    self.task_status[job_id]['details'].append('📝 正在调用AI生成海报HTML...')
+                    job_registry.add_detail(job_id, '📝 正在调用AI生成海报HTML...')
                     
                     # 重用已有的DeepSeek API实例或创建新的
                     html_api = DeepSeekAPI()
@@ -383,20 +381,20 @@ class ScheduledTaskManager:
                         html_result = await html_api.generate_poster_html(report_content, report_date)
                         if html_result.get('success'):
                             custom_html = html_result['html']
-                            self.task_status[job_id]['details'].append('✅ AI HTML模板生成成功')
+                            job_registry.add_detail(job_id, '✅ AI HTML模板生成成功')
                             logger.info("定时任务：AI HTML模板生成成功")
                         else:
-                            self.task_status[job_id]['details'].append(f'⚠️ AI HTML生成失败，将使用默认模板: {html_result.get("error")}')
+                            job_registry.add_detail(job_id, f'⚠️ AI HTML生成失败，将使用默认模板: {html_result.get("error")}')
                             logger.warning(f"定时任务：AI生成HTML失败，将使用默认模板: {html_result.get('error')}")
                     finally:
                         await html_api.close_session()
                         
                 except Exception as e:
-                    self.task_status[job_id]['details'].append(f'⚠️ AI HTML生成异常，将使用默认模板: {str(e)}')
+                    job_registry.add_detail(job_id, f'⚠️ AI HTML生成异常，将使用默认模板: {str(e)}')
                     logger.error(f"定时任务：AI生成HTML异常: {e}")
                 
                 # 生成海报图片
-                self.task_status[job_id]['details'].append('🖼️ 正在渲染海报图片...')
+                job_registry.add_detail(job_id, '🖼️ 正在渲染海报图片...')
                 generator = PosterGenerator()
                 poster_result = await generator.generate_poster_from_report(
                     report_content, 
@@ -407,70 +405,56 @@ class ScheduledTaskManager:
                 if poster_result.get('success'):
                     poster_path = poster_result['image_path']
                     html_source = "AI生成的HTML模板" if custom_html else "默认HTML模板"
-                    self.task_status[job_id]['details'].append(f'✅ 海报生成完成（使用{html_source}）')
+                    job_registry.add_detail(job_id, f'✅ 海报生成完成（使用{html_source}）')
                     logger.info(f"定时任务：海报生成完成，使用{html_source}")
                 else:
-                    self.task_status[job_id]['details'].append(f'⚠️ 海报生成失败: {poster_result.get("error")}')
+                    job_registry.add_detail(job_id, f'⚠️ 海报生成失败: {poster_result.get("error")}')
                     logger.warning(f"定时任务：海报生成失败: {poster_result.get('error')}")
             
             # 步骤4: 推送到Webhook（如果启用）
             if webhook_enabled:
-                self.task_status[job_id]['message'] = '正在推送到群聊...'
-                self.task_status[job_id]['progress'] = 85
+                job_registry.update(job_id, progress=85, message='正在推送到群聊...')
                 
                 webhook = KingsoftWebhook()
                 
                 # 按照默认顺序：先推送日报，再推送海报
                 # 推送日报
-                self.task_status[job_id]['details'].append('📤 推送日报到群聊...')
+                job_registry.add_detail(job_id, '📤 推送日报到群聊...')
                 report_webhook_result = await webhook.send_daily_report(report_content, report_date)
                 
                 if report_webhook_result.get('success'):
-                    self.task_status[job_id]['details'].append('✅ 日报推送完成')
+                    job_registry.add_detail(job_id, '✅ 日报推送完成')
                 else:
-                    self.task_status[job_id]['details'].append(f'⚠️ 日报推送失败: {report_webhook_result.get("error")}')
+                    job_registry.add_detail(job_id, f'⚠️ 日报推送失败: {report_webhook_result.get("error")}')
                     logger.warning(f"日报推送失败: {report_webhook_result.get('error')}")
                 
                 # 推送海报（如果生成成功）
                 if poster_path and os.path.exists(poster_path):
-                    self.task_status[job_id]['details'].append('📤 推送海报到群聊...')
+                    job_registry.add_detail(job_id, '📤 推送海报到群聊...')
                     poster_webhook_result = await webhook.send_poster_only(image_path=poster_path, date=report_date)
                     
                     if poster_webhook_result.get('success'):
-                        self.task_status[job_id]['details'].append('✅ 海报推送完成')
+                        job_registry.add_detail(job_id, '✅ 海报推送完成')
                     else:
-                        self.task_status[job_id]['details'].append(f'⚠️ 海报推送失败: {poster_webhook_result.get("error")}')
+                        job_registry.add_detail(job_id, f'⚠️ 海报推送失败: {poster_webhook_result.get("error")}')
                         logger.warning(f"海报推送失败: {poster_webhook_result.get('error')}")
             
             # 任务完成
-            self.task_status[job_id].update({
-                'status': 'completed',
-                'progress': 100,
-                'message': '定时任务执行完成',
-                'end_time': datetime.now().isoformat(),
-                'results': {
-                    'articles_count': len(articles),
-                    'report_generated': True,
-                    'poster_generated': poster_enabled and poster_path is not None,
-                    'webhook_sent': webhook_enabled,
-                    'date_range': date_list,
-                    'report_file': report_file,
-                    'poster_file': poster_path
-                }
+            job_registry.add_detail(job_id, '🎉 所有任务执行完成')
+            job_registry.complete(job_id, '定时任务执行完成', result={
+                'articles_count': len(articles),
+                'report_generated': True,
+                'poster_generated': poster_enabled and poster_path is not None,
+                'webhook_sent': webhook_enabled,
+                'date_range': date_list,
+                'report_file': report_file,
+                'poster_file': poster_path
             })
-            
-            self.task_status[job_id]['details'].append('🎉 所有任务执行完成')
             logger.info(f"定时任务完成: {job_id}")
             
         except Exception as e:
-            self.task_status[job_id].update({
-                'status': 'error',
-                'progress': 0,
-                'message': f'任务执行失败: {str(e)}',
-                'end_time': datetime.now().isoformat(),
-                'error': str(e)
-            })
-            self.task_status[job_id]['details'].append(f'❌ 任务执行失败: {str(e)}')
+            job_registry.add_detail(job_id, f'❌ 任务执行失败: {str(e)}')
+            job_registry.fail(job_id, f'任务执行失败: {str(e)}', error=str(e))
             logger.error(f"定时任务执行失败: {job_id}, 错误: {e}")
     
     def get_scheduled_tasks(self) -> List[Dict]:
@@ -497,7 +481,7 @@ class ScheduledTaskManager:
                         'next_run_time': job.next_run_time.isoformat() if job.next_run_time else None,
                         'trigger': str(job.trigger),
                         'config': job_config,
-                        'status': self.task_status.get(job.id, {'status': 'scheduled'})
+                        'status': job_registry.get_latest(ref=job.id) or {'status': 'scheduled'}
                     }
                     tasks.append(task_info)
                 except Exception as e:
@@ -519,9 +503,8 @@ class ScheduledTaskManager:
             self.scheduler.remove_job(job_id)
             self._remove_task_config(job_id)
             
-            # 清理任务状态
-            if job_id in self.task_status:
-                del self.task_status[job_id]
+            # 清理任务执行记录
+            job_registry.remove_ref(job_id)
             
             logger.info(f"已移除定时任务: {job_id}")
             
@@ -574,8 +557,16 @@ class ScheduledTaskManager:
             }
     
     def get_task_status(self, job_id: str) -> Dict:
-        """获取任务状态"""
-        return self.task_status.get(job_id, {'status': 'unknown'})
+        """获取任务状态（定时任务ID返回其最近一次执行，也可直接传入执行任务ID）"""
+        return job_registry.get(job_id) or job_registry.get_latest(ref=job_id) or {'status': 'unknown'}
+    
+    def get_all_task_status(self) -> Dict[str, Dict]:
+        """获取每个定时任务最近一次执行的状态（不含明细日志）"""
+        all_status = {}
+        for job in job_registry.list_jobs(operation='scheduled'):
+            if job['ref'] and job['ref'] not in all_status:
+                all_status[job['ref']] = job
+        return all_status
     
     def _save_task_config(self, job_id: str, config: Dict):
         """保存任务配置"""
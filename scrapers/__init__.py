@@ -1,5 +1,10 @@
 from .sohu_scraper import SohuScraper
 from .aibase_news_scraper import AIBaseNewsScraper
 from .base_scraper import BaseScraper, Article
+from .browser_pool import BrowserPool, get_browser_pool, close_browser_pool
+from .aibase_id_index import AIBaseIdIndex, aibase_id_index
+from .page_cache import PageCache, page_cache
 
-__all__ = ['SohuScraper', 'AIBaseNewsScraper', 'BaseScraper', 'Article']
\ No newline at end of file
+__all__ = ['SohuScraper', 'AIBaseNewsScraper', 'BaseScraper', 'Article',
+           'BrowserPool', 'get_browser_pool', 'close_browser_pool',
+           'AIBaseIdIndex', 'aibase_id_index', 'PageCache', 'page_cache']
\ No newline at end of file
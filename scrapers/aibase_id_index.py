@@ -0,0 +1,216 @@
+"""
+AIBase 新闻ID索引
+记录每个新闻ID的发布时间以及每天的ID边界，持久化到磁盘，
+使重复采集同一天时可以直接定位ID区间，无需重新发现最新ID并逐批回溯
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    from config import Config
+    DEFAULT_INDEX_FILE = os.path.join(Config.CACHE_DIR, 'aibase_id_index.json')
+except ImportError:
+    DEFAULT_INDEX_FILE = os.path.join('cache', 'aibase_id_index.json')
+
+logger = logging.getLogger(__name__)
+
+
+class AIBaseIdIndex:
+    """AIBase 新闻ID → 发布时间索引（线程安全）"""
+
+    def __init__(self, index_file: str = None, keep_days: int = 60, max_range_size: int = 1000):
+        """
+        Args:
+            index_file: 索引文件路径
+            keep_days: 保留最近多少天的记录
+            max_range_size: 单日ID区间的最大跨度，超过则视为索引不可靠
+        """
+        self.index_file = index_file or DEFAULT_INDEX_FILE
+        self.keep_days = keep_days
+        self.max_range_size = max_range_size
+        self._lock = threading.RLock()
+        self._ids: Dict[int, str] = {}      # ID -> "YYYY-MM-DD HH:MM:SS"
+        self._days: Dict[str, Dict] = {}    # 日期 -> {'first_id', 'last_id', 'count'[, 'lower', 'upper']}
+        self._loaded = False
+        self._dirty = False
+
+    def _ensure_loaded(self):
+        """首次使用时从磁盘加载"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for news_id, publish_time in data.get('ids', {}).items():
+                    self._add(int(news_id), publish_time)
+                for day, entry in data.get('days', {}).items():
+                    if 'lower' in entry and 'upper' in entry:
+                        self._days.setdefault(day, {'first_id': None, 'last_id': None, 'count': 0})
+                        self._days[day]['lower'] = entry['lower']
+                        self._days[day]['upper'] = entry['upper']
+                logger.info(f"加载AIBase ID索引: {len(self._ids)} 个ID, {len(self._days)} 天")
+        except Exception as e:
+            logger.warning(f"加载AIBase ID索引失败，将重新建立: {e}")
+            self._ids.clear()
+            self._days.clear()
+
+    def _add(self, news_id: int, publish_time: str):
+        """写入一条记录并更新当天的ID边界"""
+        old_time = self._ids.get(news_id)
+        if old_time == publish_time:
+            return
+        self._ids[news_id] = publish_time
+        if old_time:
+            # 发布时间变化（极少见），重新计算涉及日期的边界
+            self._rebuild_day(old_time[:10])
+            self._rebuild_day(publish_time[:10])
+            return
+
+        day = publish_time[:10]
+        entry = self._days.get(day)
+        if entry is None:
+            self._days[day] = {'first_id': news_id, 'last_id': news_id, 'count': 1}
+        elif not entry['count']:
+            entry.update({'first_id': news_id, 'last_id': news_id, 'count': 1})
+        else:
+            entry['first_id'] = min(entry['first_id'], news_id)
+            entry['last_id'] = max(entry['last_id'], news_id)
+            entry['count'] += 1
+
+    def _rebuild_day(self, day: str):
+        """根据ID表重新计算某天的边界"""
+        day_ids = [news_id for news_id, t in self._ids.items() if t[:10] == day]
+        # 发布时间变化意味着该日期的ID区间也可能失效，一并丢弃
+        if day_ids:
+            self._days[day] = {'first_id': min(day_ids), 'last_id': max(day_ids), 'count': len(day_ids)}
+        else:
+            self._days.pop(day, None)
+
+    def record(self, news_id: int, publish_time: str):
+        """
+        记录一个新闻ID的发布时间
+        Args:
+            news_id: 新闻ID
+            publish_time: 标准时间字符串 "YYYY-MM-DD HH:MM:SS"
+        """
+        if not publish_time or len(publish_time) < 10:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            if self._ids.get(news_id) != publish_time:
+                self._add(news_id, publish_time)
+                self._dirty = True
+
+    def record_news(self, news_list: Iterable[Dict]):
+        """批量记录解析后的新闻（只记录成功解析出原始时间的条目）"""
+        for news in news_list:
+            if news.get('time_text') and news.get('time'):
+                self.record(news['id'], news['time'])
+
+    def get_time(self, news_id: int) -> Optional[str]:
+        """查询新闻ID的发布时间"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._ids.get(news_id)
+
+    def get_day_range(self, target_date: str) -> Optional[Dict]:
+        """查询某天已知的ID边界 {'first_id', 'last_id', 'count'}"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._days.get(target_date)
+            return dict(entry) if entry else None
+
+    def get_anchors(self, boundary: str) -> Tuple[Optional[Tuple[int, str]], Optional[Tuple[int, str]]]:
+        """
+        查询时间边界两侧最近的已知ID
+        Args:
+            boundary: 时间边界 "YYYY-MM-DD HH:MM:SS"
+        Returns:
+            (发布时间早于边界的最大ID及其时间, 发布时间不早于边界的最小ID及其时间)，未知的一侧为 None
+        """
+        with self._lock:
+            self._ensure_loaded()
+            before = None
+            after = None
+            for news_id, publish_time in self._ids.items():
+                if publish_time < boundary:
+                    if before is None or news_id > before[0]:
+                        before = (news_id, publish_time)
+                else:
+                    if after is None or news_id < after[0]:
+                        after = (news_id, publish_time)
+            return before, after
+
+    def get_day_bounds(self, target_date: str) -> Optional[Tuple[int, int]]:
+        """
+        获取已完整采集过的日期的ID开区间
+        Args:
+            target_date: 日期 YYYY-MM-DD
+        Returns:
+            (lower, upper)：目标日期的所有新闻ID都位于其间；该日期未完整采集过时返回 None
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._days.get(target_date)
+            if not entry or 'lower' not in entry or 'upper' not in entry:
+                return None
+            lower, upper = entry['lower'], entry['upper']
+            if upper - lower > self.max_range_size:
+                return None
+            return lower, upper
+
+    def mark_day_crawled(self, target_date: str, lower: int, upper: int):
+        """
+        记录某天已完整采集，保存其ID开区间
+        Args:
+            target_date: 日期 YYYY-MM-DD
+            lower: 早于该日期的最大ID
+            upper: 晚于该日期的最小ID
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._days.setdefault(target_date, {'first_id': None, 'last_id': None, 'count': 0})
+            # ID与时间不单调（如旧文被重新发布）时不记录
+            if entry['count'] and not (lower < entry['first_id'] and entry['last_id'] < upper):
+                logger.debug(f"{target_date} 的ID区间 ({lower}, {upper}) 与已知记录不一致，跳过")
+                return
+            entry['lower'] = lower
+            entry['upper'] = upper
+            self._dirty = True
+
+    def save(self):
+        """写回磁盘（仅在有变化时），同时清理过旧的记录"""
+        with self._lock:
+            if not self._dirty:
+                return
+            cutoff = (datetime.now() - timedelta(days=self.keep_days)).strftime('%Y-%m-%d')
+            stale_ids = [news_id for news_id, t in self._ids.items() if t[:10] < cutoff]
+            for news_id in stale_ids:
+                del self._ids[news_id]
+            for day in [d for d in self._days if d < cutoff]:
+                del self._days[day]
+
+            data = {
+                'ids': {str(news_id): t for news_id, t in sorted(self._ids.items())},
+                'days': dict(sorted(self._days.items())),
+                'updated_at': datetime.now().isoformat()
+            }
+            try:
+                os.makedirs(os.path.dirname(self.index_file) or '.', exist_ok=True)
+                tmp_file = f"{self.index_file}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_file, self.index_file)
+                self._dirty = False
+            except Exception as e:
+                logger.warning(f"保存AIBase ID索引失败: {e}")
+
+
+# 全局索引（多个采集器实例、多个日期共用）
+aibase_id_index = AIBaseIdIndex()
@@ -1,11 +1,16 @@
-from datetime import datetime, timedelta, date
-from typing import List, Dict, Optional
+from datetime import datetime, timedelta, date, time
+from typing import List, Dict, Optional, Tuple, Union
 import asyncio
 import aiohttp
 import re
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from playwright.async_api import async_playwright, Page, Browser
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .aibase_id_index import AIBaseIdIndex, aibase_id_index
+from .page_cache import PageCache, page_cache as default_page_cache
 
 try:
     from config import IMAGE_CONFIG
@@ -16,44 +21,390 @@ except ImportError:
         'processing_timeout': 30
     }
 
+try:
+    from config import Config
+    CRAWLER_CONFIG = Config.CRAWLER_CONFIG
+except (ImportError, AttributeError):
+    CRAWLER_CONFIG = {
+        'parse_executor': 'thread',
+        'parse_workers': 0
+    }
+
 logger = logging.getLogger(__name__)
 
+# ---- 页面解析规则：模块加载时编译一次，所有页面共用 ----
+
+# 单次扫描：按文档顺序匹配标题类标签、段落和图片（公共前缀 "<" 提到分支外，正则引擎可按字面量快速定位）
+_SCAN_RE = re.compile(
+    r'<(?:(?P<tag>h1|h2|title|p)\b[^>]*>(?P<inner>.*?)</(?P=tag)\s*>'
+    r'|(?P<img>img\b)[^>]*>)',
+    re.IGNORECASE | re.DOTALL
+)
+_IMG_RE = re.compile(r'<img[^>]*src=["\']([^"\']*)["\'][^>]*(?:alt=["\']([^"\']*)["\'])?[^>]*>', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+
+# h1/h2/title 之外的标题来源，按优先级排列，仅在前面的来源不可用时才搜索
+_FALLBACK_TITLE_RES = [
+    re.compile(r'class="[^"]*title[^"]*"[^>]*>(.*?)</[^>]+>', re.IGNORECASE | re.DOTALL),
+    re.compile(r'<meta\s+property="og:title"\s+content="([^"]*)"', re.IGNORECASE),
+    re.compile(r'<meta\s+name="title"\s+content="([^"]*)"', re.IGNORECASE),
+    re.compile(r'"title"\s*:\s*"([^"]*)"', re.IGNORECASE),  # JSON-LD格式
+    re.compile(r'data-title="([^"]*)"', re.IGNORECASE),      # 数据属性
+]
+_TITLE_SUFFIX_RE = re.compile(r'\s*[-|_]\s*(AIBase|快讯|新闻).*$')
+
+_TIME_RES = [
+    re.compile(r'发布时间\s*[:：]\s*(\d{4}年\d{1,2}月\d{1,2}日\s*\d{1,2}:\d{2})'),
+    re.compile(r'(\d{4}年\d{1,2}月\d{1,2}日\s*\d{1,2}:\d{2})'),
+    re.compile(r'(\d{4}-\d{2}-\d{2}\s*\d{2}:\d{2})'),
+    re.compile(r'(\d{4}/\d{2}/\d{2}\s*\d{2}:\d{2})'),
+    re.compile(r'"datePublished"[^>]*content="([^"]*)"', re.IGNORECASE),
+    re.compile(r'<time[^>]*datetime="([^"]*)"', re.IGNORECASE),
+]
+_ISO_TIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})')
+_TIME_FORMATS = [
+    ('%Y年%m月%d日 %H:%M', re.compile(r'\d{4}年\d{1,2}月\d{1,2}日\s*\d{1,2}:\d{2}')),
+    ('%Y-%m-%d %H:%M', re.compile(r'\d{4}-\d{2}-\d{2}\s*\d{2}:\d{2}')),
+    ('%Y/%m/%d %H:%M', re.compile(r'\d{4}/\d{2}/\d{2}\s*\d{2}:\d{2}')),
+    ('%m-%d %H:%M', re.compile(r'\d{2}-\d{2}\s*\d{2}:\d{2}')),
+    ('%m/%d %H:%M', re.compile(r'\d{2}/\d{2}\s*\d{2}:\d{2}')),
+]
+
+_CONTENT_DIV_RE = re.compile(r'<div[^>]*class="[^"]*content[^"]*"[^>]*>(.*?)</div>', re.IGNORECASE | re.DOTALL)
+_IRRELEVANT_RE = re.compile(
+    r'^(?:阅读原文|查看更多|展开.*%|点击.*查看|相关.*：|标签.*：|分享|收藏|点赞|评论|\d+|[<>\/\s]*)$',
+    re.IGNORECASE
+)
+_DECORATIVE_IMAGE_RE = re.compile(
+    r'logo|icon|avatar|banner|placeholder|loading|1x1|1\*1|\.gif$|ad[s]?[_\-]'
+    r'|share|social|button|btn|data:image/svg|thumb|thumbnail|small|sm\.|list\.|item\.'
+)
+
+_H1_404_RE = re.compile(r'404.*?not found|页面不存在', re.IGNORECASE | re.DOTALL)
+_ERROR_DIV_RE = re.compile(
+    r'<div[^>]*class="[^"]*error[^"]*"[^>]*>[^<]*404|<div[^>]*class="[^"]*404[^"]*"[^>]*>',
+    re.IGNORECASE
+)
+_MIN_PAGE_TEXT_LENGTH = 100
+
+
+def _clean_text(fragment: str) -> str:
+    """去掉标签并合并空白"""
+    return _WS_RE.sub(' ', _TAG_RE.sub('', fragment).strip())
+
+
+def _is_irrelevant_content(text: str) -> bool:
+    """判断是否为无关内容"""
+    stripped_text = text.strip()
+    return bool(_IRRELEVANT_RE.match(stripped_text)) or len(stripped_text) < 10
+
+
+def _is_decorative_image(src: str) -> bool:
+    """判断是否为装饰性图片"""
+    return bool(_DECORATIVE_IMAGE_RE.search(src.lower()))
+
+
+def _has_enough_text(html: str, min_length: int) -> bool:
+    """
+    去掉标签、合并空白后的文本长度是否达到 min_length
+    逐段累加，达到长度即返回，正常页面不必处理整篇文档
+    """
+    text = ''
+    pos = 0
+    for match in _TAG_RE.finditer(html):
+        segment = html[pos:match.start()]
+        pos = match.end()
+        # 长文本段（如内联脚本）先只看开头部分：其合并空白后的长度是整段结果的下界
+        if len(segment) > min_length * 4:
+            head = _WS_RE.sub(' ', text + segment[:min_length * 4]).strip()
+            if len(head) >= min_length:
+                return True
+        text = _WS_RE.sub(' ', text + segment).lstrip()
+        if len(text.rstrip()) >= min_length:
+            return True
+    text = _WS_RE.sub(' ', text + html[pos:]).strip()
+    return len(text) >= min_length
+
+
+def extract_news_fields(html: str, max_images: int = 0) -> Dict:
+    """
+    单次扫描页面，一并提取404判定、标题、发布时间原文、正文段落和图片
+    Args:
+        html: 页面HTML
+        max_images: 最多收集的图片数，0 表示不收集
+    Returns:
+        {'is_404', 'title', 'time_text', 'paragraphs', 'images'}，images 为 (src, alt) 列表
+    """
+    fields = {'is_404': False, 'title': '', 'time_text': '', 'paragraphs': [], 'images': []}
+    
+    first = {}  # h1 / h2 / title 的第一次出现
+    h1_blocks = []
+    raw_paragraphs = []
+    images = fields['images']
+    
+    def collect_images(fragment: str):
+        for img_match in _IMG_RE.finditer(fragment):
+            if len(images) < max_images:
+                images.append((img_match.group(1), img_match.group(2) or ''))
+    
+    for match in _SCAN_RE.finditer(html):
+        if match.group('img'):
+            if len(images) < max_images:
+                collect_images(match.group(0))
+            continue
+        tag = match.group('tag').lower()
+        inner = match.group('inner')
+        if tag == 'p':
+            raw_paragraphs.append(inner)
+        else:
+            first.setdefault(tag, inner)
+            if tag == 'h1':
+                h1_blocks.append(inner)
+        if max_images and len(images) < max_images and '<img' in inner.lower():
+            collect_images(inner)
+    
+    # 404判定：标题、h1、错误提示块、页面文本过短
+    page_title = first.get('title', '').lower()
+    if '404' in page_title and ('not found' in page_title or '页面不存在' in page_title):
+        fields['is_404'] = True
+    elif any(_H1_404_RE.search(block) for block in h1_blocks):
+        fields['is_404'] = True
+    elif '404' in html and _ERROR_DIV_RE.search(html):
+        fields['is_404'] = True
+    elif not _has_enough_text(html, _MIN_PAGE_TEXT_LENGTH):
+        fields['is_404'] = True
+    if fields['is_404']:
+        return fields
+    
+    # 标题：h1 > h2 > title > 其他来源，取第一个长度大于5的
+    def title_candidates():
+        for tag in ('h1', 'h2', 'title'):
+            if tag in first:
+                yield first[tag]
+        for pattern in _FALLBACK_TITLE_RES:
+            title_match = pattern.search(html)
+            if title_match:
+                yield title_match.group(1)
+    
+    for candidate in title_candidates():
+        title = _TITLE_SUFFIX_RE.sub('', _TAG_RE.sub('', candidate).strip())
+        fields['title'] = title
+        if title and len(title) > 5:
+            break
+    
+    for pattern in _TIME_RES:
+        time_match = pattern.search(html)
+        if time_match:
+            fields['time_text'] = time_match.group(1)
+            break
+    
+    paragraphs = fields['paragraphs']
+    for fragment in raw_paragraphs + _CONTENT_DIV_RE.findall(html):
+        clean_text = _clean_text(fragment)
+        if clean_text and len(clean_text) > 10 and not _is_irrelevant_content(clean_text):
+            paragraphs.append(clean_text)
+    
+    return fields
+
+
+def _parse_publish_time(publish_time: str) -> str:
+    """解析发布时间为标准格式"""
+    if not publish_time:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    try:
+        # 优先处理 ISO 格式 (YYYY-MM-DDTHH:MM:SS...)
+        iso_match = _ISO_TIME_RE.search(publish_time)
+        if iso_match:
+            return datetime.fromisoformat(iso_match.group(1)).strftime("%Y-%m-%d %H:%M:%S")
+        
+        for fmt, pattern in _TIME_FORMATS:
+            match = pattern.search(publish_time)
+            if match:
+                time_str = match.group(0)
+                time_str = _WS_RE.sub(' ', time_str).strip()
+                
+                try:
+                    dt_obj = datetime.strptime(time_str, fmt)
+                    # 如果年份是1900，说明格式不带年份，需要修正为当前年份
+                    if dt_obj.year == 1900 or fmt in ['%m-%d %H:%M', '%m/%d %H:%M']:
+                        now = datetime.now()
+                        dt_obj = dt_obj.replace(year=now.year)
+                        # 如果解析出的日期比当前日期晚，说明是去年的文章
+                        if dt_obj > now:
+                            dt_obj = dt_obj.replace(year=now.year - 1)
+
+                    return dt_obj.strftime("%Y-%m-%d %H:%M:00")
+                except ValueError:
+                    continue
+    except:
+        pass
+    
+    # 如果都失败了，返回一个当前时间作为备用
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def parse_news_page(news_id: int, html: Union[str, bytes], base_url: str, source_weight: int = 5,
+                    encoding: str = 'utf-8') -> Tuple[bool, Optional[Dict]]:
+    """
+    解析新闻页面（模块级函数，可直接提交给线程池/进程池执行）
+    Args:
+        news_id: 新闻ID
+        html: 页面HTML，可以是未解码的原始字节（在工作进程内解码）
+        base_url: 快讯页面地址前缀
+        source_weight: 来源权重
+        encoding: 原始字节的编码
+    Returns:
+        (页面是否存在, 新闻数据字典)；页面存在但解析失败时新闻数据为 None
+    """
+    try:
+        if isinstance(html, bytes):
+            html = html.decode(encoding or 'utf-8', errors='replace')
+        max_images = IMAGE_CONFIG.get('max_images_per_news', 5) if IMAGE_CONFIG.get('enabled', False) else 0
+        fields = extract_news_fields(html, max_images)
+        if fields['is_404']:
+            return False, None
+        
+        title = fields['title']
+        if not title:
+            logger.debug(f"ID {news_id} 标题提取失败")
+            return True, None
+        
+        images = []
+        for src, alt in fields['images']:
+            if src:
+                # 转换为绝对URL
+                if src.startswith('/'):
+                    src = f"https://news.aibase.com{src}"
+                elif src.startswith('//'):
+                    src = f"https:{src}"
+                elif not src.startswith(('http://', 'https://')):
+                    src = f"https://news.aibase.com/{src}"
+                
+                if not _is_decorative_image(src):
+                    images.append({
+                        'url': src,
+                        'alt': alt.strip() if alt else '',
+                        'position': len(images)
+                    })
+        
+        # 转换时间格式
+        publish_time = fields['time_text']
+        try:
+            standard_time = _parse_publish_time(publish_time)
+            if not standard_time or standard_time == datetime.now().strftime("%Y-%m-%d %H:%M:%S"):
+                logger.debug(f"ID {news_id} 时间解析失败，原始时间: {publish_time}")
+        except Exception as e:
+            logger.debug(f"ID {news_id} 时间解析异常: {e}, 原始时间: {publish_time}")
+            standard_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        news_data = {
+            'id': news_id,
+            'title': title,
+            'url': f"{base_url}/{news_id}",
+            'time': standard_time,
+            'date': standard_time.split(' ')[0] if ' ' in standard_time else standard_time[:10],
+            'time_text': publish_time,
+            'content': '\n\n'.join(fields['paragraphs']),
+            'images': images,
+            'structured_content': [],
+            'summary': "",
+            'source': 'AIBase快讯',
+            'weight': source_weight
+        }
+        
+        return True, news_data
+        
+    except Exception as e:
+        logger.warning(f"解析新闻 {news_id} HTML失败: {e}")
+        return True, None
+
+
+# ---- 解析执行器：inline 在事件循环内直接解析；thread / process 交给共享的线程池/进程池 ----
+
+PARSE_EXECUTOR_KINDS = ('inline', 'thread', 'process')
+_parse_executors: Dict[str, Executor] = {}
+_parse_executors_lock = threading.Lock()
+
+
+def get_parse_executor(kind: str) -> Optional[Executor]:
+    """
+    获取共享的解析执行器（首次使用时创建，所有采集器实例共用）
+    Args:
+        kind: inline / thread / process
+    Returns:
+        执行器；inline 返回 None
+    """
+    if kind not in ('thread', 'process'):
+        return None
+    with _parse_executors_lock:
+        executor = _parse_executors.get(kind)
+        if executor is None:
+            workers = CRAWLER_CONFIG.get('parse_workers') or os.cpu_count() or 2
+            if kind == 'process':
+                # spawn：不继承父进程中的线程和锁（Flask/APScheduler 线程下 fork 不安全），Windows 下也可用
+                executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            else:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='aibase-parse')
+            _parse_executors[kind] = executor
+            logger.info(f"创建AIBase解析执行器: {kind}，{workers} 个工作者")
+        return executor
+
+
+def _discard_parse_executor(kind: str):
+    """丢弃已损坏的执行器（如工作进程被杀），下次使用时重建"""
+    with _parse_executors_lock:
+        executor = _parse_executors.pop(kind, None)
+    if executor:
+        executor.shutdown(wait=False)
+
+
 class AIBaseNewsScraper:
     """AIBase实时快讯采集器 - 高速优化版本"""
     
-    def __init__(self):
+    def __init__(self, id_index: Optional[AIBaseIdIndex] = None, page_cache: Optional[PageCache] = None):
         self.name = "AIBase快讯"
         self.base_url = "https://news.aibase.com/zh/news"
-        self.browser = None
-        self.page = None
         self.logger = logging.getLogger(self.__class__.__name__)
         self.source_weight = 5
-        self.latest_news_id = None
+        self.latest_news_id = None  # 会话内发现的最新ID，会话期间复用
+        self._session_depth = 0  # async with 嵌套层数，>0 时由最外层退出时关闭会话
         
         # 新增：缓存和优化相关
         self.id_cache = set()  # 缓存已处理的ID
         self.session = None   # HTTP会话复用
         self.concurrent_limit = 25  # 增加并发限制以提高速度
+        # 页面解析方式：inline（事件循环内）、thread（线程池）、process（进程池，多核并行）
+        self.parse_executor = CRAWLER_CONFIG.get('parse_executor', 'thread')
+        self.id_index = id_index or aibase_id_index  # 持久化的 ID→发布时间 索引
+        self.page_cache = page_cache or default_page_cache  # 详情页原始内容的磁盘缓存
+        
+        # 按日期定位ID区间的搜索方式：auto（索引 > 插值搜索 > 线性回溯）、interpolate、linear
+        self.search_mode = 'auto'
+        self.search_tolerance = 20  # 边界搜索收敛到多少个ID以内即停止，剩余区间直接整段获取
+        self.max_search_probes = 40  # 单个边界最多探测次数
+        # 整段获取的ID区间上限（与索引中单日区间的最大跨度一致），边界搜索未收敛导致区间过宽时改为从最新ID回溯
+        self.max_range_ids = self.id_index.max_range_size
+        self._probed_news = {}  # 搜索过程中已解析的新闻，避免区间获取时重复请求
         
+    async def __aenter__(self):
+        """
+        进入采集会话：HTTP连接池、keep-alive连接和已发现的最新ID在会话内复用，
+        多次调用 get_news_by_date 等方法时不再逐次重建
+        """
+        await self.initialize_browser()
+        self._session_depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """退出采集会话，最外层退出时关闭HTTP会话"""
+        self._session_depth -= 1
+        if self._session_depth == 0:
+            await self.close_browser()
+
     async def initialize_browser(self):
-        """初始化浏览器实例和HTTP会话"""
-        if not self.browser:
-            playwright = await async_playwright().start()
-            browser_options = {
-                'headless': True,
-                'args': [
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-web-security',
-                    '--disable-dev-shm-usage',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-images',  # 禁用图片加载（如果不需要图片可以大幅提速）
-                    '--disable-javascript',  # 如果可能的话禁用JS
-                ]
-            }
-            self.browser = await playwright.chromium.launch(**browser_options)
-            
-        # 初始化HTTP会话
+        """初始化HTTP会话（页面均通过aiohttp获取，不需要启动浏览器；保留原方法名以兼容调用方）"""
         if not self.session:
             connector = aiohttp.TCPConnector(
                 limit=20,  # 连接池大小
@@ -70,17 +421,17 @@ class AIBaseNewsScraper:
             )
             
     async def close_browser(self):
-        """关闭浏览器和HTTP会话"""
-        if self.page:
-            await self.page.close()
-            self.page = None
-        if self.browser:
-            await self.browser.close()
-            self.browser = None
+        """关闭HTTP会话"""
         # 修复：确保 aiohttp session 被关闭
         if self.session and not self.session.closed:
             await self.session.close()
-            self.session = None
+        self.session = None
+        self.latest_news_id = None
+
+    async def _release_session(self):
+        """单次调用结束：不在 async with 会话内时关闭HTTP会话"""
+        if self._session_depth == 0:
+            await self.close_browser()
 
     async def _quick_check_news_exists(self, news_id: int, max_retries: int = 2) -> bool:
         """
@@ -141,240 +492,153 @@ class AIBaseNewsScraper:
         
         return False  # 重试失败后返回False
 
-    async def _batch_check_news_exists(self, news_ids: List[int]) -> List[int]:
+    async def _get_news_html_fast(self, news_id: int, max_retries: int = 0) -> Optional[str]:
         """
-        批量检查新闻ID是否存在
+        快速获取新闻页面HTML（使用aiohttp）
         Args:
-            news_ids: 新闻ID列表
+            news_id: 新闻ID
+            max_retries: 超时/网络异常时的重试次数（404等明确状态不重试）
         Returns:
-            存在的新闻ID列表
+            页面HTML内容
         """
-        if not self.session:
-            await self.initialize_browser()
-            
-        # 使用字典收集结果，并添加异步锁保护写入
-        result_dict = {}
-        result_lock = asyncio.Lock()
-        semaphore = asyncio.Semaphore(self.concurrent_limit)
-        
-        async def check_single(news_id):
-            async with semaphore:
-                try:
-                    logger.debug(f"开始检查 ID {news_id}")
-                    exists = await self._quick_check_news_exists(news_id)
-                    if exists:
-                        async with result_lock:
-                            result_dict[news_id] = True
-                        logger.debug(f"ID {news_id} 存在")
-                    else:
-                        logger.debug(f"ID {news_id} 不存在")
-                except Exception as e:
-                    logger.debug(f"检查 ID {news_id} 时出错: {e}")
-        
-        tasks = [check_single(news_id) for news_id in news_ids]
-        await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 从字典中提取存在的ID并排序
-        existing_ids = sorted([news_id for news_id in result_dict.keys()])
-        logger.info(f"批量检查完成，输入{len(news_ids)}个ID，找到{len(existing_ids)}个存在的ID")
-        return existing_ids
+        page = await self._get_news_body(news_id, max_retries)
+        if not page:
+            return None
+        body, encoding = page
+        return body.decode(encoding, errors='replace')
 
-    async def _get_news_html_fast(self, news_id: int) -> Optional[str]:
+    async def _get_news_body(self, news_id: int, max_retries: int = 0,
+                             raise_errors: bool = False) -> Optional[Tuple[bytes, str]]:
         """
-        快速获取新闻页面HTML（使用aiohttp）
+        获取新闻页面的原始字节（不在事件循环内解码，便于交给解析执行器）
+        已发布的快讯页几乎不变，经页面缓存获取：缓存新鲜时不发请求，过期后条件请求重新验证
         Args:
-            news_id: 新闻ID
+            raise_errors: 重试用尽后抛出最后一次的异常（区分请求失败与页面不存在）
         Returns:
-            页面HTML内容
+            (页面字节, 编码)，非200状态或请求失败时返回 None
         """
         if not self.session:
             await self.initialize_browser()
             
-        try:
-            url = f"{self.base_url}/{news_id}"
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    return await response.text()
-                return None
-        except Exception as e:
-            logger.debug(f"获取新闻 {news_id} HTML失败: {e}")
-            return None
+        url = f"{self.base_url}/{news_id}"
+        for attempt in range(max_retries + 1):
+            try:
+                return await self.page_cache.fetch(self.session, url)
+            except Exception as e:
+                if attempt < max_retries:
+                    logger.debug(f"获取新闻 {news_id} HTML失败，重试 {attempt + 1}/{max_retries}: {e}")
+                    await asyncio.sleep(0.5 * (attempt + 1))  # 递增延迟
+                    continue
+                if raise_errors:
+                    raise
+                logger.debug(f"获取新闻 {news_id} HTML失败: {e}")
+        return None
+
+    def _forget_news_page(self, news_id: int):
+        """页面不存在或解析失败时删除其缓存（尚未发布的ID、不完整的页面下次重新请求）"""
+        self.page_cache.invalidate(f"{self.base_url}/{news_id}")
 
     def _parse_news_from_html(self, news_id: int, html: str) -> Optional[Dict]:
         """
-        从HTML中快速解析新闻信息（使用正则表达式）
+        从HTML中快速解析新闻信息（使用预编译的正则表达式）
         Args:
             news_id: 新闻ID
             html: 页面HTML
         Returns:
             新闻数据字典
         """
+        return parse_news_page(news_id, html, self.base_url, self.source_weight)[1]
+
+    async def _parse_news_page_async(self, news_id: int, body: bytes, encoding: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        在配置的执行器中解析页面，原始字节直接交给工作者解码
+        进程池损坏时丢弃重建，本次改为在事件循环内解析
+        """
+        executor = get_parse_executor(self.parse_executor)
+        if executor is None:
+            return parse_news_page(news_id, body, self.base_url, self.source_weight, encoding)
+        
+        loop = asyncio.get_running_loop()
         try:
-            # 检查是否为真正的404页面（更精确的检测）
-            if self._is_404_page(html):
-                return None
-            
-            # 使用正则表达式快速提取信息
-            # 提取标题 - 增加更多匹配模式
-            title_patterns = [
-                r'<h1[^>]*>(.*?)</h1>',
-                r'<h2[^>]*>(.*?)</h2>',
-                r'<title[^>]*>(.*?)</title>',
-                r'class="[^"]*title[^"]*"[^>]*>(.*?)</[^>]+>',
-                r'<meta\s+property="og:title"\s+content="([^"]*)"',
-                r'<meta\s+name="title"\s+content="([^"]*)"',
-                r'"title"\s*:\s*"([^"]*)"',  # JSON-LD格式
-                r'data-title="([^"]*)"',      # 数据属性
-            ]
-            
-            title = ""
-            for pattern in title_patterns:
-                match = re.search(pattern, html, re.IGNORECASE | re.DOTALL)
-                if match:
-                    title = re.sub(r'<[^>]+>', '', match.group(1)).strip()
-                    # 清理常见的网站后缀
-                    title = re.sub(r'\s*[-|_]\s*(AIBase|快讯|新闻).*$', '', title)
-                    if title and len(title) > 5:
-                        logger.debug(f"ID {news_id} 使用模式匹配到标题: {title[:50]}...")
-                        break
-            
-            if not title:
-                logger.debug(f"ID {news_id} 标题提取失败")
-                return None
-            
-            # 提取发布时间
-            time_patterns = [
-                r'发布时间\s*[:：]\s*(\d{4}年\d{1,2}月\d{1,2}日\s*\d{1,2}:\d{2})',
-                r'(\d{4}年\d{1,2}月\d{1,2}日\s*\d{1,2}:\d{2})',
-                r'(\d{4}-\d{2}-\d{2}\s*\d{2}:\d{2})',
-                r'(\d{4}/\d{2}/\d{2}\s*\d{2}:\d{2})',
-                r'"datePublished"[^>]*content="([^"]*)"',
-                r'<time[^>]*datetime="([^"]*)"',
-            ]
-            
-            publish_time = ""
-            for pattern in time_patterns:
-                match = re.search(pattern, html, re.IGNORECASE)
-                if match:
-                    publish_time = match.group(1)
-                    break
-            
-            # 提取内容段落
-            content_patterns = [
-                r'<p[^>]*>(.*?)</p>',
-                r'<div[^>]*class="[^"]*content[^"]*"[^>]*>(.*?)</div>',
-            ]
-            
-            content_paragraphs = []
-            for pattern in content_patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE | re.DOTALL)
-                for match in matches:
-                    # 清理HTML标签
-                    clean_text = re.sub(r'<[^>]+>', '', match).strip()
-                    clean_text = re.sub(r'\s+', ' ', clean_text)
-                    if clean_text and len(clean_text) > 10 and not self._is_irrelevant_content(clean_text):
-                        content_paragraphs.append(clean_text)
-            
-            # 提取图片（如果启用）
-            images = []
-            if IMAGE_CONFIG.get('enabled', False):
-                img_pattern = r'<img[^>]*src=["\']([^"\']*)["\'][^>]*(?:alt=["\']([^"\']*)["\'])?[^>]*>'
-                img_matches = re.findall(img_pattern, html, re.IGNORECASE)
-                
-                for src, alt in img_matches[:IMAGE_CONFIG.get('max_images_per_news', 5)]:
-                    if src:
-                        # 转换为绝对URL
-                        if src.startswith('/'):
-                            src = f"https://news.aibase.com{src}"
-                        elif src.startswith('//'):
-                            src = f"https:{src}"
-                        elif not src.startswith(('http://', 'https://')):
-                            src = f"https://news.aibase.com/{src}"
-                        
-                        if not self._is_decorative_or_related_image(src, alt):
-                            images.append({
-                                'url': src,
-                                'alt': alt.strip() if alt else '',
-                                'position': len(images)
-                            })
-            
-            # 转换时间格式
-            try:
-                standard_time = self._parse_publish_time(publish_time)
-                if not standard_time or standard_time == datetime.now().strftime("%Y-%m-%d %H:%M:%S"):
-                    logger.debug(f"ID {news_id} 时间解析失败，原始时间: {publish_time}")
-            except Exception as e:
-                logger.debug(f"ID {news_id} 时间解析异常: {e}, 原始时间: {publish_time}")
-                standard_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            news_data = {
-                'id': news_id,
-                'title': title,
-                'url': f"{self.base_url}/{news_id}",
-                'time': standard_time,
-                'date': standard_time.split(' ')[0] if ' ' in standard_time else standard_time[:10],
-                'time_text': publish_time,
-                'content': '\n\n'.join(content_paragraphs),
-                'images': images,
-                'structured_content': [],
-                'summary': "",
-                'source': 'AIBase快讯',
-                'weight': self.source_weight
-            }
-            
-            return news_data
-            
-        except Exception as e:
-            logger.warning(f"解析新闻 {news_id} HTML失败: {e}")
-            return None
+            return await loop.run_in_executor(
+                executor, parse_news_page, news_id, body, self.base_url, self.source_weight, encoding
+            )
+        except BrokenProcessPool as e:
+            logger.warning(f"解析进程池不可用，重建后继续（本页在事件循环内解析）: {e}")
+            _discard_parse_executor(self.parse_executor)
+            return parse_news_page(news_id, body, self.base_url, self.source_weight, encoding)
 
-    async def _batch_get_news_fast(self, news_ids: List[int]) -> List[Dict]:
+    async def _batch_fetch_news(self, news_ids: List[int],
+                                failed_ids: Optional[List[int]] = None) -> Tuple[List[int], List[Dict]]:
         """
-        批量快速获取新闻信息
+        批量获取新闻：每个ID只请求一次完整页面，同时完成存在性判断和内容解析
         Args:
             news_ids: 新闻ID列表
+            failed_ids: 传入时追加请求失败（重试用尽）或页面存在但解析失败的ID
         Returns:
-            新闻数据列表
+            (存在的新闻ID列表（升序）, 成功解析的新闻数据列表)
+            非200状态或404页面视为不存在
         """
-        news_list = []
+        if not self.session:
+            await self.initialize_browser()
+            
         semaphore = asyncio.Semaphore(self.concurrent_limit)
         
-        async def get_single_news(news_id):
-            async with semaphore:
-                try:
-                    html = await self._get_news_html_fast(news_id)
-                    if html:
-                        news_data = self._parse_news_from_html(news_id, html)
-                        if news_data:
-                            logger.debug(f"ID {news_id} 解析成功")
-                            return news_data
-                        else:
-                            logger.warning(f"ID {news_id} HTML解析失败，内容存在但无法解析")
-                    else:
-                        logger.warning(f"ID {news_id} HTML获取失败")
-                except Exception as e:
-                    logger.warning(f"批量获取新闻 {news_id} 异常: {e}")
-                return None
+        async def fetch_single(news_id):
+            try:
+                # 信号量只限制下载并发；下载完成即释放名额并提交解析，解析期间其他请求继续下载
+                async with semaphore:
+                    page = await self._get_news_body(news_id, max_retries=2, raise_errors=True)
+                exists, news_data = await self._parse_news_page_async(news_id, *page) if page else (False, None)
+                if page and not news_data:
+                    self._forget_news_page(news_id)
+                if not exists:
+                    logger.debug(f"ID {news_id} 不存在")
+                    return news_id, False, None
+                if news_data:
+                    logger.debug(f"ID {news_id} 解析成功")
+                else:
+                    logger.warning(f"ID {news_id} HTML解析失败，内容存在但无法解析")
+                    if failed_ids is not None:
+                        failed_ids.append(news_id)
+                return news_id, True, news_data
+            except Exception as e:
+                logger.warning(f"批量获取新闻 {news_id} 异常: {e}")
+                if failed_ids is not None:
+                    failed_ids.append(news_id)
+                return news_id, False, None
         
         # 并发执行
-        tasks = [get_single_news(news_id) for news_id in news_ids]
+        tasks = [fetch_single(news_id) for news_id in news_ids]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # 过滤有效结果
+        existing_ids = []
+        news_list = []
         for result in results:
-            if isinstance(result, dict):
-                news_list.append(result)
+            if isinstance(result, tuple):
+                news_id, exists, news_data = result
+                if exists:
+                    existing_ids.append(news_id)
+                if news_data:
+                    news_list.append(news_data)
+        existing_ids.sort()
         
-        logger.info(f"批量获取完成，输入{len(news_ids)}个ID，成功解析{len(news_list)}个")
-        if len(news_list) < len(news_ids):
-            logger.warning(f"有{len(news_ids) - len(news_list)}个ID解析失败")
+        # 记录到ID索引，供后续按日期采集直接定位
+        self.id_index.record_news(news_list)
         
-        return news_list
+        logger.info(f"批量获取完成，输入{len(news_ids)}个ID，存在{len(existing_ids)}个，成功解析{len(news_list)}个")
+        if len(news_list) < len(existing_ids):
+            logger.warning(f"有{len(existing_ids) - len(news_list)}个ID解析失败")
+        
+        return existing_ids, news_list
 
     async def _discover_latest_news_id_fast(self) -> Optional[int]:
         """
         快速发现最新新闻ID（二分查找优化）
         """
+        if self.latest_news_id:
+            return self.latest_news_id
+        
         if not self.session:
             await self.initialize_browser()
         
@@ -390,12 +654,13 @@ class AIBaseNewsScraper:
                         logger.info(f"从首页发现最大ID: {max_id}")
                         
                         # 使用二分查找确定真正的最新ID
-                        latest_id = await self._binary_search_latest_id(max_id)
-                        return latest_id
+                        self.latest_news_id = await self._binary_search_latest_id(max_id)
+                        return self.latest_news_id
             
             # 如果首页方法失败，使用保守估计
             estimated_id = 21000  # 基于当前趋势的估计
-            return await self._binary_search_latest_id(estimated_id)
+            self.latest_news_id = await self._binary_search_latest_id(estimated_id)
+            return self.latest_news_id
             
         except Exception as e:
             logger.error(f"快速发现最新ID失败: {e}")
@@ -451,102 +716,70 @@ class AIBaseNewsScraper:
             # 生成候选ID列表（批量处理）
             candidate_ids = list(range(latest_id, latest_id - limit * 2, -1))  # 多取一些以防有些ID不存在
             
-            # 批量检查存在性
-            logger.info(f"批量检查 {len(candidate_ids)} 个候选ID的存在性...")
-            existing_ids = await self._batch_check_news_exists(candidate_ids)
-            
-            # 取前limit个
-            target_ids = existing_ids[:limit]
-            
-            logger.info(f"开始并发获取 {len(target_ids)} 条新闻详情...")
-            # 批量获取新闻详情
-            news_list = await self._batch_get_news_fast(target_ids)
+            # 一次请求同时完成存在性判断和详情获取
+            logger.info(f"并发获取 {len(candidate_ids)} 个候选ID...")
+            _, news_list = await self._batch_fetch_news(candidate_ids)
             
-            # 按ID降序排序（最新的在前）
+            # 按ID降序排序（最新的在前），取前limit个
             news_list.sort(key=lambda x: x['id'], reverse=True)
+            news_list = news_list[:limit]
             
             logger.info(f"高速获取完成，共获取 {len(news_list)} 条快讯")
             return news_list
         finally:
-            await self.close_browser()
+            self.id_index.save()
+            await self._release_session()
         # --- FIX END ---
 
-    async def get_news_by_date(self, target_date: str) -> List[Dict]:
+    async def get_news_by_date(self, target_date: str, search_mode: str = None,
+                               status: Optional[Dict] = None) -> List[Dict]:
         """
         获取指定日期的快讯（高速版本）
+        Args:
+            target_date: 日期 YYYY-MM-DD
+            search_mode: 定位ID区间的方式，默认使用 self.search_mode
+                - auto: 已采集过的日期按索引区间获取；历史日期用插值搜索定位；当天从最新ID线性回溯
+                - interpolate: 插值/倍增搜索定位日期边界
+                - linear: 从最新ID逐批回溯
+            status: 传入时写入采集完整性 {'complete': bool, 'failed_ids': [...]}；
+                有ID请求或解析失败、回溯未到达目标日期之前的文章时 complete 为 False
         """
+        status = {} if status is None else status
+        status.update(complete=False, failed_ids=[])
         try:
             target_date_obj = datetime.strptime(target_date, "%Y-%m-%d").date()
-            logger.info(f"开始高速获取 {target_date} 的快讯")
+            search_mode = search_mode or self.search_mode
+            logger.info(f"开始高速获取 {target_date} 的快讯（搜索方式: {search_mode}）")
             
             await self.initialize_browser()
             
-            latest_id = await self._discover_latest_news_id_fast()
-            if not latest_id:
-                return []
-            
-            all_news = []
-            batch_size = 30  # 增加每批处理的数量以提高效率
-            current_id = latest_id
-            # --- FIX START: 修正了循环终止逻辑 ---
-            stop_fetching = False # 用于控制外层 while 循环
-            max_batches = 25  # 最多处理25批（500篇文章）
-            batch_count = 0
-            
-            while not stop_fetching and batch_count < max_batches:
-                # 生成一批ID
-                batch_ids = list(range(current_id, current_id - batch_size, -1))
-                batch_count += 1
-                
-                logger.info(f"处理第 {batch_count} 批 (ID {batch_ids[-1]} - {batch_ids[0]})")
-                
-                # 批量检查存在性
-                existing_ids = await self._batch_check_news_exists(batch_ids)
-                
-                if not existing_ids:
-                    logger.warning(f"第 {batch_count} 批没有有效ID，跳过")
-                    current_id -= batch_size
-                    continue
+            # 已采集过的日期：直接按索引中的ID区间获取
+            bounds = self.id_index.get_day_bounds(target_date) if search_mode == 'auto' else None
+            if not bounds and (search_mode == 'interpolate' or
+                               (search_mode == 'auto' and target_date_obj < date.today())):
+                bounds = await self._search_day_bounds(target_date_obj)
                 
-                # 批量获取新闻详情
-                batch_news = await self._batch_get_news_fast(existing_ids)
+            if bounds and bounds[1] - bounds[0] - 1 > self.max_range_ids:
+                # 探测失败时边界搜索提前停止，下界可能是很久以前的索引锚点，整段获取会发出成千上万个请求
+                logger.warning(f"{target_date} 的ID区间过宽（{bounds[1] - bounds[0] - 1} 个ID，"
+                               f"上限 {self.max_range_ids}），改为从最新ID回溯")
+                bounds = None
                 
-                # 为了逻辑更清晰，对获取到的批次按ID降序排序
-                batch_news.sort(key=lambda x: x['id'], reverse=True)
-
-                # 标记当前批次是否包含比目标日期更早的文章
-                batch_contained_older_news = False
-
-                # 遍历当前批次的所有结果，不再提前退出
-                for news in batch_news:
-                    try:
-                        news_date_str = news.get('time')
-                        if not news_date_str:
-                            continue
-                        news_date = datetime.strptime(news_date_str, "%Y-%m-%d %H:%M:%S").date()
-                        
-                        if news_date == target_date_obj:
-                            all_news.append(news)
-                            logger.info(f"找到目标日期文章: ID {news['id']}")
-                        elif news_date < target_date_obj:
-                            logger.info(f"遇到早于目标日期的文章: ID {news['id']}, 日期 {news_date}")
-                            # 只设置标志，不中断循环，确保本批次处理完
-                            batch_contained_older_news = True
-                    except (ValueError, KeyError):
-                        # 忽略解析时间失败或缺少 'time' 键的文章
-                        continue
-                
-                # 在处理完整个批次后，检查是否需要停止
-                if batch_contained_older_news:
-                    stop_fetching = True
-
-                # --- FIX END ---
-                
-                current_id = min(existing_ids) - 1 if existing_ids else current_id - batch_size
-                
-                # 每5批输出一次进度
-                if batch_count % 5 == 0:
-                    logger.info(f"已处理 {batch_count} 批，找到 {len(all_news)} 篇目标日期文章")
+            if bounds:
+                all_news = await self._get_news_in_id_range(bounds[0], bounds[1], target_date_obj,
+                                                            status['failed_ids'])
+                reached = True
+            else:
+                all_news, reached = await self._scan_news_from_latest(target_date_obj, status['failed_ids'])
+            status['complete'] = reached and not status['failed_ids']
+            if not status['complete']:
+                logger.warning(f"{target_date} 的快讯采集不完整（{len(status['failed_ids'])} 个ID获取失败"
+                               f"{'' if reached else '，未回溯到目标日期之前'}）")
+            
+            # 历史日期完整采集后记录其ID区间，下次直接复用（当天仍有新文章发布，不记录；
+            # 不完整的区间不记录，下次重新定位）
+            if target_date_obj < date.today() and status['complete']:
+                self._mark_day_crawled(target_date_obj)
             
             # 去重并排序，以防万一有重复ID被加入
             final_news = {item['id']: item for item in all_news}.values()
@@ -555,117 +788,276 @@ class AIBaseNewsScraper:
             logger.info(f"高速获取完成，共找到 {len(sorted_news)} 篇 {target_date} 的快讯")
             return sorted_news
         finally:
-            await self.close_browser()
+            self.id_index.save()
+            await self._release_session()
 
+    def _mark_day_crawled(self, target_date_obj: date):
+        """根据索引中日期边界两侧最近的已知ID，记录目标日期的ID区间"""
+        day_start = datetime.combine(target_date_obj, datetime.min.time())
+        before_start, _ = self.id_index.get_anchors(day_start.strftime("%Y-%m-%d %H:%M:%S"))
+        _, after_end = self.id_index.get_anchors((day_start + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S"))
+        if before_start and after_end:
+            self.id_index.mark_day_crawled(target_date_obj.strftime("%Y-%m-%d"), before_start[0], after_end[0])
 
-    # 保留原有的辅助方法
-    def _parse_publish_time(self, publish_time: str) -> str:
-        """解析发布时间为标准格式"""
-        if not publish_time:
-            return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    async def _get_news_in_id_range(self, lower: int, upper: int, target_date_obj: date,
+                                    failed_ids: Optional[List[int]] = None) -> List[Dict]:
+        """
+        获取ID开区间 (lower, upper) 内属于目标日期的快讯
+        Args:
+            lower: 早于目标日期的最大ID
+            upper: 晚于目标日期的最小ID
+            target_date_obj: 目标日期
+            failed_ids: 传入时追加获取失败的ID（见 _batch_fetch_news）
+        Returns:
+            目标日期的新闻列表
+        """
+        logger.info(f"{target_date_obj} 的ID区间: {lower + 1} - {upper - 1}（{upper - lower - 1} 个ID）")
         
-        try:
-            # 优先处理 ISO 格式 (YYYY-MM-DDTHH:MM:SS...)
-            iso_match = re.search(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})', publish_time)
-            if iso_match:
-                return datetime.fromisoformat(iso_match.group(1)).strftime("%Y-%m-%d %H:%M:%S")
-
-            time_formats = [
-                ('%Y年%m月%d日 %H:%M', r'\d{4}年\d{1,2}月\d{1,2}日\s*\d{1,2}:\d{2}'),
-                ('%Y-%m-%d %H:%M', r'\d{4}-\d{2}-\d{2}\s*\d{2}:\d{2}'),
-                ('%Y/%m/%d %H:%M', r'\d{4}/\d{2}/\d{2}\s*\d{2}:\d{2}'),
-                ('%m-%d %H:%M', r'\d{2}-\d{2}\s*\d{2}:\d{2}'),
-                ('%m/%d %H:%M', r'\d{2}/\d{2}\s*\d{2}:\d{2}'),
-            ]
-            
-            for fmt, pattern in time_formats:
-                match = re.search(pattern, publish_time)
-                if match:
-                    time_str = match.group(0)
-                    time_str = re.sub(r'\s+', ' ', time_str).strip()
-                    
-                    try:
-                        dt_obj = datetime.strptime(time_str, fmt)
-                        # 如果年份是1900，说明格式不带年份，需要修正为当前年份
-                        if dt_obj.year == 1900 or fmt in ['%m-%d %H:%M', '%m/%d %H:%M']:
-                            now = datetime.now()
-                            dt_obj = dt_obj.replace(year=now.year)
-                            # 如果解析出的日期比当前日期晚，说明是去年的文章
-                            if dt_obj > now:
-                                dt_obj = dt_obj.replace(year=now.year - 1)
-
-                        return dt_obj.strftime("%Y-%m-%d %H:%M:00")
-                    except ValueError:
-                        continue
-        except:
-            pass
+        # 边界搜索时已解析过的ID直接复用
+        news_list = [news for news_id, news in self._probed_news.items() if lower < news_id < upper]
+        candidate_ids = [news_id for news_id in range(upper - 1, lower, -1) if news_id not in self._probed_news]
         
-        # 如果都失败了，返回一个当前时间作为备用
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    def _is_decorative_or_related_image(self, src: str, alt: str) -> bool:
-        """判断是否为装饰性图片"""
-        decorative_patterns = [
-            r'logo', r'icon', r'avatar', r'banner', r'placeholder',
-            r'loading', r'1x1|1\*1', r'\.gif$', r'ad[s]?[_\-]',
-            r'share|social', r'button|btn', r'data:image/svg',
-            r'thumb|thumbnail', r'small|sm\.', r'list\.|item\.',
-        ]
-        
-        src_lower = src.lower()
-        for pattern in decorative_patterns:
-            if re.search(pattern, src_lower):
-                return True
+        _, fetched_news = await self._batch_fetch_news(candidate_ids, failed_ids)
+        news_list.extend(fetched_news)
         
-        return False
+        result = []
+        for news in news_list:
+            try:
+                if datetime.strptime(news['time'], "%Y-%m-%d %H:%M:%S").date() == target_date_obj:
+                    result.append(news)
+            except (ValueError, KeyError):
+                continue
+        return result
 
-    def _is_irrelevant_content(self, text: str) -> bool:
-        """判断是否为无关内容"""
-        irrelevant_patterns = [
-            r'^阅读原文$', r'^查看更多$', r'^展开.*%$',
-            r'^点击.*查看$', r'^相关.*：$', r'^标签.*：$',
-            r'^分享$', r'^收藏$', r'^点赞$', r'^评论$',
-            r'^\d+$', r'^[<>\/\s]*$',
-        ]
+    async def _scan_news_from_latest(self, target_date_obj: date,
+                                     failed_ids: Optional[List[int]] = None) -> Tuple[List[Dict], bool]:
+        """
+        从最新ID开始逐批向前回溯，直到遇到早于目标日期的文章
+        Args:
+            target_date_obj: 目标日期
+            failed_ids: 传入时追加获取失败的ID（见 _batch_fetch_news）
+        Returns:
+            (目标日期的新闻列表, 是否回溯到了目标日期之前的文章)；
+            找不到最新ID或达到批次上限时后者为 False（结果可能不完整）
+        """
+        latest_id = await self._discover_latest_news_id_fast()
+        if not latest_id:
+            return [], False
         
-        stripped_text = text.strip()
-        for pattern in irrelevant_patterns:
-            if re.match(pattern, stripped_text, re.IGNORECASE):
-                return True
+        all_news = []
+        batch_size = 30  # 增加每批处理的数量以提高效率
+        current_id = latest_id
+        # --- FIX START: 修正了循环终止逻辑 ---
+        stop_fetching = False # 用于控制外层 while 循环
+        max_batches = 25  # 最多处理25批（500篇文章）
+        batch_count = 0
         
-        return len(stripped_text) < 10
+        while not stop_fetching and batch_count < max_batches:
+            # 生成一批ID
+            batch_ids = list(range(current_id, current_id - batch_size, -1))
+            batch_count += 1
+            
+            logger.info(f"处理第 {batch_count} 批 (ID {batch_ids[-1]} - {batch_ids[0]})")
+            
+            # 批量获取（存在性判断与详情在同一次请求中完成）
+            existing_ids, batch_news = await self._batch_fetch_news(batch_ids, failed_ids)
+            
+            if not existing_ids:
+                logger.warning(f"第 {batch_count} 批没有有效ID，跳过")
+                current_id -= batch_size
+                continue
+            
+            # 为了逻辑更清晰，对获取到的批次按ID降序排序
+            batch_news.sort(key=lambda x: x['id'], reverse=True)
 
-    def _is_404_page(self, html: str) -> bool:
-        """更精确地检测是否为404页面"""
-        # 检查页面标题是否包含404相关信息
-        title_match = re.search(r'<title[^>]*>(.*?)</title>', html, re.IGNORECASE | re.DOTALL)
-        if title_match:
-            title = title_match.group(1).lower()
-            if '404' in title and ('not found' in title or 'page not found' in title or '页面不存在' in title):
-                return True
-        
-        # 检查是否有明确的404错误信息
-        error_indicators = [
-            r'<h1[^>]*>.*?404.*?not found.*?</h1>',
-            r'<h1[^>]*>.*?页面不存在.*?</h1>',
-            r'<div[^>]*class="[^"]*error[^"]*"[^>]*>.*?404.*?</div>',
-            r'<div[^>]*class="[^"]*404[^"]*"[^>]*>',
-        ]
-        
-        for pattern in error_indicators:
-            if re.search(pattern, html, re.IGNORECASE | re.DOTALL):
-                return True
+            # 标记当前批次是否包含比目标日期更早的文章
+            batch_contained_older_news = False
+
+            # 遍历当前批次的所有结果，不再提前退出
+            for news in batch_news:
+                try:
+                    news_date_str = news.get('time')
+                    if not news_date_str:
+                        continue
+                    news_date = datetime.strptime(news_date_str, "%Y-%m-%d %H:%M:%S").date()
+                    
+                    if news_date == target_date_obj:
+                        all_news.append(news)
+                        logger.info(f"找到目标日期文章: ID {news['id']}")
+                    elif news_date < target_date_obj:
+                        logger.info(f"遇到早于目标日期的文章: ID {news['id']}, 日期 {news_date}")
+                        # 只设置标志，不中断循环，确保本批次处理完
+                        batch_contained_older_news = True
+                except (ValueError, KeyError):
+                    # 忽略解析时间失败或缺少 'time' 键的文章
+                    continue
+            
+            # 在处理完整个批次后，检查是否需要停止
+            if batch_contained_older_news:
+                stop_fetching = True
+
+            # --- FIX END ---
+            
+            current_id = min(existing_ids) - 1 if existing_ids else current_id - batch_size
+            
+            # 每5批输出一次进度
+            if batch_count % 5 == 0:
+                logger.info(f"已处理 {batch_count} 批，找到 {len(all_news)} 篇目标日期文章")
         
-        # 检查页面内容是否过短（可能是错误页面）
-        # 移除HTML标签后检查文本长度
-        text_content = re.sub(r'<[^>]+>', '', html)
-        text_content = re.sub(r'\s+', ' ', text_content).strip()
+        if not stop_fetching:
+            logger.warning(f"已达到回溯批次上限（{max_batches} 批），{target_date_obj} 的快讯可能不完整")
+        return all_news, stop_fetching
+
+
+    async def _probe_news_time(self, news_id: int, lower: int, upper: int) -> Optional[Tuple[int, datetime]]:
+        """
+        在开区间 (lower, upper) 内、从 news_id 附近探测一条存在的新闻并读取发布时间
+        Args:
+            news_id: 期望探测的ID
+            lower: 区间下界（不含）
+            upper: 区间上界（不含）
+        Returns:
+            (ID, 发布时间)，附近都不存在时返回 None
+        """
+        for offset in (0, -1, 1, -2, 2, -3, 3, -4, 4):
+            candidate = news_id + offset
+            if candidate <= lower or candidate >= upper:
+                continue
+            
+            known_time = self.id_index.get_time(candidate)
+            if known_time:
+                return candidate, datetime.strptime(known_time, "%Y-%m-%d %H:%M:%S")
+            
+            html = await self._get_news_html_fast(candidate)
+            if not html:
+                continue
+            news = self._parse_news_from_html(candidate, html)
+            if not news:
+                self._forget_news_page(candidate)
+            if news and news.get('time_text'):
+                self._probed_news[candidate] = news
+                self.id_index.record_news([news])
+                return candidate, datetime.strptime(news['time'], "%Y-%m-%d %H:%M:%S")
+        return None
+
+    async def _gallop_below(self, boundary: datetime, hi: Tuple[int, datetime]) -> Optional[Tuple[Tuple[int, datetime], Tuple[int, datetime]]]:
+        """
+        从 hi 向更小的ID倍增探测，直到找到发布时间早于 boundary 的新闻
+        Args:
+            boundary: 时间边界
+            hi: 发布时间不早于边界的已知新闻 (ID, 时间)
+        Returns:
+            (lo, hi)：lo 早于边界，hi 不早于边界且尽量靠近边界
+        """
+        step = 50
+        for _ in range(self.max_search_probes):
+            guess = max(1, hi[0] - step)
+            probe = await self._probe_news_time(guess, 0, hi[0])
+            if not probe:
+                # 越过了最早的ID（或遇到大段空缺），缩短步长重试
+                if step <= 1:
+                    return None
+                step //= 2
+                continue
+            if probe[1] < boundary:
+                return probe, hi
+            
+            # 根据两次探测估算每秒新增ID数，外推到边界，并至少翻倍
+            seconds = max((hi[1] - probe[1]).total_seconds(), 60)
+            rate = (hi[0] - probe[0]) / seconds
+            hi = probe
+            estimate = int(rate * (hi[1] - boundary).total_seconds() * 1.2) + 10
+            step = max(estimate, step * 2)
+        return None
+
+    async def _narrow_boundary(self, boundary: datetime, lo: Tuple[int, datetime],
+                               hi: Tuple[int, datetime]) -> Tuple[Tuple[int, datetime], Tuple[int, datetime]]:
+        """
+        在 lo（早于边界）与 hi（不早于边界）之间按发布时间插值/二分，收窄到 search_tolerance 个ID以内
+        """
+        use_bisect = False
+        for _ in range(self.max_search_probes):
+            if hi[0] - lo[0] <= self.search_tolerance:
+                break
+            
+            if use_bisect or hi[1] <= lo[1]:
+                guess = (lo[0] + hi[0]) // 2
+            else:
+                fraction = (boundary - lo[1]).total_seconds() / (hi[1] - lo[1]).total_seconds()
+                guess = lo[0] + int(fraction * (hi[0] - lo[0]))
+            guess = min(max(guess, lo[0] + 1), hi[0] - 1)
+            # 插值与二分交替，发布节奏不均匀时仍保证对数级收敛
+            use_bisect = not use_bisect
+            
+            probe = await self._probe_news_time(guess, lo[0], hi[0])
+            if not probe:
+                break
+            if probe[1] < boundary:
+                lo = probe
+            else:
+                hi = probe
+        return lo, hi
+
+    async def _search_day_bounds(self, target_date_obj: date) -> Optional[Tuple[int, int]]:
+        """
+        通过采样若干ID的发布时间，定位目标日期的ID开区间
+        Args:
+            target_date_obj: 目标日期
+        Returns:
+            (lower, upper)，目标日期的新闻ID都位于其间；定位失败返回 None
+        """
+        day_start = datetime.combine(target_date_obj, time.min)
+        day_end = day_start + timedelta(days=1)
         
-        # 如果页面文本内容过短，可能是错误页面
-        if len(text_content) < 100:
-            return True
+        def anchor(pair):
+            return (pair[0], datetime.strptime(pair[1], "%Y-%m-%d %H:%M:%S")) if pair else None
         
-        return False
+        try:
+            # 优先利用索引中已知的ID作为起点
+            before_end, after_end = (anchor(p) for p in self.id_index.get_anchors(day_end.strftime("%Y-%m-%d %H:%M:%S")))
+            before_start, _ = (anchor(p) for p in self.id_index.get_anchors(day_start.strftime("%Y-%m-%d %H:%M:%S")))
+            
+            if not after_end:
+                latest_id = await self._discover_latest_news_id_fast()
+                if not latest_id:
+                    return None
+                latest = await self._probe_news_time(latest_id, 0, latest_id + 1)
+                if not latest:
+                    return None
+                if latest[1] < day_end:
+                    # 目标日期尚未结束，上界取最新ID之后
+                    after_end = (latest_id + 1, day_end)
+                    before_end = latest
+                else:
+                    after_end = latest
+            
+            # 定位目标日期的结束边界
+            if not before_end or before_end[0] >= after_end[0]:
+                galloped = await self._gallop_below(day_end, after_end)
+                if not galloped:
+                    return None
+                before_end, after_end = galloped
+            before_end, after_end = await self._narrow_boundary(day_end, before_end, after_end)
+            
+            # 定位目标日期的开始边界
+            if before_end[1] < day_start:
+                # 区间内没有目标日期的新闻
+                lower = before_end[0]
+            else:
+                after_start = before_end
+                if not before_start or before_start[0] >= after_start[0]:
+                    galloped = await self._gallop_below(day_start, after_start)
+                    if not galloped:
+                        return None
+                    before_start, after_start = galloped
+                before_start, _ = await self._narrow_boundary(day_start, before_start, after_start)
+                lower = before_start[0]
+            
+            logger.info(f"插值搜索定位 {target_date_obj}: ID区间 ({lower}, {after_end[0]})，探测 {len(self._probed_news)} 个页面")
+            return lower, after_end[0]
+        except Exception as e:
+            logger.warning(f"插值搜索 {target_date_obj} 失败，改用线性回溯: {e}")
+            return None
 
     # 保持接口兼容性的方法
     async def get_news_detail(self, news_url: str) -> Optional[str]:
@@ -684,7 +1076,7 @@ class AIBaseNewsScraper:
                 return news_data.get('content') if news_data else None
             return None
         finally:
-            await self.close_browser()
+            await self._release_session()
         # --- FIX END ---
 
     async def get_news_in_timerange(self, hours: int = 1) -> List[Dict]:
@@ -720,5 +1112,5 @@ class AIBaseNewsScraper:
             # 由于 get_latest_news 已经关闭了资源，这里再次调用可能无害但非最优。
             # 一个健壮的 close_browser 应该能处理重复关闭。
             # 我已经在 close_browser 中加入了 `if self.session and not self.session.closed:` 判断。
-            await self.close_browser()
+            await self._release_session()
         # --- FIX END ---
@@ -51,6 +51,10 @@ class BaseScraper(ABC):
         """
         pass
         
+    async def close(self):
+        """释放采集器持有的资源（HTTP会话等），子类按需覆盖"""
+        pass
+        
     async def scrape_articles(self, start_date: date, end_date: date, 
                             progress_callback=None) -> Tuple[List[Article], List[str]]:
         """
@@ -65,60 +69,117 @@ class BaseScraper(ABC):
             
             # 获取文章列表
             article_list = await self.get_article_list(start_date, end_date)
-            total = len(article_list)
-            
-            if progress_callback:
-                progress_callback(f"{self.name}: 找到 {total} 篇文章", 0, total)
-            
-            # 使用信号量限制并发数，提高效率
-            semaphore = asyncio.Semaphore(4)  # 最多4个并发
+            articles, errors = await self._fetch_article_details(article_list, progress_callback)
+                    
+        except Exception as e:
+            error_msg = f"{self.name} 爬取过程出现错误: {str(e)}"
+            self.logger.error(error_msg)
+            errors.append(error_msg)
+        finally:
+            await self.close()
             
-            async def fetch_article(article_info, index):
-                async with semaphore:
-                    try:
-                        article = await self.get_article_detail(
-                            article_info.get('url', ''), 
-                            article_info.get('date', '')
-                        )
-                        if article:
-                            self.logger.info(f"成功爬取文章: {article.title}")
-                            return article, None
-                        else:
-                            error = f"无法获取文章详情: {article_info.get('title', '未知')}"
-                            return None, error
-                    except Exception as e:
-                        error = f"爬取文章失败 {article_info.get('title', '未知')}: {str(e)}"
-                        self.logger.error(error)
-                        return None, error
+        self.logger.info(f"{self.name} 爬取完成，成功 {len(articles)} 篇，错误 {len(errors)} 个")
+        return articles, errors
+        
+    async def scrape_articles_by_date(self, target_dates: List[date],
+                                      progress_callback=None) -> Tuple[Dict[date, List[Article]], List[str]]:
+        """
+        一次性爬取多个日期的文章：列表页只加载一次（覆盖最早到最晚日期），
+        筛出目标日期的条目后统一并发获取详情，再按日期分组
+        返回: ({日期: 文章列表}, 错误信息列表)
+        """
+        articles_by_date = {target_date: [] for target_date in target_dates}
+        errors = []
+        if not target_dates:
+            return articles_by_date, errors
+        
+        try:
+            start_date, end_date = min(target_dates), max(target_dates)
+            self.logger.info(f"开始爬取 {self.name} 网站文章，{len(target_dates)} 个日期: {start_date} 到 {end_date}")
             
-            # 使用asyncio.gather并发获取所有文章
-            tasks = [fetch_article(article_info, i) for i, article_info in enumerate(article_list)]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # 日期可能不连续，只保留目标日期的条目
+            article_list = [
+                article_info for article_info in await self.get_article_list(start_date, end_date)
+                if self._match_target_date(article_info.get('date', ''), target_dates)
+            ]
+            articles, errors = await self._fetch_article_details(article_list, progress_callback)
             
-            # 处理结果
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    error_msg = f"并发爬取异常: {str(result)}"
-                    self.logger.error(error_msg)
-                    errors.append(error_msg)
-                elif result:
-                    article, error = result
-                    if article:
-                        articles.append(article)
-                    if error:
-                        errors.append(error)
-                        
-                if progress_callback and (i + 1) % 5 == 0:  # 每5个更新一次进度
-                    progress_callback(f"{self.name}: 处理中...", i + 1, len(results))
+            for article in articles:
+                target_date = self._match_target_date(article.date, target_dates)
+                if target_date:
+                    articles_by_date[target_date].append(article)
                     
         except Exception as e:
             error_msg = f"{self.name} 爬取过程出现错误: {str(e)}"
             self.logger.error(error_msg)
             errors.append(error_msg)
+        finally:
+            await self.close()
             
-        self.logger.info(f"{self.name} 爬取完成，成功 {len(articles)} 篇，错误 {len(errors)} 个")
+        total = sum(len(date_articles) for date_articles in articles_by_date.values())
+        self.logger.info(f"{self.name} 爬取完成，成功 {total} 篇，错误 {len(errors)} 个")
+        return articles_by_date, errors
+        
+    async def _fetch_article_details(self, article_list: List[Dict],
+                                     progress_callback=None) -> Tuple[List[Article], List[str]]:
+        """并发获取列表中各文章的详情，返回: (成功的文章列表, 错误信息列表)"""
+        articles = []
+        errors = []
+        total = len(article_list)
+        
+        if progress_callback:
+            progress_callback(f"{self.name}: 找到 {total} 篇文章", 0, total)
+        
+        # 使用信号量限制并发数，提高效率
+        semaphore = asyncio.Semaphore(4)  # 最多4个并发
+        
+        async def fetch_article(article_info, index):
+            async with semaphore:
+                try:
+                    article = await self.get_article_detail(
+                        article_info.get('url', ''), 
+                        article_info.get('date', '')
+                    )
+                    if article:
+                        self.logger.info(f"成功爬取文章: {article.title}")
+                        return article, None
+                    else:
+                        error = f"无法获取文章详情: {article_info.get('title', '未知')}"
+                        return None, error
+                except Exception as e:
+                    error = f"爬取文章失败 {article_info.get('title', '未知')}: {str(e)}"
+                    self.logger.error(error)
+                    return None, error
+        
+        # 使用asyncio.gather并发获取所有文章
+        tasks = [fetch_article(article_info, i) for i, article_info in enumerate(article_list)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # 处理结果
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                error_msg = f"并发爬取异常: {str(result)}"
+                self.logger.error(error_msg)
+                errors.append(error_msg)
+            elif result:
+                article, error = result
+                if article:
+                    articles.append(article)
+                if error:
+                    errors.append(error)
+                    
+            if progress_callback and (i + 1) % 5 == 0:  # 每5个更新一次进度
+                progress_callback(f"{self.name}: 处理中...", i + 1, len(results))
+        
         return articles, errors
         
+    def _match_target_date(self, article_date: str, target_dates: List[date]) -> Optional[date]:
+        """返回文章日期对应的目标日期，不属于任何目标日期时返回 None"""
+        for target_date in target_dates:
+            if self.is_date_in_range(article_date, target_date, target_date):
+                return target_date
+        return None
+        
     def is_date_in_range(self, article_date: str, start_date: date, end_date: date) -> bool:
         """检查文章日期是否在指定范围内"""
         try:
@@ -0,0 +1,196 @@
+"""
+Playwright浏览器池
+单个Chromium进程常驻，按需借出相互隔离的上下文/页面
+"""
+import asyncio
+import logging
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from playwright.async_api import async_playwright, Browser, Page, Playwright
+
+try:
+    from config import Config
+    BROWSER_POOL_CONFIG = Config.BROWSER_POOL_CONFIG
+except (ImportError, AttributeError):
+    BROWSER_POOL_CONFIG = {
+        'pool_size': 4,
+        'max_pages_per_browser': 50,
+        'headless': True,
+        'idle_timeout': 300
+    }
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-web-security',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled'
+]
+
+
+class BrowserPool:
+    """
+    共享浏览器池
+    - 首次借用时才启动Chromium（懒加载）
+    - 每次借用创建独立的BrowserContext，用完即关闭，互不干扰
+    - 同时借出的页面数受 pool_size 限制
+    - 累计服务 max_pages_per_browser 个页面后，等当前页面全部归还再重启浏览器，控制内存增长
+    - 所有页面归还后空闲 idle_timeout 秒即关闭浏览器，下次借用时再启动（事件循环常驻时避免Chromium一直占用内存）
+    """
+
+    def __init__(self, pool_size: int = None, max_pages_per_browser: int = None,
+                 launch_args: List[str] = None):
+        self.pool_size = pool_size or BROWSER_POOL_CONFIG.get('pool_size', 4)
+        self.max_pages_per_browser = max_pages_per_browser or BROWSER_POOL_CONFIG.get('max_pages_per_browser', 50)
+        self.headless = BROWSER_POOL_CONFIG.get('headless', True)
+        self.idle_timeout = BROWSER_POOL_CONFIG.get('idle_timeout', 300)
+        self.launch_args = launch_args or DEFAULT_LAUNCH_ARGS
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._active_pages = 0
+        self._pages_on_browser = 0
+        self._recycle_pending = False
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self.launch_count = 0
+
+    def _ensure_primitives(self):
+        """在事件循环内创建同步原语"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.pool_size)
+            self._condition = asyncio.Condition()
+
+    async def _start_browser(self):
+        """启动（或重启）Chromium进程，调用方需持有 self._condition"""
+        await self._shutdown_browser()
+
+        if not self._playwright:
+            self._playwright = await async_playwright().start()
+
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.headless,
+            args=self.launch_args
+        )
+        self._pages_on_browser = 0
+        self._recycle_pending = False
+        self.launch_count += 1
+        logger.info(f"浏览器池启动Chromium（第 {self.launch_count} 次）")
+
+    async def _shutdown_browser(self):
+        """关闭当前Chromium进程"""
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug(f"关闭浏览器失败: {e}")
+            self._browser = None
+
+    async def _acquire_browser(self) -> Browser:
+        """获取可用的浏览器实例，必要时启动或回收重启"""
+        async with self._condition:
+            self._cancel_idle_timer()
+            # 等待回收：旧浏览器上的页面全部归还后才能重启
+            while self._recycle_pending and self._active_pages > 0:
+                await self._condition.wait()
+
+            if self._recycle_pending:
+                logger.info(f"浏览器已服务 {self._pages_on_browser} 个页面，回收重启")
+                await self._start_browser()
+            elif not self._browser or not self._browser.is_connected():
+                await self._start_browser()
+
+            self._active_pages += 1
+            self._pages_on_browser += 1
+            if self._pages_on_browser >= self.max_pages_per_browser:
+                self._recycle_pending = True
+
+            return self._browser
+
+    async def _release_browser(self):
+        """归还页面计数，全部归还后开始空闲计时"""
+        async with self._condition:
+            self._active_pages -= 1
+            self._condition.notify_all()
+            if self._active_pages == 0 and self._browser and self.idle_timeout:
+                self._cancel_idle_timer()
+                loop = asyncio.get_running_loop()
+                self._idle_handle = loop.call_later(
+                    self.idle_timeout, lambda: loop.create_task(self._close_if_idle())
+                )
+
+    def _cancel_idle_timer(self):
+        if self._idle_handle:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    async def _close_if_idle(self):
+        """空闲超时：仍无页面借出时关闭浏览器"""
+        async with self._condition:
+            self._idle_handle = None
+            if self._active_pages == 0 and self._browser:
+                logger.info(f"浏览器空闲超过 {self.idle_timeout} 秒，关闭Chromium")
+                await self._shutdown_browser()
+
+    @asynccontextmanager
+    async def page(self, **context_options) -> AsyncIterator[Page]:
+        """
+        借用一个页面
+        Args:
+            context_options: 传给 browser.new_context 的参数，如 viewport、device_scale_factor
+        Yields:
+            Playwright Page，退出时其所属的上下文会被关闭
+        """
+        self._ensure_primitives()
+
+        async with self._semaphore:
+            browser = await self._acquire_browser()
+            context = None
+            try:
+                context = await browser.new_context(**context_options)
+                page = await context.new_page()
+                yield page
+            finally:
+                if context:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.debug(f"关闭浏览器上下文失败: {e}")
+                await self._release_browser()
+
+    async def close(self):
+        """关闭浏览器与Playwright"""
+        self._cancel_idle_timer()
+        await self._shutdown_browser()
+        if self._playwright:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"停止Playwright失败: {e}")
+            self._playwright = None
+
+
+# 浏览器与事件循环绑定，每个事件循环持有一个浏览器池
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = weakref.WeakKeyDictionary()
+
+
+def get_browser_pool() -> BrowserPool:
+    """获取当前事件循环共享的浏览器池"""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = BrowserPool()
+        _pools[loop] = pool
+    return pool
+
+
+async def close_browser_pool():
+    """关闭当前事件循环的浏览器池（事件循环结束前调用）"""
+    loop = asyncio.get_running_loop()
+    pool = _pools.pop(loop, None)
+    if pool:
+        await pool.close()
@@ -0,0 +1,255 @@
+"""
+原始页面缓存
+按URL缓存详情页的原始响应（gzip压缩）以及 ETag / Last-Modified：
+- 已发布的文章页几乎不会变化，fresh_hours 内直接读取本地文件，不发请求
+- 超过 fresh_hours 后带 If-None-Match / If-Modified-Since 条件请求，304 时继续使用本地内容
+重复采集同一日期时，AIBase快讯页和搜狐文章页大多直接从磁盘读取
+读写文件、gzip压缩解压和定期清理都在线程池中执行，不阻塞共用的后台事件循环
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    from config import Config
+    PAGE_CACHE_CONFIG = Config.PAGE_CACHE_CONFIG
+    DEFAULT_CACHE_DIR = os.path.join(Config.CACHE_DIR, 'pages')
+except (ImportError, AttributeError):
+    PAGE_CACHE_CONFIG = {}
+    DEFAULT_CACHE_DIR = os.path.join('cache', 'pages')
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    """磁盘页面缓存（每个URL一个 .gz 正文文件和一个 .json 元数据文件）"""
+
+    def __init__(self, cache_dir: str = None, fresh_hours: float = None,
+                 max_age_days: float = None, max_size_mb: float = None):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.enabled = PAGE_CACHE_CONFIG.get('enabled', True)
+        self.fresh_seconds = (fresh_hours if fresh_hours is not None
+                              else PAGE_CACHE_CONFIG.get('fresh_hours', 72)) * 3600
+        self.max_age_seconds = (max_age_days or PAGE_CACHE_CONFIG.get('max_age_days', 30)) * 86400
+        self.max_bytes = int((max_size_mb or PAGE_CACHE_CONFIG.get('max_size_mb', 300)) * 1024 * 1024)
+        self.evict_interval = PAGE_CACHE_CONFIG.get('evict_interval', 200)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._cleaning = False
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json"), os.path.join(self.cache_dir, f"{name}.gz")
+
+    def _load(self, url: str) -> Optional[Dict]:
+        """读取元数据，不存在或URL不一致时返回 None"""
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"读取页面缓存元数据失败 {url}: {e}")
+            return None
+        return meta if meta.get('url') == url else None
+
+    def _read_cached(self, url: str) -> Tuple[Optional[Dict], Optional[bytes]]:
+        """读取元数据和解压后的正文（在线程池中执行），任一缺失时都返回 None"""
+        meta = self._load(url)
+        body = self._read_body(url) if meta else None
+        return (meta, body) if body is not None else (None, None)
+
+    def _read_body(self, url: str) -> Optional[bytes]:
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, 'rb') as f:
+                return gzip.decompress(f.read())
+        except Exception as e:
+            logger.debug(f"读取页面缓存失败 {url}: {e}")
+            return None
+
+    def _write_meta(self, meta: Dict):
+        meta_path, _ = self._paths(meta['url'])
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def _store(self, url: str, body: bytes, encoding: str, etag: Optional[str],
+               last_modified: Optional[str]) -> bool:
+        """
+        写入正文和元数据（在线程池中执行）
+        Returns:
+            是否到了执行清理的时候（每 evict_interval 次写入一次，由调用方另行提交，不在本次写入中执行）
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            _, body_path = self._paths(url)
+            tmp_path = f"{body_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(tmp_path, body_path)
+            now = time.time()
+            self._write_meta({
+                'url': url,
+                'encoding': encoding,
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': len(body),
+                'fetched_at': now,
+                'validated_at': now
+            })
+        except Exception as e:
+            logger.warning(f"写入页面缓存失败 {url}: {e}")
+            return False
+        with self._lock:
+            self._writes += 1
+            if self._writes % self.evict_interval or self._cleaning:
+                return False
+            self._cleaning = True
+            return True
+
+    def _cleanup_in_background(self):
+        try:
+            self.cleanup()
+        except Exception as e:
+            logger.warning(f"页面缓存清理失败: {e}")
+        finally:
+            with self._lock:
+                self._cleaning = False
+
+    async def fetch(self, session, url: str) -> Optional[Tuple[bytes, str]]:
+        """
+        获取页面原始内容（优先使用缓存）
+        Args:
+            session: aiohttp.ClientSession
+            url: 页面地址
+        Returns:
+            (页面字节, 编码)；非200/304状态时返回 None（不缓存）。网络异常向上抛出，由调用方重试
+        """
+        if not self.enabled:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return None
+                return await response.read(), response.charset or 'utf-8'
+
+        loop = asyncio.get_running_loop()
+        meta, body = await loop.run_in_executor(None, self._read_cached, url)
+        if meta and time.time() - meta.get('validated_at', 0) < self.fresh_seconds:
+            self.hits += 1
+            return body, meta.get('encoding') or 'utf-8'
+
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and meta:
+                self.revalidated += 1
+                meta['validated_at'] = time.time()
+                try:
+                    await loop.run_in_executor(None, self._write_meta, meta)
+                except Exception as e:
+                    logger.debug(f"更新页面缓存元数据失败 {url}: {e}")
+                return body, meta.get('encoding') or 'utf-8'
+            if response.status != 200:
+                return None
+            content = await response.read()
+            encoding = response.charset or 'utf-8'
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+        self.misses += 1
+        if await loop.run_in_executor(None, self._store, url, content, encoding, etag, last_modified):
+            # 清理要遍历整个缓存目录，单独提交到线程池，不等待其完成
+            loop.run_in_executor(None, self._cleanup_in_background)
+        return content, encoding
+
+    def invalidate(self, url: str):
+        """删除一个页面的缓存（如页面内容不完整、解析失败时）"""
+        for path in self._paths(url):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def cleanup(self) -> int:
+        """
+        删除超过 max_age_days 的页面，再按最近验证时间淘汰超出总大小上限的页面
+        Returns:
+            删除的页面数
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.gz'):
+                continue
+            body_path = os.path.join(self.cache_dir, name)
+            meta_path = body_path[:-3] + '.json'
+            try:
+                size = os.path.getsize(body_path)
+                validated_at = os.path.getmtime(meta_path)
+            except OSError:
+                validated_at, size = 0, 0
+            if now - validated_at > self.max_age_seconds:
+                self._remove_files(body_path, meta_path)
+                removed += 1
+                continue
+            entries.append((validated_at, size, body_path, meta_path))
+
+        entries.sort()
+        total_bytes = sum(size for _, size, _, _ in entries)
+        while entries and total_bytes > self.max_bytes:
+            _, size, body_path, meta_path = entries.pop(0)
+            self._remove_files(body_path, meta_path)
+            total_bytes -= size
+            removed += 1
+        if removed:
+            logger.info(f"页面缓存清理 {removed} 个页面")
+        return removed
+
+    @staticmethod
+    def _remove_files(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def get_stats(self) -> Dict:
+        """缓存统计"""
+        pages = 0
+        total_bytes = 0
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.gz'):
+                    pages += 1
+                    total_bytes += os.path.getsize(os.path.join(self.cache_dir, name))
+        return {
+            'enabled': self.enabled,
+            'pages': pages,
+            'size_bytes': total_bytes,
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses
+        }
+
+
+# 全局实例
+page_cache = PageCache()
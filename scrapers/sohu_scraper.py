@@ -1,39 +1,78 @@
 from datetime import date
-from typing import List, Dict, Optional
-from playwright.async_api import async_playwright, Page, Browser
+from typing import List, Dict, Optional, Tuple
+from playwright.async_api import Page
+from bs4 import BeautifulSoup
+import aiohttp
 import asyncio
 import re
 from .base_scraper import BaseScraper, Article
+from .browser_pool import BrowserPool, get_browser_pool
+from .page_cache import PageCache, page_cache as default_page_cache
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 
 class SohuScraper(BaseScraper):
-    def __init__(self):
+    # 详情页选择器（静态解析与浏览器渲染共用）
+    TITLE_SELECTORS = [
+        "h1",
+        "[class*='title']",
+        ".article-title",
+        ".content-title"
+    ]
+    CONTENT_SELECTORS = [
+        ".text",  # 搜狐文章主要内容
+        "[class*='content']",
+        "[class*='article-body']",
+        ".article-content",
+        "article",
+        "[id*='content']",
+        ".text-content",  # 搜狐可能的内容区域
+    ]
+    DATE_SELECTORS = [
+        "[class*='time']",
+        "[class*='date']",
+        ".publish-time",
+        ".article-date"
+    ]
+    
+    def __init__(self, browser_pool: Optional[BrowserPool] = None, page_cache: Optional[PageCache] = None):
         super().__init__(
             name="腾讯研究院AI速递",
             base_url="https://mp.sohu.com/profile?xpt=bGl1amluc29uZzIwMDBAMTI2LmNvbQ=="
         )
         self.source_weight = 8  # 权重分数
+        self.browser_pool = browser_pool  # 未指定时使用当前事件循环共享的浏览器池
+        self.session = None  # 详情页静态抓取的HTTP会话
+        self.page_cache = page_cache or default_page_cache  # 详情页原始内容的磁盘缓存
+        
+    def _get_browser_pool(self) -> BrowserPool:
+        return self.browser_pool or get_browser_pool()
+        
+    async def _ensure_session(self):
+        """确保HTTP会话存在"""
+        if not self.session or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=10, connect=3),
+                headers={'User-Agent': USER_AGENT}
+            )
+            
+    async def close(self):
+        """关闭HTTP会话"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
         
     async def get_article_list(self, start_date: date, end_date: date) -> List[Dict]:
         """获取搜狐腾讯研究院文章列表"""
         articles = []
         
-        async with async_playwright() as p:
-            browser_options = {
-                'headless': True,
-                'args': [
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-web-security',
-                    '--disable-dev-shm-usage',
-                    '--disable-blink-features=AutomationControlled'
-                ]
-            }
-            browser = await p.chromium.launch(**browser_options)
-            page = await browser.new_page()
-            
+        all_found_articles = []  # 用于调试
+        
+        async with self._get_browser_pool().page() as page:
             # 设置更真实的User-Agent
             await page.set_extra_http_headers({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+                'User-Agent': USER_AGENT
             })
             
             try:
@@ -63,7 +102,6 @@ class SohuScraper(BaseScraper):
                 ]
                 
                 found_links = set()
-                all_found_articles = []  # 用于调试
                 
                 for selector in article_selectors:
                     try:
@@ -119,9 +157,6 @@ class SohuScraper(BaseScraper):
             except Exception as e:
                 self.logger.error(f"获取搜狐文章列表失败: {e}")
                 
-            finally:
-                await browser.close()
-                
         # 调试信息：输出所有找到的文章标题
         if all_found_articles:
             self.logger.info(f"总共找到 {len(all_found_articles)} 篇文章标题:")
@@ -142,37 +177,105 @@ class SohuScraper(BaseScraper):
         return filtered_articles
         
     async def get_article_detail(self, article_url: str, list_date: str = "") -> Optional[Article]:
-        """获取文章详细内容"""
+        """获取文章详细内容：优先静态HTML解析，解析不到再用浏览器渲染"""
         if not article_url:
             return None
             
-        async with async_playwright() as p:
-            browser_options = {
-                'headless': True,
-                'args': [
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-web-security',
-                    '--disable-dev-shm-usage'
-                ]
-            }
-            browser = await p.chromium.launch(**browser_options)
-            page = await browser.new_page()
+        article = await self._get_article_detail_static(article_url, list_date)
+        if article:
+            return article
+            
+        self.logger.info(f"静态解析未获取到内容，使用浏览器渲染: {article_url}")
+        return await self._get_article_detail_browser(article_url, list_date)
+        
+    async def _get_article_detail_static(self, article_url: str, list_date: str = "") -> Optional[Article]:
+        """
+        直接请求HTML并解析（搜狐文章页为服务端渲染，多数情况下无需浏览器）
+        经页面缓存获取，重复采集时已发布的文章直接读取本地内容或条件请求重新验证
+        """
+        try:
+            await self._ensure_session()
+            page = await self.page_cache.fetch(self.session, article_url)
+            if not page:
+                self.logger.debug(f"静态请求 {article_url} 未返回页面")
+                return None
+            body, encoding = page
+            html = body.decode(encoding, errors='ignore')
+        except Exception as e:
+            self.logger.debug(f"静态请求 {article_url} 失败: {e}")
+            return None
+            
+        title, content, article_date = self._extract_article_from_html(html)
+        if not title or not content:
+            # 可能是需要JS渲染的页面或反爬页，删除缓存，下次重新请求而不是从磁盘读到同一个空壳
+            self.page_cache.invalidate(article_url)
+            return None
             
+        final_date = list_date or article_date or date.today().strftime("%Y-%m-%d")
+        return Article(
+            title=title,
+            date=final_date,
+            content=content,
+            url=article_url
+        )
+        
+    def _extract_article_from_html(self, html: str) -> Tuple[str, str, str]:
+        """
+        从原始HTML中提取标题、正文和日期
+        Returns:
+            (标题, 正文, 日期)，正文不足100字视为未提取到
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        title = ""
+        for selector in self.TITLE_SELECTORS:
+            element = soup.select_one(selector)
+            if element:
+                title = element.get_text().strip()
+                if title:
+                    break
+                    
+        content = ""
+        for selector in self.CONTENT_SELECTORS:
+            element = soup.select_one(selector)
+            if not element:
+                continue
+            paragraphs = element.select("p, div")
+            if paragraphs:
+                content_parts = []
+                for p in paragraphs:
+                    p_text = p.get_text().strip()
+                    if p_text and len(p_text) > 10:
+                        content_parts.append(p_text)
+                content = "\n\n".join(content_parts)
+            else:
+                content = element.get_text()
+            content = content.strip()
+            if len(content) > 100:
+                break
+        else:
+            content = ""
+            
+        article_date = ""
+        for selector in self.DATE_SELECTORS:
+            element = soup.select_one(selector)
+            if element:
+                article_date = self._extract_date_from_text(element.get_text())
+                if article_date:
+                    break
+                    
+        return title, content, article_date
+        
+    async def _get_article_detail_browser(self, article_url: str, list_date: str = "") -> Optional[Article]:
+        """使用浏览器渲染获取文章详细内容"""
+        async with self._get_browser_pool().page() as page:
             try:
                 await page.goto(article_url, wait_until="domcontentloaded", timeout=20000)
                 await page.wait_for_timeout(1000)  # 缩短等待时间
                 
                 # 获取文章标题
-                title_selectors = [
-                    "h1",
-                    "[class*='title']",
-                    ".article-title",
-                    ".content-title"
-                ]
-                
                 title = ""
-                for selector in title_selectors:
+                for selector in self.TITLE_SELECTORS:
                     try:
                         title_element = await page.query_selector(selector)
                         if title_element:
@@ -183,18 +286,8 @@ class SohuScraper(BaseScraper):
                         continue
                         
                 # 获取文章内容 - 针对搜狐页面结构优化
-                content_selectors = [
-                    ".text",  # 搜狐文章主要内容
-                    "[class*='content']",
-                    "[class*='article-body']",
-                    ".article-content",
-                    "article",
-                    "[id*='content']",
-                    ".text-content",  # 搜狐可能的内容区域
-                ]
-                
                 content = ""
-                for selector in content_selectors:
+                for selector in self.CONTENT_SELECTORS:
                     try:
                         content_element = await page.query_selector(selector)
                         if content_element:
@@ -216,15 +309,8 @@ class SohuScraper(BaseScraper):
                         continue
                         
                 # 获取发布日期
-                date_selectors = [
-                    "[class*='time']",
-                    "[class*='date']",
-                    ".publish-time",
-                    ".article-date"
-                ]
-                
                 article_date = ""
-                for selector in date_selectors:
+                for selector in self.DATE_SELECTORS:
                     try:
                         date_element = await page.query_selector(selector)
                         if date_element:
@@ -254,9 +340,6 @@ class SohuScraper(BaseScraper):
                 self.logger.error(f"获取文章详情失败 {article_url}: {e}")
                 return None
                 
-            finally:
-                await browser.close()
-                
     def _extract_date_from_text(self, text: str) -> str:
         """从文本中提取日期，处理相对时间"""
         if not text:
@@ -0,0 +1,107 @@
+"""
+请求合并（single-flight）
+相同操作、相同参数的并发调用只执行一次：后到的调用方挂到正在进行的调用上，等待并共享其结果。
+重复点击、多个标签页、定时任务与手动操作同时触发时，不会重复调用DeepSeek或重复采集
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(operation: str, *parts) -> str:
+    """由操作名和参数计算合并键"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return f"{operation}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}"
+
+
+def _share(result: Any) -> Any:
+    """共享结果时复制一层字典，各调用方修改自己的副本互不影响"""
+    return dict(result) if isinstance(result, dict) else result
+
+
+class SingleFlight:
+    """按键合并进行中的异步调用（只合并同一事件循环上的调用）"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.joined = 0
+
+    def join(self, key: str) -> Optional[asyncio.Future]:
+        """
+        查找进行中的调用
+        Returns:
+            进行中调用的 Future；没有时返回 None
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None or future.done() or future.get_loop() is not loop:
+                return None
+            self.joined += 1
+        logger.info(f"合并重复请求: {key}")
+        return future
+
+    def begin(self, key: str) -> asyncio.Future:
+        """登记一个由调用方自行完成的调用（如流式生成），完成后必须调用 finish"""
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._inflight[key] = future
+            self.started += 1
+        return future
+
+    def finish(self, key: str, future: asyncio.Future, result: Any):
+        """完成 begin 登记的调用，唤醒等待的调用方"""
+        self._forget(key, future)
+        if not future.done():
+            future.set_result(result)
+
+    def _forget(self, key: str, future: asyncio.Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]],
+                 on_join: Callable[[], None] = None) -> Any:
+        """
+        执行调用；相同键的调用正在进行时等待其结果
+        Args:
+            key: 合并键（见 make_key）
+            factory: 创建实际调用的协程函数
+            on_join: 挂到进行中的调用上时的回调（如更新进度说明）
+        Returns:
+            调用结果（后到的调用方得到字典结果的副本）
+        """
+        future = self.join(key)
+        if future is not None:
+            if on_join:
+                on_join()
+            # shield：等待方被取消时不影响进行中的调用
+            return _share(await asyncio.shield(future))
+
+        task = asyncio.ensure_future(factory())
+        with self._lock:
+            self._inflight[key] = task
+            self.started += 1
+        task.add_done_callback(partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict:
+        """合并统计"""
+        with self._lock:
+            return {
+                'in_flight': sorted(self._inflight),
+                'started': self.started,
+                'joined': self.joined
+            }
+
+
+# 全局实例
+single_flight = SingleFlight()
@@ -0,0 +1,64 @@
+"""
+文章缓存（按日期、数据源登记的采集结果）测试
+"""
+import pytest
+
+from article_store import ArticleStore, date_entry_name, range_entry_name
+
+DATES = ['2025-01-01', '2025-01-02', '2025-01-03']
+
+
+def article(target_date, source):
+    return {'title': f'{source} {target_date}', 'date': target_date, 'source': source}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(store_dir=str(tmp_path))
+    store.enabled = True
+    store.reuse_hours = 12
+    return store
+
+
+def multi_crawl(store, date_list):
+    partitions = [(target_date, source, [article(target_date, source)])
+                  for target_date in date_list for source in ['tencent', 'aibase']]
+    store.put_crawl(range_entry_name(date_list), partitions)
+
+
+def single_crawl_reusing_tencent(store, target_date):
+    tencent, _ = store.get_reusable(target_date, 'tencent')
+    partitions = [(target_date, 'tencent', tencent), (target_date, 'aibase', [article(target_date, 'aibase-new')])]
+    store.put_crawl(date_entry_name(target_date), partitions, indexed=[(target_date, 'aibase')])
+
+
+def test_reused_partition_follows_new_entry_when_old_entry_is_overwritten(store):
+    multi_crawl(store, DATES)
+    single_crawl_reusing_tencent(store, '2025-01-02')
+    # 首尾日期相同的多日期采集覆盖同名条目，其中不再包含 01-02
+    multi_crawl(store, ['2025-01-01', '2025-01-03'])
+    assert range_entry_name(['2025-01-01', '2025-01-03']) == range_entry_name(DATES)
+
+    assert store.get_date_articles('2025-01-02') == [article('2025-01-02', 'tencent'),
+                                                    article('2025-01-02', 'aibase-new')]
+    assert store.get_reusable('2025-01-02', 'tencent') is not None
+
+
+def test_reused_partition_survives_eviction_of_old_entry(store):
+    multi_crawl(store, DATES)
+    single_crawl_reusing_tencent(store, '2025-01-02')
+    store.delete(range_entry_name(DATES))
+
+    assert store.get_date_articles('2025-01-02') == [article('2025-01-02', 'tencent'),
+                                                    article('2025-01-02', 'aibase-new')]
+
+
+def test_missing_source_falls_back_to_single_date_entry(store):
+    partitions = [('2025-01-02', 'tencent', [article('2025-01-02', 'tencent')]),
+                  ('2025-01-02', 'aibase', [article('2025-01-02', 'aibase')])]
+    store.put_crawl(date_entry_name('2025-01-02'), partitions, indexed=[('2025-01-02', 'aibase')])
+
+    # tencent 没有登记（如旧版本写入的条目），从单日条目中按记录的位置读取
+    assert store.get_partition('2025-01-02', 'tencent') is None
+    assert store.get_date_articles('2025-01-02') == [article('2025-01-02', 'tencent'),
+                                                    article('2025-01-02', 'aibase')]
@@ -0,0 +1,102 @@
+"""
+资讯近似去重测试
+"""
+import pytest
+
+import dedup
+from dedup import ArticleDeduplicator, split_digest
+
+TENCENT_DIGEST = {
+    'title': '腾讯研究院AI速递 20241015',
+    'source': '腾讯研究院AI速递',
+    'url': 'https://www.sohu.com/a/tencent-digest',
+    'weight': 8,
+    'content': (
+        '一、OpenAI发布GPT-4o mini模型\n\n'
+        '1. OpenAI推出轻量级多模态模型GPT-4o mini，价格比GPT-3.5 Turbo便宜60%以上。\n\n'
+        '2. 新模型在MMLU基准上得分82%，支持128K上下文窗口，面向开发者和免费用户开放。\n\n'
+        '二、谷歌DeepMind推出AlphaProteo蛋白质设计系统\n\n'
+        '1. AlphaProteo可以为多种靶点蛋白设计高亲和力结合物，实验成功率大幅提升。\n\n'
+        '2. 研究团队表示该系统有望加速药物研发和疾病诊断研究。\n\n'
+        '三、英伟达发布Blackwell架构新一代GPU\n\n'
+        '1. 英伟达在GTC大会上发布B200芯片，推理性能相比H100提升30倍。\n\n'
+        '2. 多家云厂商宣布将在年内部署基于Blackwell的计算集群。'
+    )
+}
+
+AIBASE_DUPLICATE = {
+    'title': 'OpenAI发布GPT-4o mini模型，价格比GPT-3.5 Turbo便宜60%以上',
+    'source': 'AIBase快讯',
+    'url': 'https://www.aibase.com/zh/news/12345',
+    'weight': 5,
+    'content': (
+        'OpenAI今日推出轻量级多模态模型GPT-4o mini，价格比GPT-3.5 Turbo便宜60%以上。'
+        '新模型在MMLU基准上得分82%，支持128K上下文窗口，面向开发者和免费用户开放。'
+        'OpenAI表示，GPT-4o mini将逐步替代ChatGPT中的GPT-3.5 Turbo，企业用户下周即可使用。'
+    )
+}
+
+AIBASE_OTHER = {
+    'title': '阿里云发布通义千问2.5，开源多个尺寸模型',
+    'source': 'AIBase快讯',
+    'url': 'https://www.aibase.com/zh/news/12346',
+    'weight': 5,
+    'content': '阿里云在云栖大会上发布通义千问2.5系列模型，并开源从0.5B到72B的多个尺寸，代码和数学能力显著提升。'
+}
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def deduplicator(request, monkeypatch):
+    if request.param == 'numpy':
+        if dedup.np is None:
+            pytest.skip('未安装 NumPy')
+    else:
+        monkeypatch.setattr(dedup, 'np', None)
+    return ArticleDeduplicator({})
+
+
+def test_split_digest_items():
+    items = split_digest(TENCENT_DIGEST)
+    assert [item['title'] for item in items] == [
+        'OpenAI发布GPT-4o mini模型',
+        '谷歌DeepMind推出AlphaProteo蛋白质设计系统',
+        '英伟达发布Blackwell架构新一代GPU'
+    ]
+    assert all(item['url'] == TENCENT_DIGEST['url'] for item in items)
+    assert items[0]['content'].startswith('1. OpenAI推出轻量级多模态模型')
+
+
+def test_digest_item_merges_with_aibase_duplicate(deduplicator):
+    result, stats = deduplicator.dedupe([TENCENT_DIGEST, AIBASE_DUPLICATE, AIBASE_OTHER])
+
+    assert stats['groups'] == 1
+    assert stats['removed'] == 1
+    assert stats['digests_split'] == 1
+    # 速递按条输出：重复的快讯合并到第一条上，其余两条和无关快讯保留
+    assert [article['title'] for article in result] == [
+        'OpenAI发布GPT-4o mini模型',
+        '谷歌DeepMind推出AlphaProteo蛋白质设计系统',
+        '英伟达发布Blackwell架构新一代GPU',
+        AIBASE_OTHER['title']
+    ]
+    merged = result[0]
+    assert merged['merged_sources'] == ['腾讯研究院AI速递', 'AIBase快讯']
+    assert merged['duplicate_urls'] == [AIBASE_DUPLICATE['url']]
+    assert 'AlphaProteo' not in merged['content']
+
+
+def test_digest_without_duplicates_stays_whole(deduplicator):
+    result, stats = deduplicator.dedupe([TENCENT_DIGEST, AIBASE_OTHER])
+
+    assert stats['removed'] == 0
+    assert stats['digests_split'] == 0
+    assert result == [TENCENT_DIGEST, AIBASE_OTHER]
+
+
+def test_articles_without_text_are_kept(deduplicator):
+    articles = [{'title': '', 'content': ''}, {'title': '——', 'content': 'https://example.com/a'},
+                {'title': '！！', 'content': ''}]
+    result, stats = deduplicator.dedupe(articles)
+
+    assert stats['removed'] == 0
+    assert len(result) == 3
@@ -1,34 +1,23 @@
 """
 工具函数模块
 """
-import json
 import os
 import hashlib
 from datetime import datetime, date
 from typing import List, Dict, Optional
 from config import Config
+from article_store import article_store
 
 def save_cache(data: Dict, cache_key: str) -> bool:
     """
-    保存数据到缓存
+    保存数据到缓存（统一写入 article_store）
     Args:
         data: 要保存的数据
         cache_key: 缓存键名
     Returns:
         是否保存成功
     """
-    try:
-        cache_file = os.path.join(Config.CACHE_DIR, f"{cache_key}.json")
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'data': data,
-                'timestamp': datetime.now().isoformat(),
-                'cache_key': cache_key
-            }, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        print(f"保存缓存失败: {e}")
-        return False
+    return article_store.put(cache_key, data) is not None
 
 def load_cache(cache_key: str, max_age_hours: int = 24) -> Optional[Dict]:
     """
@@ -39,23 +28,7 @@ def load_cache(cache_key: str, max_age_hours: int = 24) -> Optional[Dict]:
     Returns:
         缓存的数据，如果过期或不存在则返回None
     """
-    try:
-        cache_file = os.path.join(Config.CACHE_DIR, f"{cache_key}.json")
-        if not os.path.exists(cache_file):
-            return None
-            
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            cache_data = json.load(f)
-        
-        # 检查缓存是否过期
-        cache_time = datetime.fromisoformat(cache_data['timestamp'])
-        if (datetime.now() - cache_time).total_seconds() > max_age_hours * 3600:
-            return None
-            
-        return cache_data['data']
-    except Exception as e:
-        print(f"加载缓存失败: {e}")
-        return None
+    return article_store.get(cache_key, max_age_hours=max_age_hours)
 
 def generate_cache_key(date_str: str, sources: List[str]) -> str:
     """
@@ -148,40 +121,13 @@ def get_file_size_human(file_path: str) -> str:
 
 def cleanup_old_cache(max_files: int = 100) -> int:
     """
-    清理旧的缓存文件
+    清理旧的缓存条目（过期的以及超出条目数、总大小上限的）
     Args:
-        max_files: 保留的最大文件数
+        max_files: 保留的最大条目数
     Returns:
-        删除的文件数
+        删除的条目数
     """
-    try:
-        if not os.path.exists(Config.CACHE_DIR):
-            return 0
-            
-        # 获取所有缓存文件
-        cache_files = []
-        for filename in os.listdir(Config.CACHE_DIR):
-            if filename.endswith('.json'):
-                file_path = os.path.join(Config.CACHE_DIR, filename)
-                mtime = os.path.getmtime(file_path)
-                cache_files.append((file_path, mtime))
-        
-        # 按修改时间排序，保留最新的
-        cache_files.sort(key=lambda x: x[1], reverse=True)
-        
-        deleted_count = 0
-        if len(cache_files) > max_files:
-            for file_path, _ in cache_files[max_files:]:
-                try:
-                    os.remove(file_path)
-                    deleted_count += 1
-                except Exception:
-                    pass
-                    
-        return deleted_count
-    except Exception as e:
-        print(f"清理缓存失败: {e}")
-        return 0
+    return article_store.cleanup(max_entries=max_files)
 
 def validate_date_string(date_str: str) -> bool:
     """